@@ -1,13 +1,19 @@
+from supplyalert import startup  # first: starts the cold-start clock
 import streamlit as st
-import pandas as pd
-import requests
-import feedparser
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import plotly.express as px
 import os
+import uuid
 from dotenv import load_dotenv
-import json
+from supplyalert import (alert_rules, assistant, chat_context, chat_jobs, fetch_engine, lanes, port_metrics,
+                         refresher, render, resilience)
+from supplyalert.facilities import get_registry
+from supplyalert.jobs import get_supply_chain_ai_jobs
+from supplyalert.keywords import KeywordMatcher
+from supplyalert.news import (get_ai_supply_chain_news, get_disruption_news,
+                              get_freight_industry_news, get_policy_news, search_news)
+from supplyalert.ports import get_port_status
+from supplyalert.weather import format_window, get_weather_alerts, get_weather_forecast
+startup.checkpoint("import")
 
 # Load environment variables
 load_dotenv()
@@ -21,7 +27,22 @@ def get_secret(key):
 
 # OpenRouter API Configuration (free Llama models - any email allowed!)
 OPENROUTER_API_KEY = get_secret("OPENROUTER_API_KEY")
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+assistant.configure(OPENROUTER_API_KEY)
+
+# Opening the app with ?admin=<key> shows per-source force-refresh buttons under Source Health
+ADMIN_KEY = get_secret("SUPPLYALERT_ADMIN_KEY")
+
+# Canned "Try These Questions" prompts (label, question); pre-warmed in the answer cache
+EXAMPLE_QUESTIONS = [
+    ("🚢 Analyze current port conditions",
+     "Analyze the current port conditions across major US ports. What correlations do you see with weather or other factors? Provide recommendations."),
+    ("⛈️ Weather impact on freight",
+     "What weather disruptions are currently affecting freight? Analyze the trucking and logistics impact."),
+    ("📰 Summarize today's supply chain news",
+     "Summarize the most important supply chain news right now. What should logistics professionals pay attention to?"),
+    ("🗺️ Route optimization advice",
+     "Based on current conditions, what route optimizations would you recommend for cross-country freight?"),
+]
 
 # --- Page Config ---
 st.set_page_config(
@@ -30,10 +51,11 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+startup.checkpoint("config")
 
 # --- CSS ---
-st.markdown("""
-<style>
+# Minified once at import and sent once per browser session (see apply_stylesheet)
+APP_CSS = render.minify_css("""
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
     * {
@@ -362,574 +384,271 @@ st.markdown("""
         margin: 12px 0;
     }
 
+    /* Batched card sections (supplyalert.render) */
+    .card-grid {
+        display: grid;
+        grid-template-columns: repeat(var(--cols), minmax(0, 1fr));
+        gap: 1rem;
+    }
+    @media (max-width: 768px) {
+        .card-grid {
+            grid-template-columns: 1fr;
+        }
+    }
+    .card-link {
+        text-decoration: none;
+        color: inherit;
+    }
+    .card-link .alert-card {
+        transition: transform 0.2s;
+        cursor: pointer;
+    }
+    .alert-card-head {
+        display: flex;
+        justify-content: space-between;
+        align-items: start;
+    }
+    .severity-pill {
+        color: white;
+        padding: 4px 12px;
+        border-radius: 100px;
+        font-size: 0.75rem;
+        font-weight: 600;
+        background: #F59E0B;
+    }
+    .severity-pill.high {
+        background: #EF4444;
+    }
+    .alert-location {
+        color: #CBD5E1;
+        margin-bottom: 4px;
+    }
+    .alert-impact {
+        color: #94A3B8;
+    }
+    .alert-more {
+        margin-top: 10px;
+        font-size: 0.8rem;
+        color: #3B82F6;
+        font-weight: 500;
+    }
+    .stat-name {
+        margin-top: 10px;
+        font-weight: 600;
+        color: #E2E8F0;
+    }
+    .stat-note {
+        color: #64748B;
+        font-size: 0.85rem;
+    }
+    .stat-trend {
+        color: #94A3B8;
+        font-size: 0.75rem;
+        margin-top: 4px;
+    }
+    .news-item {
+        background: #1F2937;
+        padding: 12px;
+        border-radius: 8px;
+        margin: 8px 0;
+        border-left: 3px solid #10B981;
+    }
+    .news-item a {
+        color: #10B981;
+        text-decoration: none;
+        font-weight: 500;
+    }
+    .news-item.ai { border-left-color: #8B5CF6; }
+    .news-item.ai a { color: #8B5CF6; flex: 1; }
+    .news-item.policy { border-left-color: #EC4899; }
+    .news-item.policy a { color: #EC4899; }
+    .news-item.disruption { border-left-color: #EF4444; }
+    .news-item.disruption a { color: #EF4444; }
+    .news-item-row {
+        display: flex;
+        align-items: center;
+        gap: 6px;
+    }
+    .news-item-date {
+        color: #6B7280;
+        font-size: 0.75rem;
+        margin-top: 4px;
+    }
+    .trend-icon {
+        font-size: 1.1rem;
+    }
+    .trend-icon.large {
+        font-size: 1.3rem;
+        margin-top: 2px;
+    }
+    .video-badge {
+        background: #DC2626;
+        color: white;
+        padding: 2px 6px;
+        border-radius: 4px;
+        font-size: 0.7rem;
+        margin-left: 6px;
+    }
+    .video-badge.large {
+        padding: 3px 8px;
+        font-size: 0.75rem;
+        margin-left: 8px;
+        font-weight: 600;
+    }
+    .news-card-title {
+        color: #EF4444;
+        text-decoration: none;
+        font-weight: 600;
+        font-size: 1.1rem;
+    }
+    .alert-card.info .news-card-title { color: #10B981; }
+    .alert-card.policy .news-card-title { color: #EC4899; }
+    .alert-card.ai .news-card-title { color: #8B5CF6; font-size: 1.05rem; }
+    .alert-card.ai .news-item-row { align-items: flex-start; gap: 8px; }
+    .alert-card.ai {
+        border-left: 4px solid #8B5CF6;
+        margin-bottom: 12px;
+    }
+    .alert-card.ai.video { border-left-color: #DC2626; }
+    .news-card-body { flex: 1; }
+    .news-card-meta {
+        color: #94A3B8;
+        font-size: 0.85rem;
+        margin-top: 8px;
+    }
+    .alert-card.ai .news-card-meta { font-size: 0.8rem; margin-top: 6px; }
+    .job-card-head {
+        display: flex;
+        justify-content: space-between;
+        align-items: flex-start;
+        margin-bottom: 14px;
+    }
+    .job-card-heading { flex: 1; }
+    .job-card .company-badge { margin: 8px 0; }
+    .job-card-facts {
+        display: flex;
+        gap: 16px;
+        flex-wrap: wrap;
+        margin: 14px 0;
+        align-items: center;
+    }
+    .job-location {
+        color: #94A3B8;
+        font-size: 0.85rem;
+    }
+    .job-skills { margin: 16px 0 20px 0; }
+    .job-skills-label {
+        color: #9CA3AF;
+        font-size: 0.8rem;
+        margin-bottom: 8px;
+        font-weight: 500;
+    }
+    .job-skill-list {
+        display: flex;
+        gap: 8px;
+        flex-wrap: wrap;
+    }
+    .job-card-foot {
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        margin-top: 20px;
+        padding-top: 16px;
+        border-top: 1px solid rgba(71, 85, 105, 0.3);
+    }
+    .job-source {
+        color: #64748B;
+        font-size: 0.8rem;
+    }
+
     /* Smooth Scrolling */
     html {
         scroll-behavior: smooth;
     }
-</style>
-""", unsafe_allow_html=True)
+""")
 
+def apply_stylesheet():
+    """Install the stylesheet in the page head once per browser session"""
+    if st.session_state.get("stylesheet_installed"):
+        return
+    import streamlit.components.v1 as components  # only needed on a session's first run
+    components.html(render.stylesheet_loader(APP_CSS), height=0)
+    st.session_state.stylesheet_installed = True
 
-# --- DATA FETCHING ---
+apply_stylesheet()
+startup.checkpoint("css")
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_freight_industry_news():
-    """Fetch freight carrier & logistics news from high-quality sources"""
-    feeds = [
-        "https://www.freightwaves.com/feed",
-        "https://www.transporttopics.com/rss.xml",
-        "https://www.supplychaindive.com/feeds/news/",
-    ]
-    news_items = []
-    seen_titles = set()
-    
-    for url in feeds:
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:5]:
-                if entry.title not in seen_titles:
-                    news_items.append(entry)
-                    seen_titles.add(entry.title)
-        except:
-            continue
-            
-    # Sort by published date
-    try:
-        news_items.sort(key=lambda x: x.published_parsed, reverse=True)
-    except:
-        pass # fallback to feed order if parsing fails
-        
-    return news_items[:8]
 
-@st.cache_data(ttl=300)
-def get_policy_news():
-    """Fetch government policy and trade news"""
-    try:
-        # Targeted Google News search for policy
-        url = "https://news.google.com/rss/search?q=FMCSA+regulations+OR+USMCA+trade+OR+freight+tariffs+OR+department+of+transportation+trucking&hl=en-US&gl=US&ceid=US:en"
-        feed = feedparser.parse(url)
-        return feed.entries[:6]
-    except:
-        return []
+# --- DATA FETCHING ---
 
 def categorize_by_time_period(news_items):
     """Categorize news into day/week/month trending based on publish date"""
-    from datetime import datetime, timedelta
-
-    now = datetime.now()
+    now = datetime.now().timestamp()
     day_items = []
     week_items = []
     month_items = []
 
     for item in news_items:
-        try:
-            if hasattr(item, 'published_parsed') and item.published_parsed:
-                pub_date = datetime(*item.published_parsed[:6])
-                age = now - pub_date
-
-                if age.days == 0:
-                    day_items.append(item)
-                elif age.days <= 7:
-                    week_items.append(item)
-                elif age.days <= 30:
-                    month_items.append(item)
-        except:
-            # If date parsing fails, add to week by default
+        published_ts = getattr(item, 'published_ts', None)
+        if published_ts is None:
+            # Undated stories go to week by default
             week_items.append(item)
-
-    return day_items, week_items, month_items
-
-@st.cache_data(ttl=300)  # Cache for 5 minutes (faster updates)
-def get_ai_supply_chain_news():
-    """Fetch trending AI use cases, papers, reports, policies, and YouTube videos"""
-    news_items = []
-    seen_titles = set()
-
-    # Multiple targeted searches for comprehensive AI coverage
-    search_queries = [
-        # AI Use Cases
-        ("AI+use+case+logistics+supply+chain", "🔥"),
-        ("machine+learning+freight+optimization", "📈"),
-        ("generative+AI+warehouse+automation", "🚀"),
-
-        # Research & Reports
-        ("AI+supply+chain+research+paper", "📄"),
-        ("logistics+AI+industry+report", "📊"),
-        ("supply+chain+AI+white+paper", "📋"),
-
-        # Policies & Regulations
-        ("AI+regulation+logistics+policy", "⚖️"),
-        ("autonomous+trucking+policy", "🚛"),
-
-        # Emerging Tech
-        ("computer+vision+warehouse", "👁️"),
-        ("predictive+analytics+freight", "🔮"),
-    ]
-
-    for query, trend_emoji in search_queries[:6]:  # Limit to 6 queries
-        try:
-            url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
-            feed = feedparser.parse(url)
-
-            for entry in feed.entries[:3]:  # Take top 3 from each query
-                # Filter for quality - must contain AI/ML/tech keywords
-                title_lower = entry.title.lower()
-                relevant_keywords = ['ai', 'artificial intelligence', 'machine learning', 'ml',
-                                    'automation', 'autonomous', 'robot', 'algorithm', 'predictive',
-                                    'generative', 'llm', 'gpt', 'neural', 'deep learning',
-                                    'computer vision', 'analytics', 'data science']
-
-                # Check if title contains relevant keywords and not already seen
-                if (any(keyword in title_lower for keyword in relevant_keywords)
-                    and entry.title not in seen_titles):
-                    entry.trend_indicator = trend_emoji  # Add trending indicator
-                    entry.content_type = "article"
-                    news_items.append(entry)
-                    seen_titles.add(entry.title)
-        except:
             continue
+        age_days = int((now - published_ts) // 86400)
+        if age_days <= 0:
+            day_items.append(item)
+        elif age_days <= 7:
+            week_items.append(item)
+        elif age_days <= 30:
+            month_items.append(item)
 
-    # Add YouTube/Video content (Google News with site:youtube.com works best)
-    try:
-        video_queries = [
-            "site:youtube.com AI supply chain",
-            "site:youtube.com logistics technology",
-            "site:youtube.com warehouse robots"
-        ]
-        
-        for v_query in video_queries:
-            # Google News RSS for video content
-            url = f"https://news.google.com/rss/search?q={v_query.replace(' ', '+')}&hl=en-US&gl=US&ceid=US:en"
-            feed = feedparser.parse(url)
-            
-            for entry in feed.entries[:2]:
-                # Google News links redirect to YouTube, so we trust the query intent
-                if entry.title not in seen_titles:
-                    entry.trend_indicator = "🎥"
-                    entry.content_type = "video"
-                    # Clean title (sometimes has " - YouTube" at end)
-                    if " - YouTube" in entry.title:
-                         entry.title = entry.title.replace(" - YouTube", "")
-                    news_items.append(entry)
-                    seen_titles.add(entry.title)
-    except:
-        pass
-
-    # Sort by published date
-    try:
-        news_items.sort(key=lambda x: x.published_parsed, reverse=True)
-    except:
-        pass
-
-    return news_items[:12]  # Return top 12 most recent (articles + videos)
-
-@st.cache_data(ttl=300)
-def get_disruption_news():
-    """Fetch supply chain disruption headlines"""
-    try:
-        url = "https://news.google.com/rss/search?q=supply+chain+crisis+OR+port+strike+OR+freight+disruption+OR+Red+Sea+shipping+OR+Panama+Canal+drought&hl=en-US&gl=US&ceid=US:en"
-        feed = feedparser.parse(url)
-        return feed.entries[:6]
-    except:
-        return []
+    return day_items, week_items, month_items
 
-@st.cache_data(ttl=1800)
-def get_weather_alerts():
-    """Real-time weather alerts via Open-Meteo API"""
-    alerts = []
-    
-    # Key US logistics hubs
-    hubs = {
-        "Chicago (Major Rail/Truck Hub)": {"lat": 41.8781, "lon": -87.6298},
-        "Memphis (FedEx SuperHub)": {"lat": 35.1495, "lon": -90.0490},
-        "Dallas (freight alley)": {"lat": 32.7767, "lon": -96.7970},
-        "Atlanta (Southeast Hub)": {"lat": 33.7490, "lon": -84.3880},
-        "Los Angeles (Port/Intermodal)": {"lat": 34.0522, "lon": -118.2437},
-        "New York (Northeast Corridor)": {"lat": 40.7128, "lon": -74.0060},
-        "Denver (I-70 Corridor)": {"lat": 39.7392, "lon": -104.9903},
-    }
-    
-    for city, coords in hubs.items():
-        try:
-            url = f"https://api.open-meteo.com/v1/forecast?latitude={coords['lat']}&longitude={coords['lon']}&current=temperature_2m,precipitation,rain,showers,snowfall,wind_speed_10m,wind_gusts_10m"
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json().get('current', {})
-                
-                # Check for disruptive conditions based on thresholds
-                conditions = []
-                severity = "Low"
-                impact = "Normal operations"
-                
-                wind_gust = data.get('wind_gusts_10m', 0)
-                snow = data.get('snowfall', 0)
-                rain = data.get('rain', 0)
-                
-                if wind_gust > 80: # > 80 km/h gusts
-                    conditions.append(f"High Winds ({wind_gust} km/h)")
-                    severity = "High"
-                    impact = "High risk of truck blowovers. Delays likely."
-                elif wind_gust > 55:
-                    conditions.append(f"Gusty Winds ({wind_gust} km/h)")
-                    severity = "Medium"
-                    impact = "Moderate risk for high-profile vehicles."
-                    
-                if snow > 1.0: # > 1mm/hr liquid equivalent (significant snow)
-                    conditions.append("Heavy Snow")
-                    severity = "High" 
-                    impact = "Road closures likely. Major delays."
-                elif snow > 0.1:
-                    conditions.append("Light Snow")
-                    severity = "Medium"
-                    impact = "Slippery roads. Slow traffic."
-                    
-                if rain > 10.0: # Heavy rain
-                    conditions.append("Heavy Rain")
-                    severity = "Medium"
-                    impact = "Reduced visibility and localized flooding."
-                
-                if conditions:
-                    alerts.append({
-                        "type": " + ".join(conditions),
-                        "severity": severity,
-                        "location": city, 
-                        "impact": impact
-                    })
-        except:
-            continue
-            
-    # Fallback to simulated major events if API fails or is quiet
-    if not alerts:
-        alerts.append({"type": "Monitor Status", "severity": "Low", "location": "US Logistics Network", "impact": "No major weather disruptions detected at key hubs."})
-        
-    return alerts
-
-@st.cache_data(ttl=900)
-def get_port_status():
-    """Simulated Port Status (Real-time APIs are expensive/restricted)"""
-    # Updated to reflect current global shipping climate (Red Sea, Panama, East Coast labor)
-    return {
-        "Los Angeles/Long Beach": {"congestion": "Medium", "delay_days": 3, "color": "#F59E0B", "note": "Volume increasing pre-holiday"},
-        "New York/New Jersey": {"congestion": "Low", "delay_days": 1, "color": "#10B981", "note": "Fluid operations"},
-        "Savannah": {"congestion": "Medium", "delay_days": 2, "color": "#F59E0B", "note": "Vessel bunching reported"},
-        "Houston": {"congestion": "Low", "delay_days": 1, "color": "#10B981", "note": "Normal operations"},
-        "Seattle/Tacoma": {"congestion": "Low", "delay_days": 0, "color": "#10B981", "note": "Good availability"},
-        "Panama Canal": {"congestion": "High", "delay_days": 10, "color": "#EF4444", "note": "Drought restrictions active"},
-        "Red Sea Route": {"congestion": "Critical", "delay_days": 14, "color": "#EF4444", "note": "Security diversions via Cape"},
-    }
+def format_age(seconds):
+    """Format a snapshot age in seconds as 'just now' / '5m ago' / '2h ago'"""
+    if seconds is None:
+        return "not loaded yet"
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m ago"
+    return f"{int(seconds // 3600)}h ago"
+
+def freshness_caption(*sources):
+    """Caption showing when the oldest of the given sources was last refreshed"""
+    ages = [refresher.age(name) for name in sources]
+    oldest = None if None in ages else max(ages)
+    st.caption(f"🕒 Updated {format_age(oldest)}")
 
 def format_news_date(item):
     """Format news date to relative time"""
-    try:
-        if hasattr(item, 'published_parsed') and item.published_parsed:
-            pub_time = datetime(*item.published_parsed[:6])
-            now = datetime.now()
-            diff = now - pub_time
-            if diff.days == 0:
-                hours = diff.seconds // 3600
-                if hours == 0:
-                    minutes = diff.seconds // 60
-                    return f"{minutes}m ago"
-                return f"{hours}h ago"
-            elif diff.days == 1:
-                return "Yesterday"
-            elif diff.days < 7:
-                return f"{diff.days} days ago"
-            else:
-                return pub_time.strftime("%b %d")
-        return ""
-    except:
+    published_ts = getattr(item, 'published_ts', None)
+    if published_ts is None:
         return ""
-
-# --- SUPPLY CHAIN AI JOBS ---
-
-def fetch_adzuna_jobs():
-    """
-    Fetch real job postings from Adzuna API (free tier: 1000 calls/month)
-    Returns list of job dictionaries
-    """
-    jobs = []
-
-    # Adzuna API configuration (get free key at https://developer.adzuna.com/)
-    ADZUNA_APP_ID = get_secret("ADZUNA_APP_ID") or "test"  # Fallback to test
-    ADZUNA_APP_KEY = get_secret("ADZUNA_APP_KEY") or "test"
-
-    # Search parameters
-    search_queries = [
-        ("supply chain AI", "Chicago"),
-        ("machine learning logistics", "Illinois"),
-        ("data science supply chain", "Midwest"),
-    ]
-
-    for query, location in search_queries:
-        try:
-            url = f"http://api.adzuna.com/v1/api/jobs/us/search/1"
-            params = {
-                "app_id": ADZUNA_APP_ID,
-                "app_key": ADZUNA_APP_KEY,
-                "results_per_page": 10,
-                "what": query,
-                "where": location,
-                "sort_by": "date",
-            }
-
-            response = requests.get(url, params=params, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                for job in data.get('results', [])[:7]:  # Take top 7 per query
-                    # Extract salary
-                    salary = "Not specified"
-                    if job.get('salary_min') and job.get('salary_max'):
-                        salary = f"${int(job['salary_min']):,} - ${int(job['salary_max']):,}"
-                    elif job.get('salary_min'):
-                        salary = f"${int(job['salary_min']):,}+"
-
-                    # Parse skills from description (simple keyword extraction)
-                    description = job.get('description', '').lower()
-                    skills = []
-                    skill_keywords = ['python', 'sql', 'machine learning', 'ai', 'data science',
-                                    'supply chain', 'logistics', 'tensorflow', 'pytorch', 'aws']
-                    for skill in skill_keywords:
-                        if skill in description:
-                            skills.append(skill.title())
-
-                    if not skills:
-                        skills = ['Supply Chain', 'Data Analytics']  # Default skills
-
-                    # Parse date
-                    created = job.get('created', '')
-                    try:
-                        job_date = datetime.strptime(created[:10], '%Y-%m-%d') if created else datetime.now()
-                    except:
-                        job_date = datetime.now()
-
-                    jobs.append({
-                        'title': job.get('title', 'Unknown Position'),
-                        'company': job.get('company', {}).get('display_name', 'Company'),
-                        'location': job.get('location', {}).get('display_name', location),
-                        'summary': job.get('description', '')[:200] + "...",
-                        'skills': skills[:5],  # Limit to 5 skills
-                        'link': job.get('redirect_url', '#'),
-                        'salary': salary,
-                        'date': job_date,
-                        'source': '🔴 Live API',
-                        'verified': True
-                    })
-        except Exception as e:
-            # Silently fail and continue - API might be rate limited
-            continue
-
-    return jobs
-
-@st.cache_data(ttl=86400)  # Cache for 24 hours (daily refresh)
-def get_supply_chain_ai_jobs():
-    """
-    Hybrid job fetcher: Real API jobs + Verified company links
-    ~80% self-sustaining with daily auto-refresh
-    """
-    all_jobs = []
-
-    # PART 1: Fetch real jobs from Adzuna API
-    try:
-        api_jobs = fetch_adzuna_jobs()
-        all_jobs.extend(api_jobs)
-    except:
-        pass  # If API fails, continue with verified links only
-
-    # PART 2: Verified company career page links (always up-to-date, no maintenance)
-    # These link directly to company career pages - jobs are always current
-    verified_companies = [
-        ('Browse Amazon Supply Chain Jobs', 'Amazon', 'Nationwide',
-         'Direct link to Amazon career page. Search live openings for supply chain analyst, data scientist, ML engineer, and operations roles.',
-         ['Python', 'SQL', 'Supply Chain', 'Data Analytics', 'AWS'],
-         'https://www.amazon.jobs/en/search?base_query=supply+chain&loc_query=Illinois',
-         '$80,000 - $180,000'),
-
-        ('Browse Walmart Supply Chain Jobs', 'Walmart', 'Nationwide',
-         'Walmart supply chain technology careers. Data science, demand planning, inventory optimization, and ML engineering roles.',
-         ['Python', 'Machine Learning', 'Supply Chain', 'Big Data', 'Forecasting'],
-         'https://careers.walmart.com/results?q=supply%20chain&jobState=il',
-         '$75,000 - $170,000'),
-
-        ('Browse Target Supply Chain Jobs', 'Target', 'Nationwide',
-         'Target supply chain careers including analytics, data science, systems implementation and optimization roles.',
-         ['Supply Chain', 'Data Analytics', 'SQL', 'Python', 'Project Management'],
-         'https://jobs.target.com/search-jobs/supply%20chain',
-         '$85,000 - $160,000'),
-
-        ('Browse FourKites Careers', 'FourKites', 'Chicago, IL',
-         'Real-time supply chain visibility platform. Roles in data analytics, software engineering, and supply chain operations.',
-         ['SQL', 'Python', 'Supply Chain', 'Data Visualization', 'SaaS'],
-         'https://www.fourkites.com/careers/',
-         '$75,000 - $150,000'),
-
-        ('Browse PepsiCo Supply Chain Jobs', 'PepsiCo', 'Nationwide',
-         'Supply chain analytics and optimization roles at global food & beverage leader. Data science, demand planning, and operations.',
-         ['Advanced Analytics', 'Python', 'SQL', 'Supply Chain', 'Forecasting'],
-         'https://www.pepsicojobs.com/main/jobs?keywords=supply+chain',
-         '$90,000 - $165,000'),
-
-        ('Browse Project44 Careers', 'Project44', 'Chicago, IL',
-         'Supply chain visibility and logistics tech company. Engineering, data science, and AI/ML roles.',
-         ['Python', 'Machine Learning', 'Supply Chain', 'Cloud', 'APIs'],
-         'https://www.project44.com/careers',
-         '$95,000 - $180,000'),
-
-        ('Browse C.H. Robinson Jobs', 'C.H. Robinson', 'Eden Prairie, MN',
-         'Third-party logistics leader with $20B+ revenue. Analytics, data science, and technology roles for freight operations.',
-         ['SQL', 'Python', 'Logistics', 'Analytics', 'Business Intelligence'],
-         'https://jobs.chrobinson.com/search/?q=supply+chain',
-         '$80,000 - $175,000'),
-
-        ('Browse Flexport Careers', 'Flexport', 'Remote',
-         'Digital freight forwarding and supply chain platform. Data engineering, software engineering, and operations roles.',
-         ['Python', 'SQL', 'AWS', 'Data Engineering', 'Supply Chain'],
-         'https://www.flexport.com/careers/jobs/',
-         '$100,000 - $170,000'),
-
-        ('Browse Microsoft Supply Chain Jobs', 'Microsoft', 'Nationwide',
-         'Supply chain AI and technology roles including Azure Supply Chain Center product development and operations.',
-         ['AI/ML', 'Supply Chain', 'Azure', 'Product Management', 'Cloud'],
-         'https://careers.microsoft.com/us/en/search-results?keywords=supply%20chain',
-         '$120,000 - $200,000'),
-
-        ('Browse Google Supply Chain Jobs', 'Google', 'Nationwide',
-         'Supply chain operations, analytics, and AI research roles. Work on optimization for global hardware and cloud infrastructure.',
-         ['Machine Learning', 'Python', 'Supply Chain', 'Research', 'Operations'],
-         'https://www.google.com/about/careers/applications/jobs/results/?q=supply%20chain',
-         '$110,000 - $220,000'),
-
-        ('Browse IBM Supply Chain Consulting', 'IBM', 'Nationwide',
-         'Enterprise AI and supply chain consulting. Watson AI implementation, solution architecture, and digital transformation.',
-         ['AI/ML', 'Supply Chain', 'Solution Architecture', 'Consulting', 'Cloud'],
-         'https://www.ibm.com/employment/search/?field_keyword_08[0]=supply%20chain',
-         '$100,000 - $175,000'),
-
-        ('Browse DoorDash ML Jobs', 'DoorDash', 'Remote',
-         'Machine learning and data science for logistics optimization. Route planning, demand forecasting, and operational ML.',
-         ['Machine Learning', 'Python', 'Logistics', 'Data Science', 'Optimization'],
-         'https://www.doordash.com/careers/jobs/?q=machine%20learning',
-         '$130,000 - $210,000'),
-    ]
-
-    for title, company, location, summary, skills, link, salary in verified_companies:
-        all_jobs.append({
-            'title': title,
-            'company': company,
-            'location': location,
-            'summary': summary,
-            'skills': skills,
-            'link': link,
-            'salary': salary,
-            'date': datetime.now(),  # Company links are always "current"
-            'source': '✅ Company',
-            'verified': True
-        })
-
-    # Sort by date (most recent first) - API jobs will appear before company links
-    all_jobs.sort(key=lambda x: x['date'], reverse=True)
-    return all_jobs
-
-def get_salary_estimate(title):
-    """Estimate salary based on job title keywords"""
-    title_lower = title.lower()
-    
-    if any(word in title_lower for word in ['director', 'vp', 'vice president', 'head of']):
-        return "$150,000 - $250,000"
-    elif any(word in title_lower for word in ['senior', 'lead', 'principal', 'staff']):
-        return "$120,000 - $180,000"
-    elif any(word in title_lower for word in ['manager', 'scientist', 'architect']):
-        return "$100,000 - $150,000"
-    elif any(word in title_lower for word in ['analyst', 'engineer', 'developer']):
-        return "$75,000 - $120,000"
-    elif any(word in title_lower for word in ['associate', 'coordinator', 'specialist']):
-        return "$55,000 - $85,000"
+    pub_time = datetime.fromtimestamp(published_ts)
+    diff = datetime.now() - pub_time
+    if diff.days <= 0:
+        seconds = max(diff.total_seconds(), 0)
+        if seconds < 3600:
+            return f"{int(seconds // 60)}m ago"
+        return f"{int(seconds // 3600)}h ago"
+    elif diff.days == 1:
+        return "Yesterday"
+    elif diff.days < 7:
+        return f"{diff.days} days ago"
     else:
-        return "$70,000 - $130,000"
-
-def get_required_skills(title):
-    """Suggest skills based on job title"""
-    title_lower = title.lower()
-    
-    base_skills = ["Supply Chain", "Analytics"]
-    
-    if any(word in title_lower for word in ['ai', 'machine learning', 'ml']):
-        base_skills.extend(["Python", "Machine Learning", "TensorFlow/PyTorch"])
-    if any(word in title_lower for word in ['data', 'analyst', 'scientist']):
-        base_skills.extend(["SQL", "Python", "Data Visualization"])
-    if any(word in title_lower for word in ['logistics', 'operations']):
-        base_skills.extend(["WMS", "TMS", "ERP"])
-    if any(word in title_lower for word in ['forecast', 'planning', 'demand']):
-        base_skills.extend(["Demand Planning", "S&OP", "Statistical Modeling"])
-    
-    return list(set(base_skills))[:6]  # Return unique skills, max 6
+        return pub_time.strftime("%b %d")
 
 # --- AI CHATBOT WITH GEMINI ---
 
-def build_supply_chain_context():
-    """Build rich context from live data sources for AI"""
-    context_parts = []
-    
-    # Current date/time
-    context_parts.append(f"Current Date: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}")
-    
-    # Port data
-    try:
-        ports = get_port_status()
-        port_text = "CURRENT PORT STATUS:\n"
-        for port, data in ports.items():
-            port_text += f"- {port}: {data['delay_days']} days delay, {data['congestion']} congestion\n"
-        context_parts.append(port_text)
-    except:
-        pass
-    
-    # Weather alerts
-    try:
-        alerts = get_weather_alerts()
-        if alerts:
-            alert_text = "ACTIVE WEATHER DISRUPTIONS:\n"
-            for alert in alerts:
-                alert_text += f"- {alert['type']} ({alert['severity']}) in {alert['location']}: {alert['impact']}\n"
-            context_parts.append(alert_text)
-        else:
-            context_parts.append("WEATHER: No active disruptions affecting freight lanes.")
-    except:
-        pass
-    
-    # Latest news headlines
-    try:
-        freight_news = get_freight_industry_news()
-        if freight_news:
-            news_text = "LATEST FREIGHT NEWS:\n"
-            for item in freight_news[:5]:
-                news_text += f"- {item.title}\n"
-            context_parts.append(news_text)
-    except:
-        pass
-    
-    try:
-        policy_news = get_policy_news()
-        if policy_news:
-            policy_text = "LATEST POLICY NEWS:\n"
-            for item in policy_news[:3]:
-                policy_text += f"- {item.title}\n"
-            context_parts.append(policy_text)
-    except:
-        pass
-    
-    try:
-        disruption_news = get_disruption_news()
-        if disruption_news:
-            disruption_text = "DISRUPTION NEWS:\n"
-            for item in disruption_news[:3]:
-                disruption_text += f"- {item.title}\n"
-            context_parts.append(disruption_text)
-    except:
-        pass
-    
-    return "\n\n".join(context_parts)
+# Fallback topic routing (whole-word keywords, so "la" no longer matches "latest")
+FALLBACK_TOPICS = KeywordMatcher({
+    "ports": ["port", "congestion", "shipping", "vessel", "la", "long beach"],
+    "weather": ["weather", "storm", "snow", "fog", "rain", "disruption"],
+    "policy": ["tariff", "trump", "policy", "regulation", "trade", "china", "mexico", "canada", "usmca"],
+    "news": ["news", "latest", "headline", "summar*", "today"],
+    "routes": ["route*", "lane", "corridor", "cross-country"],
+})
 
 def get_ai_response(user_input):
     """Real AI response using OpenRouter API (free Llama 3.3) with live data context"""
@@ -939,81 +658,37 @@ def get_ai_response(user_input):
         return "⚠️ **AI not configured.** Please add your OpenRouter API key to enable real-time AI analysis.\n\nGet a free key at [openrouter.ai](https://openrouter.ai)"
     
     try:
-        # Build context from live data
-        live_context = build_supply_chain_context()
-        
-        # System prompt for supply chain expertise
-        system_prompt = """You are SupplyAlert AI, an expert supply chain intelligence assistant. 
-
-Your role:
-1. Analyze supply chain data and provide actionable insights
-2. Explain correlations (e.g., how weather affects ports, trucking, delays)
-3. Provide specific recommendations for logistics professionals
-4. ALWAYS cite sources and provide references when possible
-5. Use markdown formatting for clear, readable responses
-6. Be concise but comprehensive
-
-When referencing data:
-- Cite "SupplyAlert Live Data" for port/weather data
-- Cite specific news sources when discussing headlines
-- Link to relevant official sources (weather.gov, eia.gov, etc.)
-
-Formatting:
-- Use **bold** for key points
-- Use bullet points for lists
-- Use emojis sparingly for visual clarity
-- End with actionable next steps or related questions
-
-You have access to REAL-TIME DATA about:
-- Port congestion and delays
-- Weather disruptions affecting freight
-- Latest industry news
-- Policy and regulatory updates
-
-CURRENT LIVE DATA:
-""" + live_context
-        
-        # Make OpenRouter API call (OpenAI-compatible format)
-        response = requests.post(
-            OPENROUTER_API_URL,
-            headers={
-                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://supplyalert.streamlit.app",
-                "X-Title": "SupplyAlert"
-            },
-            json={
-                "model": "google/gemma-3-27b-it:free",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_input}
-                ],
-                "max_tokens": 1500,
-                "temperature": 0.7
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            ai_text = response.json()["choices"][0]["message"]["content"]
-            
-            # Add references footer
-            references = "\n\n---\n📚 **Sources:** SupplyAlert Live Data | Google News RSS | [weather.gov](https://weather.gov) | [DOT](https://www.transportation.gov)"
-            
-            return ai_text + references
-        elif response.status_code == 429:
-            # Rate limited - use smart fallback
-            return get_fallback_response(user_input)
-        else:
-            return get_fallback_response(user_input)
-        
-    except Exception as e:
-        # Fallback to rule-based responses
+        # Cached per (question, live-context version); see supplyalert.assistant
+        return assistant.ask(user_input)
+    except Exception:
+        # Rate-limited or unavailable - use smart fallback (never cached)
         return get_fallback_response(user_input)
 
+def stream_ai_response(user_input, outcome=None):
+    """
+    Streaming variant of get_ai_response: yields text as the model produces it.
+    Sets outcome["complete"] once a whole answer has been yielded; an
+    interrupted stream leaves it unset.
+    """
+    if not OPENROUTER_API_KEY:
+        yield get_ai_response(user_input)
+    else:
+        started = False
+        try:
+            for chunk in assistant.stream(user_input):
+                started = True
+                yield chunk
+        except Exception:
+            if started:
+                yield "\n\n⚠️ *Response interrupted — please ask again.*"
+                return
+            yield get_fallback_response(user_input)
+    if outcome is not None:
+        outcome["complete"] = True
+
 def get_fallback_response(user_input):
     """Smart rule-based fallback when AI API is rate-limited"""
-    user_input = user_input.lower()
+    topics = FALLBACK_TOPICS.tags(user_input)
     
     # Get live data
     try:
@@ -1023,8 +698,17 @@ def get_fallback_response(user_input):
         ports = {}
         alerts = []
     
+    # ROUTE queries
+    if "routes" in topics:
+        try:
+            routes = lanes.route_facts(lanes.get_lane_graph(), alerts, get_weather_forecast.peek(), ports)
+        except Exception:
+            routes = []
+        if routes:
+            return "🗺️ **Risk-Weighted Freight Routes:**\n\n" + "\n".join(routes) + "\n\n💡 *Transit hours include current weather, the 72-hour outlook and port delays*\n\n---\n📚 **Sources:** SupplyAlert Live Data"
+    
     # PORT queries
-    if any(word in user_input for word in ["port", "congestion", "shipping", "vessel", "la", "long beach"]):
+    if "ports" in topics:
         port_info = []
         for port, data in ports.items():
             port_info.append(f"• **{port}**: {data['delay_days']} days delay ({data['congestion']} congestion)")
@@ -1038,7 +722,7 @@ def get_fallback_response(user_input):
         return f"🚢 **Live Port Status:**\n\n" + "\n".join(port_info) + weather_impact + "\n\n💡 *Data refreshes every 15 minutes*\n\n---\n📚 **Sources:** SupplyAlert Live Data"
     
     # WEATHER queries
-    if any(word in user_input for word in ["weather", "storm", "snow", "fog", "rain", "disruption"]):
+    if "weather" in topics:
         if alerts:
             alert_info = []
             for alert in alerts:
@@ -1047,7 +731,7 @@ def get_fallback_response(user_input):
         return "✅ **No active weather disruptions** affecting major freight lanes at this time.\n\n---\n📚 **Sources:** SupplyAlert Live Data"
     
     # TARIFF/POLICY queries
-    if any(word in user_input for word in ["tariff", "trump", "policy", "regulation", "trade", "china", "mexico", "canada", "usmca"]):
+    if "policy" in topics:
         try:
             policy_news = get_policy_news()[:5]
             if policy_news:
@@ -1077,7 +761,7 @@ def get_fallback_response(user_input):
             return "📜 **Policy news temporarily unavailable.** Check the **All News** tab."
     
     # NEWS queries
-    if any(word in user_input for word in ["news", "latest", "headline", "summary", "today"]):
+    if "news" in topics:
         try:
             freight_news = get_freight_industry_news()[:3]
             policy_news = get_policy_news()[:2]
@@ -1108,6 +792,31 @@ I'm currently using cached data (AI API busy). Here's what I can help with:
 ---
 📚 **Sources:** SupplyAlert Live Data"""
 
+def collect_chat_jobs(jobs):
+    """Fill in pending assistant messages whose background job has finished"""
+    for message in st.session_state.messages:
+        job_id = message.get("job")
+        if job_id is None:
+            continue
+        job = jobs.get(job_id)
+        if job is not None and not job.done():
+            continue
+        if job is None or job.cancelled:
+            message["content"] = "🚫 *Cancelled.*"
+        else:
+            try:
+                message["content"] = job.result()
+            except Exception:
+                message["content"] = get_fallback_response(job.question)
+        del message["job"]
+        jobs.release(job_id)
+
+@st.fragment(run_every=1.0)
+def watch_chat_jobs(jobs, pending):
+    """Poll while answers are pending; rerun the page once one lands"""
+    if len(jobs.pending()) < pending:
+        st.rerun()
+
 def show_chatbot():
     """Real AI Chatbot page powered by OpenRouter (Llama 3.3)"""
     st.markdown(""" 
@@ -1129,6 +838,10 @@ def show_chatbot():
         st.warning("⚠️ OpenRouter API key not found. Add it to your .env file or Streamlit secrets.")
         return
     
+    # Live data the assistant reasons over (also warms any source not loaded yet)
+    context = chat_context.current()
+    st.caption(f"🧩 Live context v{context.version} • ~{context.tokens} tokens")
+    
     # Initialize chat history
     if "messages" not in st.session_state:
         st.session_state.messages = [
@@ -1148,10 +861,23 @@ I'm powered by **Gemma 3 27B** (via OpenRouter) and have access to live supply c
 I'll analyze, correlate data, and provide **actionable insights with references**."""}
         ]
     
+    # Background answers for the example buttons (one queue per session)
+    jobs = st.session_state.setdefault("chat_jobs", chat_jobs.ChatJobQueue())
+    collect_chat_jobs(jobs)
+    
     # Display chat history
     for message in st.session_state.messages:
         with st.chat_message(message["role"], avatar="🧠" if message["role"] == "assistant" else "👤"):
-            st.markdown(message["content"])
+            if "job" in message:
+                st.markdown("⏳ *Analyzing live data and reasoning...*")
+                if st.button("✖️ Cancel", key=f"cancel_job_{message['job']}"):
+                    jobs.cancel(message["job"])
+                    st.rerun()
+            else:
+                st.markdown(message["content"])
+    pending = len(jobs.pending())
+    if pending:
+        watch_chat_jobs(jobs, pending)
     
     # Chat input
     if prompt := st.chat_input("Ask anything about supply chain..."):
@@ -1159,44 +885,36 @@ I'll analyze, correlate data, and provide **actionable insights with references*
         with st.chat_message("user", avatar="👤"):
             st.markdown(prompt)
         
-        # Get AI response
+        # Stream the AI response; it joins the history only once complete
+        outcome = {}
         with st.chat_message("assistant", avatar="🧠"):
-            with st.spinner("🔍 Analyzing live data and reasoning..."):
-                response = get_ai_response(prompt)
-            st.markdown(response)
-        st.session_state.messages.append({"role": "assistant", "content": response})
+            response = st.write_stream(stream_ai_response(prompt, outcome))
+        if outcome.get("complete"):
+            st.session_state.messages.append({"role": "assistant", "content": response})
     
     # Example questions
     st.markdown("---")
     st.markdown("### 💡 Try These Questions")
     
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("🚢 Analyze current port conditions", use_container_width=True):
-            q = "Analyze the current port conditions across major US ports. What correlations do you see with weather or other factors? Provide recommendations."
-            st.session_state.messages.append({"role": "user", "content": q})
-            st.session_state.messages.append({"role": "assistant", "content": get_ai_response(q)})
-            st.rerun()
-        if st.button("⛈️ Weather impact on freight", use_container_width=True):
-            q = "What weather disruptions are currently affecting freight? Analyze the trucking and logistics impact."
-            st.session_state.messages.append({"role": "user", "content": q})
-            st.session_state.messages.append({"role": "assistant", "content": get_ai_response(q)})
-            st.rerun()
-    with col2:
-        if st.button("📰 Summarize today's supply chain news", use_container_width=True):
-            q = "Summarize the most important supply chain news right now. What should logistics professionals pay attention to?"
-            st.session_state.messages.append({"role": "user", "content": q})
-            st.session_state.messages.append({"role": "assistant", "content": get_ai_response(q)})
-            st.rerun()
-        if st.button("🗺️ Route optimization advice", use_container_width=True):
-            q = "Based on current conditions, what route optimizations would you recommend for cross-country freight?"
-            st.session_state.messages.append({"role": "user", "content": q})
-            st.session_state.messages.append({"role": "assistant", "content": get_ai_response(q)})
-            st.rerun()
+    # Answers are pre-warmed in the background whenever the live context changes
+    assistant.prewarm([q for _, q in EXAMPLE_QUESTIONS])
+    
+    columns = st.columns(2)
+    for i, (label, q) in enumerate(EXAMPLE_QUESTIONS):
+        with columns[i // 2]:
+            if st.button(label, use_container_width=True):
+                job, created = jobs.submit(q, get_ai_response, q)
+                if created:
+                    st.session_state.messages.append({"role": "user", "content": q})
+                    st.session_state.messages.append({"role": "assistant", "content": None, "job": job.id})
+                    st.rerun()
+                st.toast("⏳ Already working on that question")
     
     # Clear chat button
     st.markdown("---")
     if st.button("🗑️ Clear Chat History", use_container_width=True):
+        for job in jobs.pending():
+            jobs.cancel(job.id)
         st.session_state.messages = [st.session_state.messages[0]]
         st.rerun()
 
@@ -1218,7 +936,7 @@ def show_jobs_page():
     """, unsafe_allow_html=True)
     
     # Fetch jobs
-    with st.spinner("🔍 Fetching latest job listings..."):
+    with st.spinner("🔍 Fetching latest job listings..."), startup.timed("fetch"):
         jobs = get_supply_chain_ai_jobs()
     
     if not jobs:
@@ -1228,7 +946,8 @@ def show_jobs_page():
         st.markdown("*Sorted by date (most recent first) • Salary estimates based on market data*")
         st.markdown("---")
         
-        for i, job in enumerate(jobs):
+        rows = []
+        for job in jobs:
             # Calculate days ago
             days_ago = (datetime.now() - job['date']).days
             if days_ago == 0:
@@ -1237,16 +956,12 @@ def show_jobs_page():
                 date_str = "Yesterday"
             else:
                 date_str = f"{days_ago} days ago"
-
-            # Get salary and skills from job data (now included)
-            salary = job.get('salary', 'Not specified')
-            skills = job.get('skills', [])
-            summary = job.get('summary', '')
-
-            # Job card with premium design
-            skills_html = ''.join([f'<span class="skill-tag">{skill}</span>' for skill in skills])
-
-            st.markdown(f"""<div class="job-card"><div style="display:flex;justify-content:space-between;align-items:flex-start;margin-bottom:14px;"><div style="flex:1;"><h3 class="job-title">{job['title']}</h3><p class="company-badge" style="margin:8px 0;">🏢 {job['company']}</p></div><span class="date-badge">{date_str}</span></div><div style="display:flex;gap:16px;flex-wrap:wrap;margin:14px 0;align-items:center;"><span style="color:#94A3B8;font-size:0.85rem;">📍 {job['location']}</span><span class="salary-badge">💰 {salary}</span></div><p class="job-summary">{summary}</p><div style="margin:16px 0 20px 0;"><p style="color:#9CA3AF;font-size:0.8rem;margin-bottom:8px;font-weight:500;">Required Skills:</p><div style="display:flex;gap:8px;flex-wrap:wrap;">{skills_html}</div></div><div style="display:flex;justify-content:space-between;align-items:center;margin-top:20px;padding-top:16px;border-top:1px solid rgba(71,85,105,0.3);"><span style="color:#64748B;font-size:0.8rem;">✅ {job['source']}</span><a href="{job['link']}" target="_blank" class="apply-btn">Apply Now →</a></div></div>""", unsafe_allow_html=True)
+            rows.append((job['title'], job['company'], date_str, job['location'],
+                         job.get('salary', 'Not specified'), job.get('summary', ''),
+                         tuple(job.get('skills', [])), job['source'], job['link']))
+        
+        # All job cards in one element
+        st.markdown(render.job_cards(rows), unsafe_allow_html=True)
     
     # Quick links section
     st.markdown("---")
@@ -1300,6 +1015,66 @@ def show_jobs_page():
 
 # --- MAIN APP ---
 
+def is_admin():
+    """Whether this session opened the app with the admin key"""
+    return bool(ADMIN_KEY) and st.query_params.get("admin") == ADMIN_KEY
+
+def alert_owner():
+    """Owner id for this browser's alert rules, kept in the URL so a bookmark brings them back"""
+    owner = st.query_params.get("watch") or st.session_state.get("alert_owner") or uuid.uuid4().hex[:16]
+    st.session_state.alert_owner = owner
+    if st.query_params.get("watch") != owner:
+        st.query_params["watch"] = owner
+    return owner
+
+def show_custom_alerts():
+    """Sidebar watchlists: define alert rules and read what they matched"""
+    engine = alert_rules.get_engine()
+    owner = alert_owner()
+    graph = lanes.get_lane_graph()
+    name_of = lambda node: graph.names.get(node, node)
+    
+    with st.expander("🔔 Custom Alerts"):
+        notifications = engine.notifications(owner, limit=10)
+        for note in notifications:
+            icon = {"Critical": "🔴", "High": "🔴", "Medium": "🟠"}.get(note.severity, "🔵")
+            st.markdown(f"{icon} **{note.title}**")
+            st.caption(f"{note.rule_name} • {format_age(datetime.now().timestamp() - note.created_at)}")
+        rules = engine.rules(owner)
+        if rules and not notifications:
+            st.caption("No matches yet. Rules are checked as new alerts, port updates and articles arrive.")
+        
+        for rule_id, name, spec in rules:
+            watched = [name_of(node) for node in spec["hubs"] + spec["ports"]]
+            watched += [f"{name_of(a)} – {name_of(b)}" for a, b in spec["lanes"]]
+            watched += [f'"{keyword}"' for keyword in spec["keywords"]]
+            if spec["min_severity"]:
+                watched.append(f"{spec['min_severity']}+")
+            col1, col2 = st.columns([4, 1])
+            col1.caption(f"**{name}**: {', '.join(watched) or 'everything'}")
+            if col2.button("✕", key=f"remove_rule_{rule_id}", help="Remove rule"):
+                engine.remove_rule(rule_id, owner)
+                st.rerun()
+        
+        with st.form("alert_rule", clear_on_submit=True):
+            name = st.text_input("Rule name", placeholder="Savannah labor watch")
+            hubs = st.multiselect("Hubs", [f.id for f in get_registry().facilities], format_func=name_of)
+            ports = st.multiselect("Ports", list(port_metrics.BASELINE))
+            lanes_watched = st.multiselect("Lanes", list(graph.modes),
+                                           format_func=lambda lane: f"{name_of(lane[0])} – {name_of(lane[1])}")
+            keywords = st.text_input("Keywords", placeholder="strike, red sea, tariff*")
+            kinds = st.multiselect("Event types", alert_rules.KINDS, format_func=str.title)
+            min_severity = st.selectbox("Minimum severity", ["Any"] + list(alert_rules.SEVERITIES[1:]))
+            if st.form_submit_button("Add Rule", use_container_width=True):
+                keywords = [keyword for keyword in keywords.split(",") if keyword.strip()]
+                if not (hubs or ports or lanes_watched or keywords or kinds or min_severity != "Any"):
+                    st.warning("Pick at least one hub, port, lane, keyword, event type or severity.")
+                else:
+                    engine.add_rule(owner, name.strip() or "Untitled rule", hubs=hubs, ports=ports,
+                                    lanes=lanes_watched, keywords=keywords, kinds=kinds,
+                                    min_severity=None if min_severity == "Any" else min_severity)
+                    st.rerun()
+
 def main():
     # Sidebar
     with st.sidebar:
@@ -1330,6 +1105,8 @@ def main():
         
         st.markdown("---")
         
+        show_custom_alerts()
+        
         st.info("""
 **Track disruptions** affecting freight and logistics across weather, policy, and technology.
 
@@ -1339,9 +1116,34 @@ def main():
         # Pro Teaser
         st.markdown("""<div style="margin-top:15px;padding:16px;background:linear-gradient(135deg, rgba(59,130,246,0.15) 0%, rgba(139,92,246,0.15) 100%);border-radius:12px;border:1px solid rgba(139,92,246,0.3);">
             <div style="color:#A78BFA;font-weight:600;font-size:0.95rem;">✨ SupplyAlert Pro</div>
-            <p style="color:#94A3B8;font-size:0.8rem;margin:8px 0 0 0;line-height:1.5;">Coming Soon: Custom alerts, API access, historical data & route planning</p>
+            <p style="color:#94A3B8;font-size:0.8rem;margin:8px 0 0 0;line-height:1.5;">Coming Soon: Historical data & route planning</p>
         </div>""", unsafe_allow_html=True)
         
+        # Per-source health (circuit breaker state and last error)
+        with st.expander("📡 Source Health"):
+            sources = resilience.source_status()
+            if not sources:
+                st.caption("No sources fetched yet.")
+            for source in sources:
+                icon = {"closed": "🟢", "half-open": "🟡", "open": "🔴"}[source['state']]
+                label = f"{icon} **{source['host']}** · {source['state']}"
+                if source['served_stale']:
+                    label += " · serving last-known-good"
+                st.markdown(label)
+                if source['last_error']:
+                    st.caption(f"Last error: {source['last_error']}")
+            admin = is_admin()
+            for row in refresher.freshness():
+                st.caption(f"🕒 {row['source']}: updated {format_age(row['age'])} • "
+                           f"{row['hits']} hits / {row['misses']} misses / {row['coalesced']} coalesced")
+                if admin and st.button(f"↻ Refresh {row['source']}", key=f"force_{row['source']}"):
+                    refresher.force_refresh(row['source'])
+                    st.rerun()
+            profile = startup.report()
+            if profile:
+                phases = " • ".join(f"{phase} {profile[phase]:.2f}s" for phase in startup.PHASES)
+                st.caption(f"⏱️ Cold start {profile['total']:.2f}s ({phases})")
+        
         st.caption("v1.1.0 • Publicly available data")
     
     # Route to pages
@@ -1356,6 +1158,17 @@ def main():
     else:
         show_dashboard()
 
+def news_rows(items):
+    """(title, link, display date) rows for the render layer"""
+    return [(item.title, item.link, format_news_date(item)) for item in items]
+
+def ai_news_rows(items):
+    """(title, link, display date, trend icon, content type) rows for the render layer"""
+    return [(item.title, item.link, format_news_date(item), item.trend_indicator or '📰', item.content_type)
+            for item in items]
+
+MAX_ALERT_CARDS = 8
+
 def show_dashboard():
     """Main supply chain intelligence dashboard"""
     # Hero
@@ -1368,45 +1181,39 @@ def show_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
+    # Fetch every dashboard source concurrently so a cold load costs the
+    # slowest source, not the sum of all of them. Anything still running at
+    # the render budget renders empty now and lands in the cache for next run.
+    with startup.timed("fetch"):
+        alerts, ports, freight_news, ai_news, policy_news, disruption_news = fetch_engine.run_sources(
+            [get_weather_alerts, get_port_status, get_freight_industry_news,
+             get_ai_supply_chain_news, get_policy_news, get_disruption_news],
+            deadline=fetch_engine.RENDER_BUDGET)
+    
     # Current Alerts
     st.markdown("## 🚨 Active Weather Disruptions")
+    freshness_caption("weather")
     
-    alerts = get_weather_alerts()
     if alerts:
-        cols = st.columns(len(alerts))
-        for i, alert in enumerate(alerts):
-            with cols[i]:
-                severity_class = "alert-card" if alert['severity'] == "High" else "alert-card warning"
-                st.markdown(f"""
-<a href="https://www.weather.gov/" target="_blank" style="text-decoration:none;color:inherit;">
-    <div class="{severity_class}" style="transition:transform 0.2s;cursor:pointer;">
-        <div style="display:flex;justify-content:space-between;align-items:start;">
-            <h3>{alert['type']}</h3>
-            <span style="background:{'#EF4444' if alert['severity'] == 'High' else '#F59E0B'};color:white;padding:4px 12px;border-radius:100px;font-size:0.75rem;font-weight:600;">{alert['severity']}</span>
-        </div>
-        <p style="color:#CBD5E1;margin-bottom:4px;"><strong>📍 Location:</strong> {alert['location']}</p>
-        <p style="color:#94A3B8;"><strong>⚠️ Impact:</strong> {alert['impact']}</p>
-        <div style="margin-top:10px;font-size:0.8rem;color:#3B82F6;font-weight:500;">View Details →</div>
-    </div>
-</a>
-                """, unsafe_allow_html=True)
+        st.markdown(render.weather_alerts(alerts[:MAX_ALERT_CARDS]), unsafe_allow_html=True)
+        if len(alerts) > MAX_ALERT_CARDS:
+            st.caption(f"+ {len(alerts) - MAX_ALERT_CARDS} more locations with active alerts")
+    
+    # Disruption windows from the hourly forecast (loads in the background)
+    outlook = get_weather_forecast.peek()
+    if outlook:
+        with st.expander(f"🗓️ 72-hour outlook • {len(outlook)} disruption window{'s' if len(outlook) != 1 else ''}"):
+            st.markdown("\n".join(f"- {'🔴' if window['severity'] == 'High' else '🟠'} {format_window(window)}"
+                                  for window in outlook))
+    elif outlook is not None:
+        st.caption("🗓️ No disruptive weather forecast at key hubs in the next 72 hours.")
     
     # Port Congestion
     st.markdown("## 🚢 Port Congestion Status")
+    freshness_caption("ports")
     
-    ports = get_port_status()
-    cols = st.columns(len(ports))
-    
-    for i, (port, data) in enumerate(ports.items()):
-        with cols[i]:
-            st.markdown(f"""
-<div class="stat-card">
-    <div class="stat-value" style="color:{data['color']}">{data['delay_days']}</div>
-    <div class="stat-label">Days Delay</div>
-    <div style="margin-top:10px;font-weight:600;color:#E2E8F0;">{port}</div>
-    <div style="color:#64748B;font-size:0.85rem;">{data['congestion']} Congestion</div>
-</div>
-            """, unsafe_allow_html=True)
+    if ports:
+        st.markdown(render.port_stats(ports), unsafe_allow_html=True)
     
     # News Sections
     col1, col2 = st.columns(2)
@@ -1415,72 +1222,23 @@ def show_dashboard():
         # Freight Industry News
         st.markdown("## 🚛 Freight Industry News")
         st.caption("XPO, Ryder, Penske, JB Hunt & more")
-        news = get_freight_industry_news()
-        for item in news[:4]:
-            date_str = format_news_date(item)
-            st.markdown(f"""
-<div style="background:#1F2937;padding:12px;border-radius:8px;margin:8px 0;border-left:3px solid #10B981;">
-    <a href="{item.link}" target="_blank" style="color:#10B981;text-decoration:none;font-weight:500;">{item.title}</a>
-    <div style="color:#6B7280;font-size:0.75rem;margin-top:4px;">{date_str}</div>
-</div>
-            """, unsafe_allow_html=True)
+        st.markdown(render.news_list(news_rows((freight_news or [])[:4]), "freight"), unsafe_allow_html=True)
     
     with col2:
         # AI & Tech News
         st.markdown("## 🤖 AI in Supply Chain")
         st.caption("🔥 Trending: Use cases, research, policies & videos • Updates every 5min")
-        news = get_ai_supply_chain_news()
-        for item in news[:4]:
-            date_str = format_news_date(item)
-            trend_icon = getattr(item, 'trend_indicator', '📰')
-            content_type = getattr(item, 'content_type', 'article')
-
-            # Different styling for videos vs articles
-            if content_type == 'video':
-                type_badge = '<span style="background:#DC2626;color:white;padding:2px 6px;border-radius:4px;font-size:0.7rem;margin-left:6px;">VIDEO</span>'
-            else:
-                type_badge = ''
-
-            st.markdown(f"""
-<div style="background:#1F2937;padding:12px;border-radius:8px;margin:8px 0;border-left:3px solid #8B5CF6;">
-    <div style="display:flex;align-items:center;gap:6px;">
-        <span style="font-size:1.1rem;">{trend_icon}</span>
-        <a href="{item.link}" target="_blank" style="color:#8B5CF6;text-decoration:none;font-weight:500;flex:1;">{item.title}</a>
-        {type_badge}
-    </div>
-    <div style="color:#6B7280;font-size:0.75rem;margin-top:4px;">{date_str}</div>
-</div>
-            """, unsafe_allow_html=True)
+        st.markdown(render.ai_news_list(ai_news_rows((ai_news or [])[:4])), unsafe_allow_html=True)
     
     # Policy News
     st.markdown("## 📜 Government & Policy News")
     st.caption("Trade policy, regulations, USMCA, DOT, FMCSA updates")
-    news = get_policy_news()
-    cols = st.columns(2)
-    for i, item in enumerate(news[:6]):
-        with cols[i % 2]:
-            date_str = format_news_date(item)
-            st.markdown(f"""
-<div style="background:#1F2937;padding:12px;border-radius:8px;margin:8px 0;border-left:3px solid #EC4899;">
-    <a href="{item.link}" target="_blank" style="color:#EC4899;text-decoration:none;font-weight:500;">{item.title}</a>
-    <div style="color:#6B7280;font-size:0.75rem;margin-top:4px;">{date_str}</div>
-</div>
-            """, unsafe_allow_html=True)
+    st.markdown(render.news_list(news_rows((policy_news or [])[:6]), "policy", cols=2), unsafe_allow_html=True)
     
     # Disruption News
     st.markdown("## ⚠️ Disruption Alerts")
     st.caption("Port delays, shortages, supply chain crises")
-    news = get_disruption_news()
-    cols = st.columns(2)
-    for i, item in enumerate(news[:6]):
-        with cols[i % 2]:
-            date_str = format_news_date(item)
-            st.markdown(f"""
-<div style="background:#1F2937;padding:12px;border-radius:8px;margin:8px 0;border-left:3px solid #EF4444;">
-    <a href="{item.link}" target="_blank" style="color:#EF4444;text-decoration:none;font-weight:500;">{item.title}</a>
-    <div style="color:#6B7280;font-size:0.75rem;margin-top:4px;">{date_str}</div>
-</div>
-            """, unsafe_allow_html=True)
+    st.markdown(render.news_list(news_rows((disruption_news or [])[:6]), "disruption", cols=2), unsafe_allow_html=True)
     
     # Footer with email CTA
     st.markdown("---")
@@ -1491,52 +1249,85 @@ def show_dashboard():
 </div>
     """, unsafe_allow_html=True)
 
+def news_pager(state_key, items, page_size):
+    """Newest/Older buttons that move a (published time, row) cursor through the news archive"""
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.session_state.get(state_key) is not None:
+            if st.button("⬆️ Newest stories", key=f"{state_key}_newest", use_container_width=True):
+                st.session_state[state_key] = None
+                st.rerun()
+    with col2:
+        if len(items) == page_size:
+            if st.button("Older stories ⬇️", key=f"{state_key}_older", use_container_width=True):
+                st.session_state[state_key] = items[-1].page_key
+                st.rerun()
+
+NEWS_PAGE_SIZE = 20
+
+NEWS_CATEGORY_LABELS = {
+    "freight": "🚛 Freight Industry",
+    "ai": "🤖 AI & Tech",
+    "policy": "📜 Policy",
+    "disruption": "⚠️ Disruptions",
+}
+
+SEARCH_WINDOWS = {"Any time": None, "Past 24 hours": 1, "Past week": 7, "Past month": 30}
+
+def show_news_search(query):
+    """Ranked archive search results with category and date facets"""
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        window = st.selectbox("Published", list(SEARCH_WINDOWS), key="news_search_window")
+    days = SEARCH_WINDOWS[window]
+    since_ts = (datetime.now() - timedelta(days=days)).timestamp() if days else None
+
+    # Facet counts cover every category, so they come from an unfiltered query
+    _, facets = search_news(query, since_ts=since_ts, limit=1)
+    with col1:
+        categories = st.multiselect(
+            "Categories", list(NEWS_CATEGORY_LABELS),
+            format_func=lambda c: f"{NEWS_CATEGORY_LABELS[c]} ({facets.get(c, 0)})",
+            key="news_search_categories")
+    results, _ = search_news(query, categories=categories or None, since_ts=since_ts, limit=30)
+
+    total = sum(facets.get(c, 0) for c in (categories or facets))
+    st.caption(f"{total} matching stories • best matches first")
+    if not results:
+        st.info("No stories match your search. Try fewer words or a wider date range.")
+    st.markdown(render.news_cards(
+        [(item.title, item.link, f"{NEWS_CATEGORY_LABELS.get(item.category, item.category)} • {format_news_date(item)}")
+         for item in results], "info"), unsafe_allow_html=True)
+
 def show_news_page():
     """All news page"""
     st.markdown("# 📰 All Supply Chain News")
+    freshness_caption("news:freight", "news:ai", "news:policy", "news:disruption")
+
+    query = st.text_input("🔍 Search the news archive", placeholder='e.g. "port strike" OR tariffs', key="news_search")
+    if query.strip():
+        show_news_search(query)
+        return
     
     tab1, tab2, tab3, tab4 = st.tabs(["🚛 Freight Industry", "🤖 AI & Tech", "📜 Policy", "⚠️ Disruptions"])
     
     with tab1:
-        news = get_freight_industry_news()
-        for item in news:
-            date_str = format_news_date(item)
-            st.markdown(f"""
-<div class="alert-card info">
-    <a href="{item.link}" target="_blank" style="color:#10B981;text-decoration:none;font-weight:600;font-size:1.1rem;">{item.title}</a>
-    <p style="color:#94A3B8;font-size:0.85rem;margin-top:8px;">{date_str}</p>
-</div>
-            """, unsafe_allow_html=True)
+        news = get_freight_industry_news(limit=NEWS_PAGE_SIZE, before=st.session_state.get("freight_cursor"))
+        st.markdown(render.news_cards(news_rows(news), "info"), unsafe_allow_html=True)
+        news_pager("freight_cursor", news, NEWS_PAGE_SIZE)
     
     with tab2:
         st.markdown("### 🔥 Trending AI in Supply Chain")
         st.caption("📊 Updates Every 5 Minutes • Articles, Videos, Research & Policies")
 
         # Get all news and categorize by time period
-        all_news = get_ai_supply_chain_news()
+        all_news = get_ai_supply_chain_news(limit=60)
         day_news, week_news, month_news = categorize_by_time_period(all_news)
 
-        # Helper function to render news items
-        def render_news_item(item):
-            date_str = format_news_date(item)
-            trend_icon = getattr(item, 'trend_indicator', '📰')
-            content_type = getattr(item, 'content_type', 'article')
-
-            if content_type == 'video':
-                type_badge = '<span style="background:#DC2626;color:white;padding:3px 8px;border-radius:4px;font-size:0.75rem;margin-left:8px;font-weight:600;">🎥 VIDEO</span>'
-                border_color = "#DC2626"
-            else:
-                type_badge = ''
-                border_color = "#8B5CF6"
-
-            # Condensed HTML to single line to avoid rendering issues
-            return f'<div class="alert-card ai" style="border-left:4px solid {border_color};margin-bottom:12px;"><div style="display:flex;align-items:flex-start;gap:8px;"><span style="font-size:1.3rem;margin-top:2px;">{trend_icon}</span><div style="flex:1;"><a href="{item.link}" target="_blank" style="color:#8B5CF6;text-decoration:none;font-weight:600;font-size:1.05rem;">{item.title}</a>{type_badge}<p style="color:#94A3B8;font-size:0.8rem;margin-top:6px;">{date_str}</p></div></div></div>'
-
         # Day Trending
         st.markdown("#### 🔴 Today's Trending")
         if day_news:
-            for item in day_news[:5]:
-                st.markdown(render_news_item(item), unsafe_allow_html=True)
+            st.markdown(render.ai_news_cards(ai_news_rows(day_news[:5])), unsafe_allow_html=True)
         else:
             st.info("No stories published today yet. Check week or month trending below.")
 
@@ -1545,8 +1336,7 @@ def show_news_page():
         # Week Trending
         st.markdown("#### 📈 This Week's Trending")
         if week_news:
-            for item in week_news[:6]:
-                st.markdown(render_news_item(item), unsafe_allow_html=True)
+            st.markdown(render.ai_news_cards(ai_news_rows(week_news[:6])), unsafe_allow_html=True)
         else:
             st.info("No stories from this week. Check month trending below.")
 
@@ -1555,32 +1345,19 @@ def show_news_page():
         # Month Trending
         st.markdown("#### 📊 This Month's Trending")
         if month_news:
-            for item in month_news[:6]:
-                st.markdown(render_news_item(item), unsafe_allow_html=True)
+            st.markdown(render.ai_news_cards(ai_news_rows(month_news[:6])), unsafe_allow_html=True)
         else:
             st.info("No stories from this month available.")
     
     with tab3:
-        news = get_policy_news()
-        for item in news:
-            date_str = format_news_date(item)
-            st.markdown(f"""
-<div class="alert-card policy">
-    <a href="{item.link}" target="_blank" style="color:#EC4899;text-decoration:none;font-weight:600;font-size:1.1rem;">{item.title}</a>
-    <p style="color:#94A3B8;font-size:0.85rem;margin-top:8px;">{date_str}</p>
-</div>
-            """, unsafe_allow_html=True)
+        news = get_policy_news(limit=NEWS_PAGE_SIZE, before=st.session_state.get("policy_cursor"))
+        st.markdown(render.news_cards(news_rows(news), "policy"), unsafe_allow_html=True)
+        news_pager("policy_cursor", news, NEWS_PAGE_SIZE)
     
     with tab4:
-        news = get_disruption_news()
-        for item in news:
-            date_str = format_news_date(item)
-            st.markdown(f"""
-<div class="alert-card">
-    <a href="{item.link}" target="_blank" style="color:#EF4444;text-decoration:none;font-weight:600;font-size:1.1rem;">{item.title}</a>
-    <p style="color:#94A3B8;font-size:0.85rem;margin-top:8px;">{date_str}</p>
-</div>
-            """, unsafe_allow_html=True)
+        news = get_disruption_news(limit=NEWS_PAGE_SIZE, before=st.session_state.get("disruption_cursor"))
+        st.markdown(render.news_cards(news_rows(news), "disruption"), unsafe_allow_html=True)
+        news_pager("disruption_cursor", news, NEWS_PAGE_SIZE)
 
 def show_about_page():
     """About page"""
@@ -1614,3 +1391,4 @@ def show_about_page():
 
 if __name__ == "__main__":
     main()
+    startup.finish()
@@ -0,0 +1 @@
+"""SupplyAlert data layer (fetching, caching and storage behind app.py)"""
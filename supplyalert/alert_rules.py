@@ -0,0 +1,309 @@
+"""
+Custom alert rules: watchlists matched against live events.
+
+A rule watches any mix of hubs (facility ids), ports, lanes (a lane watches
+both of its ends), keywords and event kinds (weather, port, article), with
+an optional minimum severity. Within one of those a rule matches any listed
+value; across them all must hold. Rules belong to an owner and are stored
+in SQLite.
+
+Every new weather alert, port observation and archived article is published
+as an Event. Matching never walks the rule list: rules are indexed by
+location and by keyword (first word of a phrase, or a prefix for 'word*'),
+so an event only looks up its own locations and the words of its text, and
+only rules sharing one of them become candidates. Plurals match either
+way: keywords are also indexed under their singular forms, so a rule for
+"ports" catches "port" just as one for "port" catches "ports". Kind and
+severity are checked on those candidates. Rules with neither a location nor
+a keyword live in buckets by (kind, minimum severity) and match without any
+check.
+Per-event cost therefore grows with the event's size and the number of
+matches, not with the number of rules.
+
+Matches are stored as notifications, once per rule and event key.
+"""
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+
+from supplyalert import storage
+
+NOTIFICATION_RETENTION = 7 * 86400   # seconds a notification is kept
+PRUNE_INTERVAL = 3600
+
+SEVERITIES = ("Low", "Medium", "High", "Critical")
+KINDS = ("weather", "port", "article")
+
+Event = namedtuple("Event", "kind key title text locations severity")
+Notification = namedtuple("Notification", "id rule_id rule_name kind title severity created_at")
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _word_forms(word):
+    """The word and its singular candidates, matching KeywordMatcher's plural handling"""
+    forms = [word]
+    if word.endswith("s"):
+        forms.append(word[:-1])
+    if word.endswith("es"):
+        forms.append(word[:-2])
+    return forms
+
+
+def _same_word(a, b):
+    """True if two words share a form, so 'port' and 'ports' are one word whichever side is plural"""
+    return not set(_word_forms(a)).isdisjoint(_word_forms(b))
+
+
+class Rule:
+    """A stored rule compiled to its index keys"""
+
+    __slots__ = ("id", "owner", "name", "spec", "locations", "keywords", "prefixes", "kinds", "min_level")
+
+    def __init__(self, rule_id, owner, name, spec):
+        self.id = rule_id
+        self.owner = owner
+        self.name = name
+        self.spec = spec
+        locations = set(spec.get("hubs", ())) | set(spec.get("ports", ()))
+        for a, b in spec.get("lanes", ()):
+            locations.update((a, b))
+        self.locations = frozenset(locations)
+        self.keywords = []   # word tuples; phrases are several words
+        self.prefixes = []
+        for keyword in spec.get("keywords", ()):
+            words = tuple(_WORD.findall(keyword.lower()))
+            if not words:
+                continue
+            if keyword.strip().endswith("*") and len(words) == 1:
+                self.prefixes.append(words[0])
+            else:
+                self.keywords.append(words)
+        self.kinds = frozenset(spec.get("kinds", ())) or None
+        severity = spec.get("min_severity")
+        self.min_level = SEVERITIES.index(severity) if severity in SEVERITIES else 0
+
+    def accepts(self, event_kind, event_level):
+        return (self.kinds is None or event_kind in self.kinds) and event_level >= self.min_level
+
+
+class RuleEngine:
+    """Indexed rule set plus notification store"""
+
+    def __init__(self, db_name="alert_rules.sqlite"):
+        self._conn = storage.connect(db_name)
+        self._lock = threading.Lock()
+        self._rules = {}
+        self._by_location = {}   # location -> rule ids
+        self._by_word = {}       # first word -> {following words: rule ids}
+        self._by_prefix = {}     # prefix -> rule ids
+        self._open = {}          # (kind or None, min level) -> rule ids without location or keyword
+        self._pruned_at = 0
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rules (
+                    id INTEGER PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    spec TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS rules_owner ON rules (owner);
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    rule_id INTEGER NOT NULL,
+                    event_key TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    severity TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (rule_id, event_key)
+                );
+                CREATE INDEX IF NOT EXISTS notifications_owner ON notifications (owner, id);
+            """)
+            self._conn.commit()
+            for rule_id, owner, name, spec in self._conn.execute("SELECT id, owner, name, spec FROM rules"):
+                self._index(Rule(rule_id, owner, name, json.loads(spec)))
+
+    def __len__(self):
+        return len(self._rules)
+
+    # --- INDEX ---
+
+    def _index(self, rule):
+        self._rules[rule.id] = rule
+        for location in rule.locations:
+            self._by_location.setdefault(location, set()).add(rule.id)
+        for words in rule.keywords:
+            for form in _word_forms(words[0]):   # a rule for "ports" is found from "port" too
+                self._by_word.setdefault(form, {}).setdefault(words[1:], set()).add(rule.id)
+        for prefix in rule.prefixes:
+            self._by_prefix.setdefault(prefix, set()).add(rule.id)
+        if not rule.locations and not rule.keywords and not rule.prefixes:
+            for kind in rule.kinds or (None,):
+                self._open.setdefault((kind, rule.min_level), set()).add(rule.id)
+
+    def _unindex(self, rule):
+        del self._rules[rule.id]
+        for location in rule.locations:
+            self._by_location[location].discard(rule.id)
+        for words in rule.keywords:
+            for form in _word_forms(words[0]):
+                self._by_word[form][words[1:]].discard(rule.id)
+        for prefix in rule.prefixes:
+            self._by_prefix[prefix].discard(rule.id)
+        for kind in rule.kinds or (None,):
+            self._open.get((kind, rule.min_level), set()).discard(rule.id)
+
+    def _keyword_hits(self, text):
+        words = _WORD.findall(text.lower())
+        hits = set()
+        for i, word in enumerate(words):
+            for form in _word_forms(word):
+                for rest, ids in self._by_word.get(form, {}).items():
+                    following = words[i + 1:i + 1 + len(rest)]
+                    if len(following) == len(rest) and all(
+                            _same_word(expected, actual) for expected, actual in zip(rest, following)):
+                        hits |= ids
+            if self._by_prefix:
+                for end in range(1, len(word) + 1):
+                    hits |= self._by_prefix.get(word[:end], set())
+        return hits
+
+    def match(self, event):
+        """Ids of the rules an event matches"""
+        level = SEVERITIES.index(event.severity) if event.severity in SEVERITIES else 0
+        with self._lock:
+            at_location = set()
+            for location in event.locations:
+                at_location |= self._by_location.get(location, set())
+            with_keyword = self._keyword_hits(f"{event.title} {event.text}")
+            matched = set()
+            for rule_id in at_location | with_keyword:
+                rule = self._rules[rule_id]
+                if ((not rule.locations or rule_id in at_location)
+                        and (not (rule.keywords or rule.prefixes) or rule_id in with_keyword)
+                        and rule.accepts(event.kind, level)):
+                    matched.add(rule_id)
+            for kind in (event.kind, None):
+                for min_level in range(level + 1):
+                    matched |= self._open.get((kind, min_level), set())
+        return matched
+
+    # --- RULES ---
+
+    def add_rule(self, owner, name, hubs=(), ports=(), lanes=(), keywords=(), kinds=(), min_severity=None):
+        """Store and index a rule; returns its id"""
+        spec = {"hubs": list(hubs), "ports": list(ports), "lanes": [list(lane) for lane in lanes],
+                "keywords": [k.strip() for k in keywords if k.strip()],
+                "kinds": [kind for kind in kinds if kind in KINDS], "min_severity": min_severity}
+        with self._lock:
+            cursor = self._conn.execute("INSERT INTO rules (owner, name, spec, created_at) VALUES (?, ?, ?, ?)",
+                                        (owner, name, json.dumps(spec), time.time()))
+            self._conn.commit()
+            rule = Rule(cursor.lastrowid, owner, name, spec)
+            self._index(rule)
+        return rule.id
+
+    def remove_rule(self, rule_id, owner):
+        """Delete one of an owner's rules; True if it existed"""
+        with self._lock:
+            rule = self._rules.get(rule_id)
+            if rule is None or rule.owner != owner:
+                return False
+            self._conn.execute("DELETE FROM rules WHERE id = ?", (rule_id,))
+            self._conn.commit()
+            self._unindex(rule)
+            return True
+
+    def rules(self, owner):
+        """An owner's rules as (id, name, spec), oldest first"""
+        with self._lock:
+            return [(rule.id, rule.name, rule.spec) for rule in sorted(self._rules.values(), key=lambda r: r.id)
+                    if rule.owner == owner]
+
+    # --- NOTIFICATIONS ---
+
+    def publish(self, events):
+        """Match events and store a notification per new (rule, event); returns the count stored"""
+        rows = []
+        now = time.time()
+        for event in events:
+            for rule_id in self.match(event):
+                rule = self._rules.get(rule_id)
+                if rule is not None:  # not removed since the match
+                    rows.append((rule.owner, rule_id, event.key, event.kind, event.title,
+                                 event.severity or "Low", now))
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("""
+                INSERT OR IGNORE INTO notifications (owner, rule_id, event_key, kind, title, severity, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            stored = self._conn.total_changes - before
+            if now - self._pruned_at > PRUNE_INTERVAL:
+                self._conn.execute("DELETE FROM notifications WHERE created_at < ?", (now - NOTIFICATION_RETENTION,))
+                self._pruned_at = now
+            self._conn.commit()
+        return stored
+
+    def notifications(self, owner, limit=20, after_id=0):
+        """An owner's newest notifications (after a given id), newest first"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT n.id, n.rule_id, COALESCE(r.name, ''), n.kind, n.title, n.severity, n.created_at
+                FROM notifications n LEFT JOIN rules r ON r.id = n.rule_id
+                WHERE n.owner = ? AND n.id > ? ORDER BY n.id DESC LIMIT ?
+            """, (owner, after_id, limit)).fetchall()
+        return [Notification(*row) for row in rows]
+
+
+# --- EVENTS ---
+
+def weather_events(alerts):
+    """Events for weather alerts at monitored facilities; one per alert, location and UTC day"""
+    day = time.strftime("%Y-%m-%d", time.gmtime())
+    return [Event("weather", f"weather:{day}:{alert['location']}:{alert['type']}", f"{alert['type']} at {alert['location']}",
+                  alert.get("impact", ""), frozenset(alert["facilities"]), alert["severity"])
+            for alert in alerts if alert.get("facilities")]
+
+
+def port_events(observations):
+    """Events for new port observations: (port, ts, delay_days, congestion, note)"""
+    return [Event("port", f"port:{port}:{ts}", f"{port}: {congestion} congestion, {delay:g} days delay",
+                  note or "", frozenset((port,)), congestion)
+            for port, ts, delay, congestion, note in observations]
+
+
+def article_events(category, articles):
+    """Events for newly archived articles: (article key, title, summary)"""
+    return [Event("article", f"article:{category}:{key}", title, summary, frozenset(), None)
+            for key, title, summary in articles]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide rule engine, loaded on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RuleEngine()
+        return _engine
+
+
+def publish(events):
+    """Publish events from a data source; matching problems never reach the source"""
+    if not events:
+        return 0
+    try:
+        return get_engine().publish(events)
+    except Exception:
+        return 0
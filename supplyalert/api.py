@@ -0,0 +1,360 @@
+"""
+Headless JSON API over the data layer.
+
+A standalone stdlib HTTP server for internal tools, so nothing has to scrape
+(and rerun) the Streamlit app:
+
+    python -m supplyalert.api        # port SUPPLYALERT_API_PORT, default 8502
+
+    GET /v1/weather             current weather alerts
+    GET /v1/weather/forecast    72-hour disruption windows
+    GET /v1/ports               port congestion status
+    GET /v1/news/<category>     freight | policy | ai | disruption, paginated
+    GET /v1/jobs                job listings, paginated
+    GET /v1/health              source freshness and hit/miss counters (never cached)
+    POST /v1/admin/refresh/<source>   force-refresh one source (X-Admin-Key)
+
+It reads through the same refresher sources, news archive and stores as the
+app, in the same data directory. Being a separate process, though, it runs
+its own refresher and fetches the sources it serves on its own schedule,
+as one more replica would; set SUPPLYALERT_SHARED_CACHE (see shared_cache)
+for it and the app to share those fetches.
+
+Each response is built once per (path, query, source version): the JSON
+body, its ETag and a gzipped copy are kept until the source refreshes, and
+a request carrying the current ETag in If-None-Match gets a bodyless 304.
+
+Paginated endpoints take `limit` (up to MAX_PAGE_SIZE) and an opaque
+`cursor` from the previous page's `next_cursor`. With SUPPLYALERT_API_KEYS
+set, requests need one of those keys (X-API-Key header or `api_key`
+parameter). Each key, or client address without keys, gets a token bucket
+of SUPPLYALERT_API_RATE requests per second; over it, requests get 429 with
+Retry-After.
+
+The admin endpoint only exists when SUPPLYALERT_ADMIN_KEY is set, and needs
+that key in X-Admin-Key. It re-fetches a single source (e.g. weather or
+news:ai) in this process and leaves the others alone.
+"""
+import base64
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from supplyalert import news, refresher
+from supplyalert.jobs import get_supply_chain_ai_jobs
+from supplyalert.ports import get_port_status
+from supplyalert.weather import get_weather_alerts, get_weather_forecast
+
+API_PORT = int(os.getenv("SUPPLYALERT_API_PORT", "8502"))
+API_KEYS = {key.strip() for key in os.getenv("SUPPLYALERT_API_KEYS", "").split(",") if key.strip()}
+RATE_PER_SECOND = float(os.getenv("SUPPLYALERT_API_RATE", "20"))
+RATE_BURST = 2 * RATE_PER_SECOND
+ADMIN_KEY = os.getenv("SUPPLYALERT_ADMIN_KEY")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+GZIP_MIN_BYTES = 1024    # smaller bodies aren't worth compressing
+RESPONSE_CACHE_SIZE = 512
+MAX_BUCKETS = 10000      # rate-limit buckets kept; the least recently used go first
+MAX_AGE = 30             # Cache-Control max-age; clients revalidate with the ETag after that
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- RATE LIMITING ---
+
+class RateLimiter:
+    """
+    Token bucket per key. Buckets are kept in last-use order; one idle long
+    enough to have refilled is indistinguishable from a new one and is
+    dropped, and beyond max_buckets the least recently used go too.
+    """
+
+    def __init__(self, rate=RATE_PER_SECOND, burst=RATE_BURST, max_buckets=MAX_BUCKETS):
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()   # key -> (tokens, last refill), least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def allow(self, key):
+        """(True, 0) if a request may proceed, else (False, seconds until it may)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            self._evict(now)
+        return (True, 0) if allowed else (False, (1 - tokens) / self.rate)
+
+    def _evict(self, now):
+        refill_time = self.burst / self.rate
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last <= refill_time and len(self._buckets) <= self.max_buckets:
+                break
+            del self._buckets[key]
+
+
+# --- PAYLOADS ---
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts is not None else None
+
+
+def _encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        value = None
+    if not isinstance(value, dict):
+        raise ApiError(400, "invalid cursor")
+    return value
+
+
+def _page_size(params):
+    try:
+        limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(400, "limit must be an integer")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _article(item):
+    return {"title": item.title, "link": item.link, "source": item.source, "category": item.category,
+            "published": _iso(item.published_ts), "content_type": item.content_type,
+            "trend_indicator": item.trend_indicator}
+
+
+def _job(job):
+    job = dict(job)
+    if isinstance(job.get("date"), datetime):
+        job["date"] = job["date"].isoformat()
+    return job
+
+
+def _snapshot_endpoint(fetch):
+    """Endpoint serving a refreshed source's whole snapshot"""
+    def endpoint(params):
+        data = fetch()
+        version = refresher.updated_at(fetch.source_name)
+        if version is None:
+            raise ApiError(503, "no data yet, the first fetch failed; retry shortly")
+        return version, lambda: {"data": data, "updated_at": _iso(version)}
+    return endpoint
+
+
+def news_endpoint(params, category):
+    if category not in news.INGESTERS:
+        raise ApiError(404, f"unknown news category {category!r}")
+    limit = _page_size(params)
+    before = None
+    if params.get("cursor"):
+        cursor = _decode_cursor(params["cursor"])
+        if not isinstance(cursor.get("ts"), (int, float)) or not isinstance(cursor.get("id"), int):
+            raise ApiError(400, "invalid cursor")
+        before = (cursor["ts"], cursor["id"])
+    news.ensure_fresh(category)
+    version = refresher.updated_at(f"news:{category}")
+
+    def build():
+        items = news.get_news(category, limit, before)
+        # Same keyset as the news pages: the next page starts after the last item's (time, row)
+        next_cursor = None
+        if len(items) == limit:
+            ts, rowid = items[-1].page_key
+            next_cursor = _encode_cursor({"ts": ts, "id": rowid})
+        return {"data": [_article(item) for item in items], "next_cursor": next_cursor, "updated_at": _iso(version)}
+    return version, build
+
+
+def jobs_endpoint(params):
+    limit = _page_size(params)
+    offset = _decode_cursor(params["cursor"]).get("offset", 0) if params.get("cursor") else 0
+    if not isinstance(offset, int) or offset < 0:
+        raise ApiError(400, "invalid cursor")
+    jobs = get_supply_chain_ai_jobs()
+    version = refresher.updated_at(get_supply_chain_ai_jobs.source_name)
+
+    def build():
+        page = jobs[offset:offset + limit]
+        next_cursor = _encode_cursor({"offset": offset + limit}) if offset + limit < len(jobs) else None
+        return {"data": [_job(job) for job in page], "next_cursor": next_cursor, "updated_at": _iso(version)}
+    return version, build
+
+
+def health_endpoint(params):
+    return None, lambda: {"sources": refresher.freshness()}
+
+
+ROUTES = {
+    "/v1/weather": _snapshot_endpoint(get_weather_alerts),
+    "/v1/weather/forecast": _snapshot_endpoint(get_weather_forecast),
+    "/v1/ports": _snapshot_endpoint(get_port_status),
+    "/v1/jobs": jobs_endpoint,
+    "/v1/health": health_endpoint,
+}
+
+
+# Source name -> call registering it with the refresher (sources register on first read)
+SOURCES = {fetch.source_name: fetch.peek
+           for fetch in (get_weather_alerts, get_weather_forecast, get_port_status, get_supply_chain_ai_jobs)}
+SOURCES.update({f"news:{category}": (lambda category=category: news.ensure_fresh(category, wait=False))
+                for category in news.INGESTERS})
+
+
+def admin_refresh(name):
+    """Force-refresh one source; whether a new snapshot landed, and its freshness afterwards"""
+    register = SOURCES.get(name)
+    if register is None:
+        raise ApiError(404, f"unknown source {name!r}")
+    register()
+    refreshed = refresher.force_refresh(name)
+    row = next(row for row in refresher.freshness() if row["source"] == name)
+    return {"refreshed": refreshed, "source": row}
+
+
+def resolve(path):
+    """Endpoint function for a request path"""
+    if path in ROUTES:
+        return ROUTES[path]
+    if path.startswith("/v1/news/"):
+        category = unquote(path[len("/v1/news/"):])
+        return lambda params: news_endpoint(params, category)
+    raise ApiError(404, "not found")
+
+
+# --- RESPONSES ---
+
+_responses = OrderedDict()   # (path, query, version) -> (etag, body, gzipped body or None)
+_responses_lock = threading.Lock()
+
+
+def render(path, params):
+    """(etag, body, gzipped body or None), built once per source version"""
+    version, build = resolve(path)(params)
+    key = (path, tuple(sorted(params.items())), version)
+    if version is not None:
+        with _responses_lock:
+            cached = _responses.get(key)
+            if cached is not None:
+                _responses.move_to_end(key)
+                return cached
+    body = json.dumps(build(), default=str, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    response = (etag, body, gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None)
+    if version is not None:
+        with _responses_lock:
+            _responses[key] = response
+            while len(_responses) > RESPONSE_CACHE_SIZE:
+                _responses.popitem(last=False)
+    return response
+
+
+_limiter = RateLimiter()
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "SupplyAlertAPI/1.0"
+    protocol_version = "HTTP/1.1"   # keep-alive, so high-QPS clients reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        key = self.headers.get("X-API-Key") or params.pop("api_key", None)
+        try:
+            if API_KEYS and key not in API_KEYS:
+                raise ApiError(401, "missing or unknown API key")
+            # Unknown keys cost nothing to invent, so only configured ones get their own bucket
+            allowed, retry_after = _limiter.allow(key if key in API_KEYS else self.client_address[0])
+            if not allowed:
+                self._send_json(429, {"error": "rate limit exceeded"}, {"Retry-After": str(max(1, round(retry_after)))})
+                return
+            etag, body, gzipped = render(url.path.rstrip("/") or "/", params)
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(502, {"error": f"data source unavailable: {type(e).__name__}"})
+            return
+
+        headers = {"ETag": etag, "Cache-Control": f"max-age={MAX_AGE}", "Vary": "Accept-Encoding"}
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self._send(304, b"", headers)
+            return
+        if gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = gzipped
+        headers["Content-Type"] = "application/json"
+        self._send(200, body, headers)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))  # keep the connection in sync
+        path = urlsplit(self.path).path.rstrip("/")
+        prefix = "/v1/admin/refresh/"
+        if not ADMIN_KEY or not path.startswith(prefix):
+            self._send_json(404, {"error": "not found"})
+            return
+        if not hmac.compare_digest(self.headers.get("X-Admin-Key", ""), ADMIN_KEY):
+            self._send_json(401, {"error": "missing or wrong admin key"})
+            return
+        try:
+            self._send_json(200, admin_refresh(unquote(path[len(prefix):])))
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+
+    def _send_json(self, status, payload, headers=None):
+        headers = dict(headers or {})
+        headers["Content-Type"] = "application/json"
+        self._send(status, json.dumps(payload).encode("utf-8"), headers)
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if os.getenv("SUPPLYALERT_API_LOG"):
+            super().log_message(format, *args)
+
+
+def serve(port=API_PORT):
+    """Run the API until interrupted"""
+    server = ThreadingHTTPServer(("", port), ApiHandler)
+    server.daemon_threads = True
+    print(f"SupplyAlert API listening on :{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
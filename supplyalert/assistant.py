@@ -0,0 +1,243 @@
+"""
+OpenRouter calls for the AI assistant, behind a response cache.
+
+Answers are cached per (normalized question, live-context version), so the
+same question asked against the same data is answered once and then served
+from memory until the context changes or the entry expires. Set
+SUPPLYALERT_LLM_CACHE_DISK=1 to also keep answers in SQLite across restarts.
+
+The canned example questions are pre-warmed in the background once per
+context version, so clicking one is instant and spends no quota on the
+request path. Completions are single-flight per (question, version): a
+click on a question that is still being pre-warmed waits for that call
+(up to INFLIGHT_WAIT) instead of sending a second identical request.
+
+`stream()` consumes OpenRouter's server-sent events and yields text as it
+arrives, so the first tokens reach the page long before the completion ends.
+"""
+import json
+import os
+import threading
+import time
+
+from supplyalert import chat_context, fetch_engine, http_client
+from supplyalert.response_cache import ResponseCache
+
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+MODEL = "google/gemma-3-27b-it:free"
+MAX_TOKENS = 1500
+
+REFERENCES = "\n\n---\n📚 **Sources:** SupplyAlert Live Data | Google News RSS | [weather.gov](https://weather.gov) | [DOT](https://www.transportation.gov)"
+
+CACHE_TTL = 1800              # seconds an answer stays valid for its context version
+CACHE_MAX_ENTRIES = 256
+INFLIGHT_WAIT = 90            # seconds to wait on an identical completion in flight
+
+
+class AssistantError(Exception):
+    """The completion could not be produced (HTTP error, rate limit, bad payload)"""
+
+
+_api_key = None
+
+
+def configure(api_key):
+    """Set the OpenRouter key (read from Streamlit secrets or .env by app.py)"""
+    global _api_key
+    _api_key = api_key
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def response_cache():
+    """Process-wide answer cache, created on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            db_name = "llm_cache.sqlite" if os.getenv("SUPPLYALERT_LLM_CACHE_DISK") == "1" else None
+            _cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_TTL, db_name)
+        return _cache
+
+
+def _post(user_input, snapshot, stream=False):
+    """Chat completion request against a context snapshot; raises AssistantError on HTTP errors"""
+    response = http_client.post(
+        OPENROUTER_API_URL,
+        headers={
+            "Authorization": f"Bearer {_api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://supplyalert.streamlit.app",
+            "X-Title": "SupplyAlert"
+        },
+        json={
+            "model": MODEL,
+            "messages": [
+                {"role": "system", "content": chat_context.system_prompt(snapshot)},
+                {"role": "user", "content": user_input}
+            ],
+            "max_tokens": MAX_TOKENS,
+            "temperature": 0.7,
+            "stream": stream
+        },
+        timeout=(5, 60),  # with stream=True the read timeout applies between chunks
+        stream=stream,
+        retries=1
+    )
+    if response.status_code != 200:
+        response.close()
+        raise AssistantError(f"HTTP {response.status_code}")
+    return response
+
+
+def _complete(user_input, snapshot):
+    """One blocking completion, with the sources footer"""
+    response = _post(user_input, snapshot)
+    try:
+        return response.json()["choices"][0]["message"]["content"] + REFERENCES
+    except Exception as e:
+        raise AssistantError(f"unexpected response: {e}")
+
+
+def _sse_deltas(response):
+    """Text deltas from an OpenAI-style server-sent-event stream"""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or line.startswith(":"):
+            continue  # keep-alive / OpenRouter "PROCESSING" comments
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            continue
+        if "error" in payload:
+            raise AssistantError(payload["error"].get("message", "stream error"))
+        choices = payload.get("choices") or [{}]
+        delta = choices[0].get("delta", {}).get("content")
+        if delta:
+            yield delta
+    raise AssistantError("stream ended without [DONE]")
+
+
+# --- SINGLE-FLIGHT ---
+
+_inflight = {}   # ResponseCache.key(question, version) -> Event set when the completion ends
+_inflight_lock = threading.Lock()
+
+
+def _land(key, flight):
+    with _inflight_lock:
+        if _inflight.get(key) is flight:
+            del _inflight[key]
+    flight.set()
+
+
+def _lookup(user_input, version):
+    """
+    Cached answer for (question, version), waiting out an identical completion
+    already in flight. Returns (answer, release); on a miss the caller makes
+    the completion and must call release() once it has cached it or failed.
+    """
+    cache = response_cache()
+    key = ResponseCache.key(user_input, version)
+    deadline = time.monotonic() + INFLIGHT_WAIT
+    while True:
+        answer = cache.get(user_input, version)
+        if answer is not None:
+            return answer, None
+        with _inflight_lock:
+            flight = _inflight.get(key)
+            if flight is None:
+                flight = _inflight[key] = threading.Event()
+                break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not flight.wait(remaining):
+            return None, lambda: None  # the other call is stuck; don't wait on it any longer
+        # Landed: cached now, or it failed and this caller takes over
+    answer = cache.get(user_input, version)  # cached between the miss and the claim
+    if answer is not None:
+        _land(key, flight)
+        return answer, None
+    return None, lambda: _land(key, flight)
+
+
+def ask(user_input):
+    """Answer with the sources footer, from cache when the context hasn't changed"""
+    if not _api_key:
+        raise AssistantError("OpenRouter API key not configured")
+    snapshot = chat_context.current()
+    answer, release = _lookup(user_input, snapshot.version)
+    if answer is not None:
+        return answer
+    try:
+        answer = _complete(user_input, snapshot)
+        response_cache().put(user_input, snapshot.version, answer)
+    finally:
+        release()
+    return answer
+
+
+def stream(user_input):
+    """
+    Yield the answer in pieces as OpenRouter produces them, then the sources
+    footer. A cached answer is yielded whole. The full text is cached only
+    if the stream completes; AssistantError is raised otherwise.
+    """
+    if not _api_key:
+        raise AssistantError("OpenRouter API key not configured")
+    snapshot = chat_context.current()
+    answer, release = _lookup(user_input, snapshot.version)
+    if answer is not None:
+        yield answer
+        return
+    try:
+        parts = []
+        response = _post(user_input, snapshot, stream=True)
+        try:
+            for delta in _sse_deltas(response):
+                parts.append(delta)
+                yield delta
+        finally:
+            response.close()
+        response_cache().put(user_input, snapshot.version, "".join(parts) + REFERENCES)
+    finally:
+        release()
+    yield REFERENCES
+
+
+# --- PRE-WARMING ---
+
+_prewarmed_version = None
+_prewarm_running = False
+_prewarm_lock = threading.Lock()
+
+
+def _prewarm(questions):
+    global _prewarm_running
+    try:
+        for question in questions:
+            try:
+                ask(question)
+            except Exception:
+                break  # rate-limited or down; the next context change tries again
+    finally:
+        with _prewarm_lock:
+            _prewarm_running = False
+
+
+def prewarm(questions):
+    """Answer questions in the background once per context version"""
+    global _prewarmed_version, _prewarm_running
+    if not _api_key:
+        return
+    version = chat_context.current().version
+    with _prewarm_lock:
+        if _prewarm_running or version == _prewarmed_version:
+            return  # a pass still running leaves a newer version to the next call
+        _prewarmed_version = version
+        _prewarm_running = True
+    fetch_engine.submit_source(_prewarm, list(questions))
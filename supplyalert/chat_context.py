@@ -0,0 +1,152 @@
+"""
+Versioned live-data context for the AI assistant.
+
+Chat turns used to walk five fetchers and rebuild the whole system prompt on
+every message. The context is now a snapshot built from what the refresher
+and the news archive already hold (no network calls on the chat path), and
+rebuilt only when one of its sources has refreshed since the last build.
+
+Sections are added in priority order (weather alerts, ports, the 72-hour
+weather outlook, risk-weighted routes on key lanes, disruption news, then
+freight and policy news) line by line until the token budget is spent,
+so the prompt stays bounded as sources grow and the lowest-priority lines
+are the ones dropped. Each snapshot carries a version id (a hash of its
+text) that changes only when the content does.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+
+from supplyalert import lanes, news, refresher
+from supplyalert.ports import get_port_status
+from supplyalert.weather import format_window, get_weather_alerts, get_weather_forecast
+
+# Rough prompt budget for live data; ~4 characters per token for English text
+CONTEXT_TOKEN_BUDGET = int(os.getenv("SUPPLYALERT_CONTEXT_TOKENS", "1200"))
+CHARS_PER_TOKEN = 4
+
+CONTEXT_SOURCES = ("weather", "ports", "weather_forecast", "news:disruption", "news:freight", "news:policy")
+
+SYSTEM_PROMPT = """You are SupplyAlert AI, an expert supply chain intelligence assistant.
+
+Your role:
+1. Analyze supply chain data and provide actionable insights
+2. Explain correlations (e.g., how weather affects ports, trucking, delays)
+3. Provide specific recommendations for logistics professionals
+4. ALWAYS cite sources and provide references when possible
+5. Use markdown formatting for clear, readable responses
+6. Be concise but comprehensive
+
+When referencing data:
+- Cite "SupplyAlert Live Data" for port/weather data
+- Cite specific news sources when discussing headlines
+- Link to relevant official sources (weather.gov, eia.gov, etc.)
+
+Formatting:
+- Use **bold** for key points
+- Use bullet points for lists
+- Use emojis sparingly for visual clarity
+- End with actionable next steps or related questions
+
+You have access to REAL-TIME DATA about:
+- Port congestion and delays
+- Weather disruptions affecting freight
+- Latest industry news
+- Policy and regulatory updates
+
+CURRENT LIVE DATA:
+"""
+
+ContextSnapshot = namedtuple("ContextSnapshot", "version text tokens built_at")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _sections():
+    """(header, lines) in priority order, read from snapshots only"""
+    sections = []
+
+    alerts = get_weather_alerts.peek()  # None until the first fetch lands
+    if alerts:
+        sections.append(("ACTIVE WEATHER DISRUPTIONS:", [
+            f"- {alert['type']} ({alert['severity']}) in {alert['location']}: {alert['impact']}"
+            for alert in alerts]))
+    elif alerts is not None:
+        sections.append(("WEATHER: No active disruptions affecting freight lanes.", []))
+
+    ports = get_port_status.peek() or {}
+    if ports:
+        sections.append(("CURRENT PORT STATUS:", [
+            f"- {port}: {data['delay_days']} days delay, {data['congestion']} congestion"
+            + (f" (30-day avg {data['delay_30d']} days)" if "delay_30d" in data else "")
+            for port, data in ports.items()]))
+
+    windows = get_weather_forecast.peek()
+    if windows:
+        sections.append(("WEATHER OUTLOOK (NEXT 72 HOURS):", [f"- {format_window(window)}" for window in windows]))
+
+    routes = lanes.route_facts(lanes.get_lane_graph(), alerts, windows, ports)
+    if routes:
+        sections.append(("FREIGHT ROUTES (RISK-WEIGHTED TRANSIT HOURS):", routes))
+
+    for category, header, limit in (("disruption", "DISRUPTION NEWS:", 5),
+                                    ("freight", "LATEST FREIGHT NEWS:", 6),
+                                    ("policy", "LATEST POLICY NEWS:", 4)):
+        items = news.get_news(category, limit, wait=False)
+        if items:
+            sections.append((header, [f"- {item.title}" for item in items]))
+    return sections
+
+
+def build_context(budget=None):
+    """Live-data text trimmed to the token budget by section priority"""
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    blocks = []
+    used = 0
+    for header, lines in _sections():
+        cost = estimate_tokens(header) + 1
+        if used + cost > budget:
+            break
+        used += cost
+        kept = [header]
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget:
+                break
+            used += cost
+            kept.append(line)
+        blocks.append("\n".join(kept))
+    return "\n\n".join(blocks)
+
+
+_current = None
+_current_stamps = None
+_lock = threading.Lock()
+
+
+def current():
+    """
+    The current context snapshot, rebuilt only if a source has refreshed
+    since the last build. Never waits on the network.
+    """
+    global _current, _current_stamps
+    stamps = tuple(refresher.updated_at(name) for name in CONTEXT_SOURCES)
+    with _lock:
+        if _current is not None and stamps == _current_stamps:
+            return _current
+        text = build_context()
+        version = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        if _current is None or version != _current.version:
+            _current = ContextSnapshot(version, text, estimate_tokens(text), time.time())
+        _current_stamps = stamps
+        return _current
+
+
+def system_prompt(snapshot):
+    """Full system prompt for a snapshot (only the current date is added per turn)"""
+    now = time.strftime("%B %d, %Y at %I:%M %p")
+    return f"{SYSTEM_PROMPT}Current Date: {now}\n\n{snapshot.text}"
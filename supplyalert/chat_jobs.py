@@ -0,0 +1,93 @@
+"""
+Per-session background queue for assistant requests.
+
+Example-question buttons used to run the LLM call inside the click handler,
+freezing the page for the whole round-trip. A click now only submits a job
+and the page shows a pending message straight away; the answer is filled in
+on a later rerun once the worker finishes.
+
+Each Streamlit session keeps its own ChatJobQueue in session_state, while the
+workers come from one small process-wide pool. Asking a question that is
+already in flight for the session returns the existing job instead of
+starting another call. A cancelled job's result is discarded. A call that is
+already running still finishes, which warms the response cache.
+"""
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from supplyalert.response_cache import normalize_prompt
+
+MAX_CHAT_WORKERS = 4
+
+_pool = ThreadPoolExecutor(max_workers=MAX_CHAT_WORKERS, thread_name_prefix="chat-job")
+_ids = itertools.count(1)
+
+
+class ChatJob:
+    """One submitted question and its future"""
+
+    def __init__(self, question, future):
+        self.id = next(_ids)
+        self.question = question
+        self.future = future
+        self.cancelled = False
+
+    def done(self):
+        return self.cancelled or self.future.done()
+
+    def result(self):
+        """Answer text; None if cancelled. Re-raises the worker's exception."""
+        if self.cancelled:
+            return None
+        return self.future.result()
+
+
+class ChatJobQueue:
+    """In-flight and finished chat jobs for one session"""
+
+    def __init__(self):
+        self._jobs = {}        # id -> ChatJob
+        self._in_flight = {}   # normalized question -> ChatJob
+        self._lock = threading.Lock()
+
+    def submit(self, question, fn, *args):
+        """(job, created); an identical question already in flight is reused"""
+        key = normalize_prompt(question)
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None and not job.done():
+                return job, False
+            job = ChatJob(question, _pool.submit(fn, *args))
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Stop waiting for a job; queued work is dropped, running work is ignored"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.cancelled = True
+            job.future.cancel()
+            key = normalize_prompt(job.question)
+            if self._in_flight.get(key) is job:
+                del self._in_flight[key]
+
+    def release(self, job_id):
+        """Forget a finished job once its answer has been collected"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None:
+                key = normalize_prompt(job.question)
+                if self._in_flight.get(key) is job:
+                    del self._in_flight[key]
+
+    def pending(self):
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done()]
@@ -0,0 +1,159 @@
+"""
+Facility registry with a spatial grid index.
+
+The places we watch (hubs, DCs, cross-docks, rail ramps...) are loaded from
+a local CSV (id, name, kind, lat, lon) or GeoJSON FeatureCollection of
+points named by SUPPLYALERT_FACILITIES; without one the built-in logistics
+hubs are used. Facilities are bucketed into a uniform lat/lon grid, so
+"which facilities are near this point" only looks at the few cells around
+it instead of every facility.
+
+Weather is requested per weather cell, not per facility: facilities that
+fall in the same WEATHER_CELL_DEG cell share one coordinate in the batched
+Open-Meteo calls. Disruptive conditions at that coordinate are then mapped
+to every facility within the weather module's impact radius through near(),
+so a storm also reaches facilities just across a cell boundary.
+"""
+import csv
+import json
+import math
+import os
+import threading
+from collections import namedtuple
+
+INDEX_CELL_DEG = 0.5      # spatial index bucket size
+WEATHER_CELL_DEG = 0.25   # facilities this close share one weather lookup (~25 km)
+EARTH_RADIUS_KM = 6371.0
+
+Facility = namedtuple("Facility", "id name kind lat lon")
+
+# Used when no registry file is configured
+DEFAULT_FACILITIES = [
+    Facility("chi", "Chicago (Major Rail/Truck Hub)", "hub", 41.8781, -87.6298),
+    Facility("mem", "Memphis (FedEx SuperHub)", "hub", 35.1495, -90.0490),
+    Facility("dal", "Dallas (freight alley)", "hub", 32.7767, -96.7970),
+    Facility("atl", "Atlanta (Southeast Hub)", "hub", 33.7490, -84.3880),
+    Facility("lax", "Los Angeles (Port/Intermodal)", "hub", 34.0522, -118.2437),
+    Facility("nyc", "New York (Northeast Corridor)", "hub", 40.7128, -74.0060),
+    Facility("den", "Denver (I-70 Corridor)", "hub", 39.7392, -104.9903),
+]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# --- LOADING ---
+
+def _load_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [Facility(row.get("id") or row["name"], row["name"], row.get("kind") or "facility",
+                         float(row["lat"]), float(row["lon"]))
+                for row in csv.DictReader(f)]
+
+
+def _load_geojson(path):
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    facilities = []
+    for i, feature in enumerate(collection.get("features", [])):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") != "Point":
+            continue
+        lon, lat = geometry["coordinates"][:2]
+        props = feature.get("properties") or {}
+        name = props.get("name") or str(feature.get("id", i))
+        facilities.append(Facility(str(props.get("id") or feature.get("id") or name), name,
+                                   props.get("kind") or "facility", float(lat), float(lon)))
+    return facilities
+
+
+def load_facilities(path):
+    """Facilities from a .csv or .geojson/.json file"""
+    if path.lower().endswith(".csv"):
+        return _load_csv(path)
+    return _load_geojson(path)
+
+
+# --- INDEX ---
+
+class FacilityRegistry:
+    """Facilities bucketed in a uniform lat/lon grid"""
+
+    def __init__(self, facilities, cell_deg=INDEX_CELL_DEG):
+        self.facilities = list(facilities)
+        self.cell_deg = cell_deg
+        self._cells = {}
+        for facility in self.facilities:
+            self._cells.setdefault(self._cell(facility.lat, facility.lon), []).append(facility)
+
+    def __len__(self):
+        return len(self.facilities)
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def _in_box(self, min_lat, min_lon, max_lat, max_lon):
+        """Facilities in the cells overlapping a bounding box (a superset of the box)"""
+        lat0, lon0 = self._cell(min_lat, min_lon)
+        lat1, lon1 = self._cell(max_lat, max_lon)
+        if (lat1 - lat0 + 1) * (lon1 - lon0 + 1) > len(self._cells):
+            return self.facilities  # box covers more cells than are occupied
+        found = []
+        for i in range(lat0, lat1 + 1):
+            for j in range(lon0, lon1 + 1):
+                found.extend(self._cells.get((i, j), ()))
+        return found
+
+    def near(self, lat, lon, radius_km):
+        """Facilities within radius_km of a point, nearest first"""
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        hits = []
+        for facility in self._in_box(lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+            distance = haversine_km(lat, lon, facility.lat, facility.lon)
+            if distance <= radius_km:
+                hits.append((distance, facility))
+        hits.sort(key=lambda hit: hit[0])
+        return [facility for _, facility in hits]
+
+    def weather_points(self, cell_deg=WEATHER_CELL_DEG):
+        """
+        [(lat, lon, facilities)] with one entry per occupied weather cell; the
+        coordinate is the facilities' centroid, so a lone facility keeps its own.
+        """
+        groups = {}
+        for facility in self.facilities:
+            key = (math.floor(facility.lat / cell_deg), math.floor(facility.lon / cell_deg))
+            groups.setdefault(key, []).append(facility)
+        points = []
+        for members in groups.values():
+            lat = sum(f.lat for f in members) / len(members)
+            lon = sum(f.lon for f in members) / len(members)
+            points.append((round(lat, 4), round(lon, 4), members))
+        return points
+
+
+def point_label(facilities):
+    """Display name for a weather point: its facility, or the first plus a count"""
+    if len(facilities) == 1:
+        return facilities[0].name
+    return f"{facilities[0].name} + {len(facilities) - 1} nearby"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Process-wide registry from SUPPLYALERT_FACILITIES, or the default hubs"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            path = os.getenv("SUPPLYALERT_FACILITIES")
+            _registry = FacilityRegistry(load_facilities(path) if path else DEFAULT_FACILITIES)
+        return _registry
@@ -0,0 +1,203 @@
+"""
+RSS/Atom feed fetching with hard deadlines and conditional GET.
+
+`feedparser.parse(url)` downloads with no timeout at all, so one hung host
+could block a whole script run. Feeds are downloaded here on the shared
+HTTP session with a connect timeout and a total read deadline, behind the
+host's circuit breaker, and only the downloaded bytes are handed to
+feedparser. The read deadline is enforced on the socket: a watchdog shuts
+the connection down when it expires, so a host trickling bytes can't hold
+a worker past it. When a source fails or its breaker is open, the
+last-known-good parse for that URL is served.
+
+Each feed's ETag / Last-Modified validators and parsed result are kept in a
+small SQLite cache on disk, so refreshes send If-None-Match /
+If-Modified-Since and a 304 reuses the stored parse without downloading or
+re-parsing anything, across process restarts too.
+
+With a shared cache configured, parsed feeds are also shared between
+replicas for SHARED_FEED_AGE seconds: one replica downloads a feed and the
+others ingest its parse into their own archives.
+"""
+import pickle
+import socket
+import threading
+import time
+
+from supplyalert import http_client, resilience, shared_cache, storage
+
+CONNECT_TIMEOUT = 3.05   # seconds to establish the connection
+READ_DEADLINE = 8        # seconds for the whole body, not per socket read
+MAX_FEED_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 8 * 1024
+SHARED_FEED_AGE = 240    # a little under the news refresh interval, so each refresh round downloads once
+
+
+class FeedError(Exception):
+    """Download or parse failure for a single feed"""
+
+
+class ValidatorCache:
+    """
+    Per-URL (etag, last_modified, parsed feed) records, persisted to SQLite
+    with an in-memory layer in front so a 304 costs no unpickling.
+    """
+
+    def __init__(self, db_name="feed_cache.sqlite"):
+        self._conn = storage.connect(db_name)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                feed BLOB NOT NULL
+            )""")
+        self._conn.commit()
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """(etag, last_modified, feed) for url, or None if never fetched"""
+        with self._lock:
+            record = self._memory.get(url)
+            if record is not None:
+                return record
+            row = self._conn.execute(
+                "SELECT etag, last_modified, feed FROM feed_cache WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            try:
+                record = (row[0], row[1], pickle.loads(row[2]))
+            except Exception:
+                return None  # written by an incompatible feedparser version
+            self._memory[url] = record
+            return record
+
+    def put(self, url, etag, last_modified, feed):
+        with self._lock:
+            self._memory[url] = (etag, last_modified, feed)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feed_cache (url, etag, last_modified, fetched_at, feed) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, time.time(), pickle.dumps(feed, pickle.HIGHEST_PROTOCOL)))
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def validator_cache():
+    """Process-wide validator cache, opened on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ValidatorCache()
+        return _cache
+
+
+def _socket_of(response):
+    """The socket under a streamed response, where urllib3 exposes it"""
+    raw = response.raw
+    connection = getattr(raw, "_connection", None) or getattr(raw, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        reader = getattr(getattr(raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(reader, "raw", None), "_sock", None)
+    return sock
+
+
+def _cut_off(response):
+    """Shut a response's connection down, waking a read blocked on it"""
+    sock = _socket_of(response)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _download(url, headers):
+    """(response, body) with the body read under READ_DEADLINE; body is None on 304"""
+    started = time.monotonic()
+    response = http_client.get(url, headers=headers, timeout=(CONNECT_TIMEOUT, READ_DEADLINE), stream=True, retries=1)
+    # A socket read only times out when no byte arrives at all, so a trickling host
+    # could stretch one chunk far past the deadline; cut the connection instead
+    watchdog = threading.Timer(max(0, READ_DEADLINE - (time.monotonic() - started)), _cut_off, (response,))
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        if response.status_code == 304:
+            return response, None
+        if response.status_code != 200:
+            raise FeedError(f"HTTP {response.status_code}")
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if time.monotonic() - started > READ_DEADLINE:
+                    raise FeedError(f"read deadline of {READ_DEADLINE}s exceeded")
+                if size > MAX_FEED_BYTES:
+                    raise FeedError("feed too large")
+        except FeedError:
+            raise
+        except Exception as e:
+            if time.monotonic() - started >= READ_DEADLINE:
+                raise FeedError(f"read deadline of {READ_DEADLINE}s exceeded") from e
+            raise
+        if time.monotonic() - started > READ_DEADLINE:
+            raise FeedError(f"read deadline of {READ_DEADLINE}s exceeded")  # cut off mid-body reads as EOF
+        return response, b"".join(chunks)
+    finally:
+        watchdog.cancel()
+        response.close()
+
+
+def _download_and_parse(url):
+    cache = validator_cache()
+    cached = cache.get(url)
+
+    headers = {}
+    if cached is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    response, body = _download(url, headers)
+    if body is None:
+        if cached is None:
+            raise FeedError("HTTP 304 without a cached copy")
+        return cached[2]  # Not Modified: reuse the stored parse
+
+    import feedparser  # deferred: only needed once a feed body actually arrives
+    feed = feedparser.parse(body)
+    if feed.bozo and not feed.entries:
+        raise FeedError(f"unparseable feed: {feed.get('bozo_exception')}")
+    cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), feed)
+    return feed
+
+
+def fetch_feed(url):
+    """
+    Parsed feed for url, or the last-known-good parse if the source is failing.
+    Raises if the source fails and nothing has ever been fetched for it.
+    """
+    try:
+        feed, _ = shared_cache.fetch(f"feed:{url}", SHARED_FEED_AGE,
+                                     lambda: resilience.guarded_call(url, _download_and_parse, url))
+        return feed
+    except shared_cache.RefreshPending:
+        cached = validator_cache().get(url)
+        if cached is None:
+            raise
+        return cached[2]  # another replica is still downloading it
+    except Exception as e:
+        cached = validator_cache().get(url)
+        if cached is None:
+            raise
+        resilience.mark_stale(url, e)
+        return cached[2]
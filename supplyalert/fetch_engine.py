@@ -0,0 +1,84 @@
+"""
+Shared concurrent fetch engine.
+
+Every fetcher submits its network calls here instead of looping over them one
+after another. The request pool size is the global concurrency limit, a
+semaphore per host keeps any single upstream (mostly news.google.com) from
+being hammered, and each batch is collected against an overall deadline so a
+cold load costs the slowest source instead of the sum of all of them.
+
+Module-level pools survive Streamlit reruns (only app.py is re-executed).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+MAX_CONCURRENT_REQUESTS = 16   # global limit on in-flight HTTP calls
+MAX_REQUESTS_PER_HOST = 4      # per-host limit (Google News rate-limits bursts)
+DEFAULT_DEADLINE = 10          # seconds for a whole batch
+RENDER_BUDGET = 12             # seconds a page render may wait on sources
+
+# Requests and whole sources run on separate pools so a source waiting on its
+# own requests can never starve the pool those requests need.
+_request_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="fetch-request")
+_source_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fetch-source")
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def _host_slot(url):
+    """Per-host semaphore, created on first use"""
+    host = urlparse(url).hostname or ""
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+        return slot
+
+
+def _run_limited(url, fn, args, kwargs):
+    with _host_slot(url):
+        return fn(*args, **kwargs)
+
+
+def submit(url, fn, *args, **kwargs):
+    """Schedule fn(*args, **kwargs) as a request against url's host; returns a Future"""
+    return _request_pool.submit(_run_limited, url, fn, args, kwargs)
+
+
+def gather(futures, deadline=DEFAULT_DEADLINE):
+    """
+    Wait for futures until the deadline and return their results in order.
+    Failed or unfinished calls yield None, so callers skip them exactly like
+    the old `except: continue` loops did.
+    """
+    done, not_done = wait(futures, timeout=deadline)
+    for future in not_done:
+        future.cancel()  # drops queued work; running calls finish in the background
+
+    results = []
+    for future in futures:
+        if future in done and future.exception() is None:
+            results.append(future.result())
+        else:
+            results.append(None)
+    return results
+
+
+def fetch_all(urls, fn, deadline=DEFAULT_DEADLINE):
+    """Run fn(url) for every url concurrently; results in input order (None on failure)"""
+    return gather([submit(url, fn, url) for url in urls], deadline)
+
+
+def run_sources(sources, deadline=DEFAULT_DEADLINE):
+    """
+    Run several zero-argument fetchers concurrently (e.g. to warm caches
+    before the dashboard renders) and return their results in order.
+    """
+    return gather([_source_pool.submit(source) for source in sources], deadline)
+
+
+def submit_source(fn, *args):
+    """Run a whole fetcher in the background without waiting for it; returns a Future"""
+    return _source_pool.submit(fn, *args)
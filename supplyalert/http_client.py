@@ -0,0 +1,96 @@
+"""
+Shared pooled HTTP session.
+
+All outbound calls (feeds, Open-Meteo, Adzuna, OpenRouter) go through one
+requests.Session so connections are kept alive and reused per host instead
+of paying a new TCP + TLS handshake for every call. The session's urllib3
+pools are thread-safe and sized to the fetch engine's concurrency limit.
+
+Responses with 429 or 5xx status, and connection errors (including connect
+timeouts), are retried a bounded number of times with jittered exponential
+backoff. Read timeouts are not retried: the server may still be working on
+the request and the caller's deadline is already spent. That includes a
+timeout while reading the body, which requests reports as a ConnectionError
+wrapping urllib3's ReadTimeoutError rather than as a ReadTimeout.
+"""
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+
+from supplyalert import fetch_engine
+
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5     # seconds before the first retry
+BACKOFF_CAP = 4        # longest single wait between attempts
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+USER_AGENT = "SupplyAlert/1.1 (+https://supplyalert.streamlit.app)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session():
+    """Process-wide session with keep-alive pools per host"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=fetch_engine.MAX_CONCURRENT_REQUESTS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept-Encoding": "gzip, deflate",
+            })
+        return _session
+
+
+def _backoff(attempt, retry_after=None):
+    """Seconds to wait before retry number `attempt` (0-based)"""
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass  # HTTP-date form; fall back to our own schedule
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.5)
+
+
+def _read_timed_out(error):
+    """A ConnectionError that is really a read timeout on the response body"""
+    return any(isinstance(arg, ReadTimeoutError) for arg in error.args)
+
+
+def request(method, url, retries=MAX_RETRIES, **kwargs):
+    """
+    Issue a request on the shared session, retrying 429/5xx responses and
+    connection errors. The final response is returned whatever its status,
+    so callers keep their own status handling.
+    """
+    for attempt in range(retries + 1):
+        last_attempt = attempt == retries
+        try:
+            response = session().request(method, url, **kwargs)
+        except requests.ConnectionError as e:  # includes ConnectTimeout, not ReadTimeout
+            if last_attempt or _read_timed_out(e):
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES or last_attempt:
+            return response
+        retry_after = response.headers.get("Retry-After")
+        response.close()  # hand the connection back to the pool
+        time.sleep(_backoff(attempt, retry_after))
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,234 @@
+"""Supply chain AI job listings (Adzuna API + verified company career pages)"""
+import os
+from datetime import datetime
+
+from supplyalert import fetch_engine, http_client, refresher, resilience
+from supplyalert.keywords import KeywordMatcher
+
+# Skill tags pulled from job descriptions, in display order
+DESCRIPTION_SKILLS = KeywordMatcher({skill.title(): [skill] for skill in [
+    'python', 'sql', 'machine learning', 'ai', 'data science',
+    'supply chain', 'logistics', 'tensorflow', 'pytorch', 'aws']})
+
+# Salary bands by title keyword; the first (most senior) band found wins
+SALARY_BANDS = KeywordMatcher({
+    "$150,000 - $250,000": ['director', 'vp', 'vice president', 'head of'],
+    "$120,000 - $180,000": ['senior', 'lead', 'principal', 'staff'],
+    "$100,000 - $150,000": ['manager', 'scientist', 'architect'],
+    "$75,000 - $120,000": ['analyst', 'engineer', 'developer'],
+    "$55,000 - $85,000": ['associate', 'coordinator', 'specialist'],
+})
+
+# Title keyword groups for suggested skills
+TITLE_SKILL_GROUPS = KeywordMatcher({
+    "ai": ['ai', 'machine learning', 'ml'],
+    "data": ['data', 'analyst', 'scientist'],
+    "operations": ['logistics', 'operations'],
+    "planning": ['forecast*', 'planning', 'demand'],
+})
+GROUP_SKILLS = {
+    "ai": ["Python", "Machine Learning", "TensorFlow/PyTorch"],
+    "data": ["SQL", "Python", "Data Visualization"],
+    "operations": ["WMS", "TMS", "ERP"],
+    "planning": ["Demand Planning", "S&OP", "Statistical Modeling"],
+}
+
+
+def fetch_adzuna_jobs():
+    """
+    Fetch real job postings from Adzuna API (free tier: 1000 calls/month)
+    Returns list of job dictionaries
+    """
+    jobs = []
+
+    # Adzuna API configuration (get free key at https://developer.adzuna.com/)
+    # (Streamlit Cloud exposes root-level secrets as environment variables too)
+    ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID") or "test"  # Fallback to test
+    ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY") or "test"
+
+    # Search parameters
+    search_queries = [
+        ("supply chain AI", "Chicago"),
+        ("machine learning logistics", "Illinois"),
+        ("data science supply chain", "Midwest"),
+    ]
+
+    url = "http://api.adzuna.com/v1/api/jobs/us/search/1"
+    futures = []
+    for query, location in search_queries:
+        params = {
+            "app_id": ADZUNA_APP_ID,
+            "app_key": ADZUNA_APP_KEY,
+            "results_per_page": 10,
+            "what": query,
+            "where": location,
+            "sort_by": "date",
+        }
+        futures.append(fetch_engine.submit(url, resilience.guarded_call, url, http_client.get, url, params=params, timeout=(3.05, 10)))
+    responses = fetch_engine.gather(futures)
+
+    for (query, location), response in zip(search_queries, responses):
+        try:
+            if response is not None and response.status_code == 200:
+                data = response.json()
+
+                for job in data.get('results', [])[:7]:  # Take top 7 per query
+                    # Extract salary
+                    salary = "Not specified"
+                    if job.get('salary_min') and job.get('salary_max'):
+                        salary = f"${int(job['salary_min']):,} - ${int(job['salary_max']):,}"
+                    elif job.get('salary_min'):
+                        salary = f"${int(job['salary_min']):,}+"
+
+                    # Parse skills from description (simple keyword extraction)
+                    skills = DESCRIPTION_SKILLS.tags(job.get('description', ''))
+
+                    if not skills:
+                        skills = ['Supply Chain', 'Data Analytics']  # Default skills
+
+                    # Parse date
+                    created = job.get('created', '')
+                    try:
+                        job_date = datetime.strptime(created[:10], '%Y-%m-%d') if created else datetime.now()
+                    except:
+                        job_date = datetime.now()
+
+                    jobs.append({
+                        'title': job.get('title', 'Unknown Position'),
+                        'company': job.get('company', {}).get('display_name', 'Company'),
+                        'location': job.get('location', {}).get('display_name', location),
+                        'summary': job.get('description', '')[:200] + "...",
+                        'skills': skills[:5],  # Limit to 5 skills
+                        'link': job.get('redirect_url', '#'),
+                        'salary': salary,
+                        'date': job_date,
+                        'source': '🔴 Live API',
+                        'verified': True
+                    })
+        except Exception as e:
+            # Silently fail and continue - API might be rate limited
+            continue
+
+    return jobs
+
+@refresher.source("jobs", interval=86400)  # Refresh daily
+def get_supply_chain_ai_jobs():
+    """
+    Hybrid job fetcher: Real API jobs + Verified company links
+    ~80% self-sustaining with daily auto-refresh
+    """
+    all_jobs = []
+
+    # PART 1: Fetch real jobs from Adzuna API
+    try:
+        api_jobs = fetch_adzuna_jobs()
+        all_jobs.extend(api_jobs)
+    except:
+        pass  # If API fails, continue with verified links only
+
+    # PART 2: Verified company career page links (always up-to-date, no maintenance)
+    # These link directly to company career pages - jobs are always current
+    verified_companies = [
+        ('Browse Amazon Supply Chain Jobs', 'Amazon', 'Nationwide',
+         'Direct link to Amazon career page. Search live openings for supply chain analyst, data scientist, ML engineer, and operations roles.',
+         ['Python', 'SQL', 'Supply Chain', 'Data Analytics', 'AWS'],
+         'https://www.amazon.jobs/en/search?base_query=supply+chain&loc_query=Illinois',
+         '$80,000 - $180,000'),
+
+        ('Browse Walmart Supply Chain Jobs', 'Walmart', 'Nationwide',
+         'Walmart supply chain technology careers. Data science, demand planning, inventory optimization, and ML engineering roles.',
+         ['Python', 'Machine Learning', 'Supply Chain', 'Big Data', 'Forecasting'],
+         'https://careers.walmart.com/results?q=supply%20chain&jobState=il',
+         '$75,000 - $170,000'),
+
+        ('Browse Target Supply Chain Jobs', 'Target', 'Nationwide',
+         'Target supply chain careers including analytics, data science, systems implementation and optimization roles.',
+         ['Supply Chain', 'Data Analytics', 'SQL', 'Python', 'Project Management'],
+         'https://jobs.target.com/search-jobs/supply%20chain',
+         '$85,000 - $160,000'),
+
+        ('Browse FourKites Careers', 'FourKites', 'Chicago, IL',
+         'Real-time supply chain visibility platform. Roles in data analytics, software engineering, and supply chain operations.',
+         ['SQL', 'Python', 'Supply Chain', 'Data Visualization', 'SaaS'],
+         'https://www.fourkites.com/careers/',
+         '$75,000 - $150,000'),
+
+        ('Browse PepsiCo Supply Chain Jobs', 'PepsiCo', 'Nationwide',
+         'Supply chain analytics and optimization roles at global food & beverage leader. Data science, demand planning, and operations.',
+         ['Advanced Analytics', 'Python', 'SQL', 'Supply Chain', 'Forecasting'],
+         'https://www.pepsicojobs.com/main/jobs?keywords=supply+chain',
+         '$90,000 - $165,000'),
+
+        ('Browse Project44 Careers', 'Project44', 'Chicago, IL',
+         'Supply chain visibility and logistics tech company. Engineering, data science, and AI/ML roles.',
+         ['Python', 'Machine Learning', 'Supply Chain', 'Cloud', 'APIs'],
+         'https://www.project44.com/careers',
+         '$95,000 - $180,000'),
+
+        ('Browse C.H. Robinson Jobs', 'C.H. Robinson', 'Eden Prairie, MN',
+         'Third-party logistics leader with $20B+ revenue. Analytics, data science, and technology roles for freight operations.',
+         ['SQL', 'Python', 'Logistics', 'Analytics', 'Business Intelligence'],
+         'https://jobs.chrobinson.com/search/?q=supply+chain',
+         '$80,000 - $175,000'),
+
+        ('Browse Flexport Careers', 'Flexport', 'Remote',
+         'Digital freight forwarding and supply chain platform. Data engineering, software engineering, and operations roles.',
+         ['Python', 'SQL', 'AWS', 'Data Engineering', 'Supply Chain'],
+         'https://www.flexport.com/careers/jobs/',
+         '$100,000 - $170,000'),
+
+        ('Browse Microsoft Supply Chain Jobs', 'Microsoft', 'Nationwide',
+         'Supply chain AI and technology roles including Azure Supply Chain Center product development and operations.',
+         ['AI/ML', 'Supply Chain', 'Azure', 'Product Management', 'Cloud'],
+         'https://careers.microsoft.com/us/en/search-results?keywords=supply%20chain',
+         '$120,000 - $200,000'),
+
+        ('Browse Google Supply Chain Jobs', 'Google', 'Nationwide',
+         'Supply chain operations, analytics, and AI research roles. Work on optimization for global hardware and cloud infrastructure.',
+         ['Machine Learning', 'Python', 'Supply Chain', 'Research', 'Operations'],
+         'https://www.google.com/about/careers/applications/jobs/results/?q=supply%20chain',
+         '$110,000 - $220,000'),
+
+        ('Browse IBM Supply Chain Consulting', 'IBM', 'Nationwide',
+         'Enterprise AI and supply chain consulting. Watson AI implementation, solution architecture, and digital transformation.',
+         ['AI/ML', 'Supply Chain', 'Solution Architecture', 'Consulting', 'Cloud'],
+         'https://www.ibm.com/employment/search/?field_keyword_08[0]=supply%20chain',
+         '$100,000 - $175,000'),
+
+        ('Browse DoorDash ML Jobs', 'DoorDash', 'Remote',
+         'Machine learning and data science for logistics optimization. Route planning, demand forecasting, and operational ML.',
+         ['Machine Learning', 'Python', 'Logistics', 'Data Science', 'Optimization'],
+         'https://www.doordash.com/careers/jobs/?q=machine%20learning',
+         '$130,000 - $210,000'),
+    ]
+
+    for title, company, location, summary, skills, link, salary in verified_companies:
+        all_jobs.append({
+            'title': title,
+            'company': company,
+            'location': location,
+            'summary': summary,
+            'skills': skills,
+            'link': link,
+            'salary': salary,
+            'date': datetime.now(),  # Company links are always "current"
+            'source': '✅ Company',
+            'verified': True
+        })
+
+    # Sort by date (most recent first) - API jobs will appear before company links
+    all_jobs.sort(key=lambda x: x['date'], reverse=True)
+    return all_jobs
+
+def get_salary_estimate(title):
+    """Estimate salary based on job title keywords"""
+    return SALARY_BANDS.first(title, default="$70,000 - $130,000")
+
+def get_required_skills(title):
+    """Suggest skills based on job title"""
+    base_skills = ["Supply Chain", "Analytics"]
+    
+    for group in TITLE_SKILL_GROUPS.tags(title):
+        base_skills.extend(GROUP_SKILLS[group])
+    
+    return list(set(base_skills))[:6]  # Return unique skills, max 6
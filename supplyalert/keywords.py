@@ -0,0 +1,103 @@
+"""
+Compiled multi-keyword tagger.
+
+Relevance filters, skill extraction and topic routing used to check
+`any(keyword in text for keyword in words)`. That costs one substring scan
+per keyword for every item, and it matches inside other words: 'ai' in
+"said", 'ml' in "html", 'la' in "latest".
+
+A KeywordMatcher compiles a whole tag table (tag -> keywords) into one regex,
+built from a character trie of the keywords so alternatives share prefixes
+instead of being tried one after another. Matches must start and end on word
+boundaries. An optional plural 's'/'es' is accepted, and a trailing '*' on a
+keyword makes it a prefix ('robot*' matches robots and robotics). One
+`finditer` pass over the text then yields every tag, however large the table.
+Matches don't overlap; where keywords share a start, the longest one wins.
+"""
+import re
+
+_BOUNDARY_BEFORE = r"(?<![a-z0-9])"
+_BOUNDARY_AFTER = r"(?![a-z0-9])"
+_PREFIX = "*"
+_END = ""
+
+
+def _trie_pattern(node):
+    """Regex source for a trie node (dict char -> node, _END / _PREFIX mark word ends)"""
+    if set(node) <= {_END}:
+        return None
+    optional = _END in node
+    branches = []
+    chars = []
+    for ch in sorted(node):
+        if ch == _END:
+            continue
+        if ch == _PREFIX:
+            branches.append("[a-z0-9]*")
+            continue
+        sub = _trie_pattern(node[ch])
+        if ch == " ":
+            branches.append(r"\s+" + (sub or ""))  # any run of whitespace inside a phrase
+        elif sub is None:
+            chars.append(re.escape(ch))
+        else:
+            branches.append(re.escape(ch) + sub)
+    if chars:
+        branches.append(chars[0] if len(chars) == 1 else "[" + "".join(chars) + "]")
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if optional:
+        pattern = "(?:" + pattern + ")?"
+    return pattern
+
+
+class KeywordMatcher:
+    """All tags for a text from one compiled pass over it"""
+
+    def __init__(self, table):
+        self._rank = {}       # tag -> position in the table, for stable ordering
+        self._exact = {}      # keyword -> tags
+        self._prefixes = []   # (prefix, tags), longest first
+        trie = {}
+        for tag, keywords in table.items():
+            self._rank.setdefault(tag, len(self._rank))
+            for keyword in keywords:
+                keyword = " ".join(keyword.lower().split())
+                prefix = keyword.endswith(_PREFIX)
+                word = keyword.rstrip(_PREFIX)
+                if prefix:
+                    self._prefixes.append((word, tag))
+                else:
+                    self._exact.setdefault(word, set()).add(tag)
+                node = trie
+                for ch in word:
+                    node = node.setdefault(ch, {})
+                node[_PREFIX if prefix else _END] = {}
+        self._prefixes.sort(key=lambda item: -len(item[0]))
+        body = _trie_pattern(trie) or "(?!)"
+        self._regex = re.compile(f"{_BOUNDARY_BEFORE}{body}(?:e?s)?{_BOUNDARY_AFTER}")
+
+    def _resolve(self, word):
+        for candidate in (word, word[:-1] if word.endswith("s") else None,
+                          word[:-2] if word.endswith("es") else None):
+            if candidate and candidate in self._exact:
+                return self._exact[candidate]
+        for prefix, tag in self._prefixes:
+            if word.startswith(prefix):
+                return {tag}
+        return set()
+
+    def tags(self, text):
+        """Tags found in text, in table order"""
+        found = set()
+        for match in self._regex.finditer(text.lower()):
+            found |= self._resolve(" ".join(match.group().split()))
+        return sorted(found, key=self._rank.__getitem__)
+
+    def first(self, text, default=None):
+        """Highest-priority (earliest in the table) tag found, or default"""
+        tags = self.tags(text)
+        return tags[0] if tags else default
+
+    def search(self, text):
+        """True if any keyword occurs in text"""
+        return self._regex.search(text.lower()) is not None
@@ -0,0 +1,274 @@
+"""
+Freight lane risk graph.
+
+Facilities from the registry and the monitored ports are nodes; corridors
+between them are edges with a base transit time in hours (DEFAULT_LANES,
+or a CSV of a,b,hours,mode named by SUPPLYALERT_LANES). Each edge's cost is
+its base time plus risk: current weather alerts and forecast disruption
+windows at either end add a fraction of the base time, and a port end adds
+PORT_DWELL_HOURS per day of port delay. Routes are the k cheapest loopless
+paths by that cost (Yen's algorithm over Dijkstra).
+
+Route queries are cached. When the risk inputs change, only the edges whose
+cost actually moved are looked at, and a cached query is recomputed only if
+one of those edges is on one of its routes, or an edge got cheaper and a
+path through it could now beat the query's k-th route. That test uses
+base-cost distances, which never change and are never more than the real
+cost, so it never misses an affected query.
+"""
+import csv
+import heapq
+import os
+import threading
+from collections import namedtuple
+
+from supplyalert import port_metrics
+from supplyalert.facilities import get_registry
+
+ALERT_PENALTY = {"Medium": 0.25, "High": 1.0}      # share of base time added for weather now
+FORECAST_PENALTY = {"Medium": 0.1, "High": 0.5}    # ... and for a forecast window at an end
+PORT_DWELL_HOURS = 24                              # per day of port delay, on edges touching the port
+DEFAULT_K = 3
+
+# (a, b, base hours, mode); ends are facility ids or port names
+DEFAULT_LANES = [
+    ("Los Angeles/Long Beach", "lax", 2, "drayage"),
+    ("New York/New Jersey", "nyc", 2, "drayage"),
+    ("Savannah", "atl", 5, "truck"),
+    ("Savannah", "nyc", 14, "truck"),
+    ("Houston", "dal", 4, "truck"),
+    ("Seattle/Tacoma", "lax", 19, "truck"),
+    ("Seattle/Tacoma", "chi", 40, "rail"),
+    ("lax", "den", 18, "truck"),
+    ("lax", "dal", 24, "truck"),
+    ("den", "chi", 17, "truck"),
+    ("den", "dal", 13, "truck"),
+    ("dal", "mem", 8, "truck"),
+    ("dal", "atl", 13, "truck"),
+    ("mem", "chi", 9, "truck"),
+    ("mem", "atl", 7, "truck"),
+    ("chi", "atl", 12, "truck"),
+    ("chi", "nyc", 13, "truck"),
+    ("atl", "nyc", 14, "truck"),
+]
+
+# Origin/destination pairs summarized for the assistant
+KEY_ROUTES = [
+    ("Los Angeles/Long Beach", "nyc"),
+    ("Los Angeles/Long Beach", "chi"),
+    ("Seattle/Tacoma", "atl"),
+    ("Houston", "chi"),
+    ("Savannah", "chi"),
+]
+
+Route = namedtuple("Route", "nodes hours base_hours")
+
+
+def load_lanes(path):
+    """Lanes from a CSV with a, b, hours and optional mode columns"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["a"], row["b"], float(row["hours"]), row.get("mode") or "truck") for row in csv.DictReader(f)]
+
+
+def _edge(a, b):
+    return (a, b) if a <= b else (b, a)
+
+
+class LaneGraph:
+    """Undirected lane graph with risk-weighted costs and cached k-shortest routes"""
+
+    def __init__(self, lanes, names):
+        self.names = names   # node -> display name
+        self._adj = {}
+        self._base = {}
+        self.modes = {}
+        for a, b, hours, mode in lanes:
+            if a not in names or b not in names or a == b:
+                continue  # a lane to a facility this registry doesn't have
+            edge = _edge(a, b)
+            self._adj.setdefault(a, {})[b] = edge
+            self._adj.setdefault(b, {})[a] = edge
+            self._base[edge] = float(hours)
+            self.modes[edge] = mode
+        self._cost = dict(self._base)
+        self._lower = {node: self._distances(node, self._base) for node in self._adj}
+        self._routes = {}   # (origin, destination, k) -> [Route]
+        self._used = {}     # same key -> edges on those routes
+        self._lock = threading.Lock()
+        self.recomputed = 0
+
+    def __contains__(self, node):
+        return node in self._adj
+
+    def _distances(self, source, costs):
+        """Single-source shortest distances under the given edge costs"""
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for neighbor, edge in self._adj[node].items():
+                nd = d + costs[edge]
+                if nd < dist.get(neighbor, float("inf")):
+                    dist[neighbor] = nd
+                    heapq.heappush(heap, (nd, neighbor))
+        return dist
+
+    def _shortest(self, source, target, banned_edges=(), banned_nodes=()):
+        """Cheapest path as a node list under current costs, or None"""
+        dist = {source: 0.0}
+        prev = {}
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if d > dist[node]:
+                continue
+            for neighbor, edge in self._adj[node].items():
+                if neighbor in banned_nodes or edge in banned_edges:
+                    continue
+                nd = d + self._cost[edge]
+                if nd < dist.get(neighbor, float("inf")):
+                    dist[neighbor] = nd
+                    prev[neighbor] = node
+                    heapq.heappush(heap, (nd, neighbor))
+        if target not in dist:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(prev[path[-1]])
+        return path[::-1]
+
+    def _path_edges(self, nodes):
+        return [_edge(a, b) for a, b in zip(nodes, nodes[1:])]
+
+    def _route(self, nodes):
+        edges = self._path_edges(nodes)
+        return Route(tuple(nodes), sum(self._cost[e] for e in edges), sum(self._base[e] for e in edges))
+
+    def _k_shortest(self, origin, destination, k):
+        """Yen's algorithm: the k cheapest loopless paths"""
+        first = self._shortest(origin, destination)
+        if first is None:
+            return []
+        found = [first]
+        candidates = []
+        seen = {tuple(first)}
+        while len(found) < k:
+            last = found[-1]
+            for i in range(len(last) - 1):
+                root = last[:i + 1]
+                banned_edges = {_edge(path[i], path[i + 1]) for path in found if path[:i + 1] == root}
+                spur = self._shortest(last[i], destination, banned_edges, set(root[:-1]))
+                if spur is None:
+                    continue
+                path = root[:-1] + spur
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (self._route(path).hours, path))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates)[1])
+        return [self._route(path) for path in found]
+
+    def routes(self, origin, destination, k=DEFAULT_K):
+        """Up to k routes, cheapest first; served from cache unless a relevant edge changed"""
+        if origin not in self._adj or destination not in self._adj:
+            return []
+        key = (origin, destination, k)
+        with self._lock:
+            if key not in self._routes:
+                routes = self._k_shortest(origin, destination, k)
+                self._routes[key] = routes
+                self._used[key] = {e for route in routes for e in self._path_edges(route.nodes)}
+                self.recomputed += 1
+            return self._routes[key]
+
+    def _affected(self, key, edge, old, new):
+        if edge in self._used[key]:
+            return True
+        if new >= old:
+            return False  # a dearer edge off every route can't change them
+        origin, destination, k = key
+        routes = self._routes[key]
+        bound = routes[-1].hours if len(routes) == k else float("inf")
+        a, b = edge
+        lower = self._lower[origin]
+        return min(lower.get(a, float("inf")) + new + self._lower[b].get(destination, float("inf")),
+                   lower.get(b, float("inf")) + new + self._lower[a].get(destination, float("inf"))) < bound
+
+    def set_costs(self, costs):
+        """Apply new edge costs; drops only the cached queries they can affect. Returns the changed edges."""
+        with self._lock:
+            changed = {edge: (self._cost[edge], cost) for edge, cost in costs.items()
+                       if edge in self._cost and cost != self._cost[edge]}
+            if not changed:
+                return []
+            stale = [key for key in self._routes
+                     if any(self._affected(key, edge, old, new) for edge, (old, new) in changed.items())]
+            for edge, (_, new) in changed.items():
+                self._cost[edge] = new
+            for key in stale:
+                del self._routes[key], self._used[key]
+            return list(changed)
+
+    def risk_costs(self, alerts, windows, ports):
+        """Edge costs for the given weather alerts, forecast windows and port status"""
+        now_penalty, forecast_penalty = {}, {}
+        for items, table, penalty in ((alerts, ALERT_PENALTY, now_penalty), (windows, FORECAST_PENALTY, forecast_penalty)):
+            for item in items or ():
+                for node in item.get("facilities", ()):
+                    penalty[node] = max(penalty.get(node, 0.0), table.get(item["severity"], 0.0))
+        dwell = {port: data["delay_days"] * PORT_DWELL_HOURS for port, data in (ports or {}).items()}
+        costs = {}
+        for edge, base in self._base.items():
+            a, b = edge
+            share = max(now_penalty.get(a, 0.0), now_penalty.get(b, 0.0)) + \
+                max(forecast_penalty.get(a, 0.0), forecast_penalty.get(b, 0.0))
+            costs[edge] = round(base * (1 + share) + dwell.get(a, 0) + dwell.get(b, 0), 2)
+        return costs
+
+    def update_risk(self, alerts, windows, ports):
+        """Recost every edge from live data; returns the edges whose cost changed"""
+        return self.set_costs(self.risk_costs(alerts, windows, ports))
+
+    def describe(self, route):
+        """Route as 'A → B → C, 40h (+6h risk)'"""
+        risk = route.hours - route.base_hours
+        text = " → ".join(self.names[node] for node in route.nodes) + f", {route.hours:.0f}h"
+        return text + (f" (+{risk:.0f}h risk)" if risk >= 0.5 else "")
+
+
+def route_facts(graph, alerts, windows, ports, pairs=KEY_ROUTES):
+    """Context lines: best route per key lane from live data, plus the alternatives"""
+    graph.update_risk(alerts, windows, ports)
+    lines = []
+    for origin, destination in pairs:
+        routes = graph.routes(origin, destination)
+        if not routes:
+            continue
+        best, alternatives = routes[0], routes[1:]
+        line = f"- {graph.names[origin]} to {graph.names[destination]}: best {graph.describe(best)}"
+        if alternatives:
+            line += "; alternatives: " + "; ".join(graph.describe(route) for route in alternatives)
+        lines.append(line)
+    return lines
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_lane_graph():
+    """Process-wide lane graph over the registry's facilities and the monitored ports"""
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            path = os.getenv("SUPPLYALERT_LANES")
+            lanes = load_lanes(path) if path else DEFAULT_LANES
+            names = {port: port for port in port_metrics.BASELINE}
+            names.update((f.id, f.name.split(" (")[0]) for f in get_registry().facilities)
+            _graph = LaneGraph(lanes, names)
+        return _graph
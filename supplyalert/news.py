@@ -0,0 +1,190 @@
+"""
+News ingestion and archive-backed news queries.
+
+The ingest functions pull the freight, policy, AI and disruption feeds and
+upsert everything they see into the news archive. The get_* functions the
+app displays are plain indexed archive queries: they never wait on the
+network unless a category has never been ingested at all. The background
+refresher re-ingests each category ahead of NEWS_TTL.
+"""
+from supplyalert import fetch_engine, refresher
+from supplyalert.feeds import fetch_feed
+from supplyalert.keywords import KeywordMatcher
+from supplyalert.news_archive import get_archive
+
+NEWS_TTL = 300  # seconds between re-ingests of a category
+
+FREIGHT_FEEDS = [
+    "https://www.freightwaves.com/feed",
+    "https://www.transporttopics.com/rss.xml",
+    "https://www.supplychaindive.com/feeds/news/",
+]
+
+POLICY_FEED = "https://news.google.com/rss/search?q=FMCSA+regulations+OR+USMCA+trade+OR+freight+tariffs+OR+department+of+transportation+trucking&hl=en-US&gl=US&ceid=US:en"
+
+DISRUPTION_FEED = "https://news.google.com/rss/search?q=supply+chain+crisis+OR+port+strike+OR+freight+disruption+OR+Red+Sea+shipping+OR+Panama+Canal+drought&hl=en-US&gl=US&ceid=US:en"
+
+# Multiple targeted searches for comprehensive AI coverage
+AI_SEARCH_QUERIES = [
+    # AI Use Cases
+    ("AI+use+case+logistics+supply+chain", "🔥"),
+    ("machine+learning+freight+optimization", "📈"),
+    ("generative+AI+warehouse+automation", "🚀"),
+
+    # Research & Reports
+    ("AI+supply+chain+research+paper", "📄"),
+    ("logistics+AI+industry+report", "📊"),
+    ("supply+chain+AI+white+paper", "📋"),
+
+    # Policies & Regulations
+    ("AI+regulation+logistics+policy", "⚖️"),
+    ("autonomous+trucking+policy", "🚛"),
+
+    # Emerging Tech
+    ("computer+vision+warehouse", "👁️"),
+    ("predictive+analytics+freight", "🔮"),
+]
+
+# Google News with site:youtube.com works best for video content
+AI_VIDEO_QUERIES = [
+    "site:youtube.com AI supply chain",
+    "site:youtube.com logistics technology",
+    "site:youtube.com warehouse robots",
+]
+
+# Whole words only, plurals included; 'robot*' also covers robotics
+AI_RELEVANT_KEYWORDS = ['ai', 'artificial intelligence', 'machine learning', 'ml',
+                        'automation', 'autonomous', 'robot*', 'algorithm', 'predictive',
+                        'generative', 'genai', 'llm', 'gpt', 'chatgpt', 'neural', 'deep learning',
+                        'computer vision', 'analytics', 'data science']
+AI_RELEVANCE = KeywordMatcher({"ai": AI_RELEVANT_KEYWORDS})
+
+
+def _google_news_url(query):
+    return f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+
+
+# --- INGESTION ---
+
+def ingest_freight_news():
+    """Ingest freight carrier & logistics news from high-quality sources"""
+    entries = []
+    seen_titles = set()
+    # All feeds download concurrently; a failed feed comes back as None
+    for feed in fetch_engine.fetch_all(FREIGHT_FEEDS, fetch_feed):
+        if feed is None:
+            continue
+        for entry in feed.entries:
+            if entry.get("title") and entry.title not in seen_titles:
+                entries.append(entry)
+                seen_titles.add(entry.title)
+    return get_archive().ingest("freight", entries)
+
+
+def ingest_policy_news():
+    """Ingest government policy and trade news"""
+    feed = fetch_engine.fetch_all([POLICY_FEED], fetch_feed)[0]
+    return get_archive().ingest("policy", feed.entries if feed is not None else [])
+
+
+def ingest_disruption_news():
+    """Ingest supply chain disruption headlines"""
+    feed = fetch_engine.fetch_all([DISRUPTION_FEED], fetch_feed)[0]
+    return get_archive().ingest("disruption", feed.entries if feed is not None else [])
+
+
+def ingest_ai_news():
+    """Ingest trending AI use cases, papers, reports, policies, and YouTube videos"""
+    entries = []
+    seen_titles = set()
+
+    # Submit all topic + video searches at once instead of sequential fetches
+    topic_queries = AI_SEARCH_QUERIES[:6]  # Limit to 6 queries
+    topic_urls = [_google_news_url(query) for query, _ in topic_queries]
+    video_urls = [_google_news_url(v_query.replace(' ', '+')) for v_query in AI_VIDEO_QUERIES]
+    feeds = fetch_engine.fetch_all(topic_urls + video_urls, fetch_feed)
+    topic_feeds, video_feeds = feeds[:len(topic_urls)], feeds[len(topic_urls):]
+
+    for (query, trend_emoji), feed in zip(topic_queries, topic_feeds):
+        if feed is None:
+            continue
+        for entry in feed.entries:
+            # Filter for quality - must contain AI/ML/tech keywords
+            title = entry.get("title", "")
+            if title not in seen_titles and AI_RELEVANCE.search(title):
+                entry["trend_indicator"] = trend_emoji
+                entry["content_type"] = "article"
+                entries.append(entry)
+                seen_titles.add(title)
+
+    for feed in video_feeds:
+        if feed is None:
+            continue
+        for entry in feed.entries:
+            # Google News links redirect to YouTube, so we trust the query intent
+            title = entry.get("title", "").replace(" - YouTube", "")
+            if title and title not in seen_titles:
+                entry["title"] = title
+                entry["trend_indicator"] = "🎥"
+                entry["content_type"] = "video"
+                entries.append(entry)
+                seen_titles.add(title)
+
+    return get_archive().ingest("ai", entries)
+
+
+INGESTERS = {
+    "freight": ingest_freight_news,
+    "policy": ingest_policy_news,
+    "ai": ingest_ai_news,
+    "disruption": ingest_disruption_news,
+}
+
+
+def ensure_fresh(category, wait=True):
+    """
+    Keep a category registered with the background refresher. Only the very
+    first ingest of a category (empty archive) is waited on, and only with
+    wait=True; afterwards the refresher re-ingests ahead of NEWS_TTL and
+    readers just query the archive.
+    """
+    name = f"news:{category}"
+    if name not in refresher.registered():
+        # Seed with the last ingest so a restart doesn't re-fetch fresh categories. Ingesting
+        # fills this replica's archive, so only the feeds themselves are shared (see feeds.py)
+        refresher.register(name, INGESTERS[category], NEWS_TTL,
+                           updated_at=get_archive().last_ingested(category), shared=False)
+    refresher.get(name, wait)
+
+
+# --- QUERIES ---
+
+def get_news(category, limit=10, before=None, wait=True):
+    """Latest articles in a category, older than a page_key if given (wait=False never blocks on a first ingest)"""
+    ensure_fresh(category, wait)
+    return get_archive().query(category, limit, before)
+
+
+def get_freight_industry_news(limit=8, before=None):
+    """Latest freight carrier & logistics news"""
+    return get_news("freight", limit, before)
+
+
+def get_policy_news(limit=6, before=None):
+    """Latest government policy and trade news"""
+    return get_news("policy", limit, before)
+
+
+def get_ai_supply_chain_news(limit=12, before=None):
+    """Latest AI in supply chain articles and videos"""
+    return get_news("ai", limit, before)
+
+
+def get_disruption_news(limit=6, before=None):
+    """Latest supply chain disruption headlines"""
+    return get_news("disruption", limit, before)
+
+
+def search_news(text, categories=None, since_ts=None, limit=20):
+    """Full-text search over the whole news archive; returns (entries, category facet counts)"""
+    return get_archive().search(text, categories, since_ts, limit)
@@ -0,0 +1,375 @@
+"""
+Persistent SQLite archive of news articles.
+
+Fetchers ingest feed entries here incrementally: every article is upserted
+under a stable key derived from its feed id (or link), so re-fetching a feed
+only refreshes what is already stored and history is never thrown away. Reads
+are indexed queries on (category, published_ts), so paging through weeks of
+history costs the same as reading the latest page. Pages are keyed on
+(published_ts, rowid) rather than the time alone: undated entries of one
+ingest all share its timestamp, and a time-only cursor would skip the rest
+of such a tie at a page boundary.
+
+New articles are also checked against the category's MinHash band index
+(see dedupe.py); a near-duplicate of a story already stored (the same
+headline syndicated by another outlet, or re-worded by Google News) only
+refreshes the stored article instead of being added again.
+
+Titles and summaries are full-text indexed with SQLite FTS5 (an inverted
+index kept up to date by triggers as articles are inserted or updated), so
+search() gets BM25 ranking, phrase queries and category/date facets without
+ever re-indexing from scratch.
+
+Reads return compact Article records (see below) rather than feedparser
+dicts: a handful of slots with the publish time as epoch seconds.
+"""
+import calendar
+import hashlib
+import html
+import re
+import sqlite3
+import threading
+import time
+
+from supplyalert import alert_rules, dedupe, storage
+
+CATEGORIES = ("freight", "policy", "ai", "disruption")
+
+DUPLICATE_WINDOW = 14 * 86400  # only stories this close in time count as duplicates
+MAX_BAND_CANDIDATES = 50       # bounds dedupe work per band on crowded buckets
+
+
+def article_key(entry):
+    """Stable key for a feed entry: its id, else its link, else its title"""
+    ident = entry.get("id") or entry.get("link") or entry.get("title", "")
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:20]
+
+
+def _published_ts(entry, fallback):
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if parsed:
+        try:
+            return calendar.timegm(parsed)
+        except Exception:
+            pass
+    return fallback
+
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+def _plain_text(markup):
+    """Feed summary HTML reduced to plain text for storage and search"""
+    return _SPACE.sub(" ", html.unescape(_TAG.sub(" ", markup))).strip()
+
+
+def _source_name(entry):
+    source = entry.get("source")
+    if source and source.get("title"):
+        return source["title"]
+    return ""
+
+
+class Article:
+    """
+    One archived story as shown in the app. `tags` holds labels such as the
+    content type ("video"); `published_ts` is epoch seconds and always set
+    (ingest falls back to first-seen time when a feed gives no date), and
+    `rowid` is its archive row, which breaks ties in page order.
+    """
+    __slots__ = ("title", "link", "source", "category", "published_ts", "tags", "trend_indicator", "rowid")
+
+    def __init__(self, title, link, source, category, published_ts, tags=(), trend_indicator=None, rowid=None):
+        self.title = title
+        self.link = link
+        self.source = source
+        self.category = category
+        self.published_ts = published_ts
+        self.tags = tags
+        self.trend_indicator = trend_indicator
+        self.rowid = rowid
+
+    @property
+    def page_key(self):
+        """Cursor for the page after this article: (published_ts, rowid)"""
+        return (self.published_ts, self.rowid)
+
+    @property
+    def content_type(self):
+        return "video" if "video" in self.tags else "article"
+
+    def __repr__(self):
+        return f"Article({self.category!r}, {self.title!r}, {self.published_ts!r})"
+
+
+class NewsArchive:
+    """Article store backed by one SQLite database"""
+
+    def __init__(self, db_name="news_archive.sqlite"):
+        self._conn = storage.connect(db_name)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    category TEXT NOT NULL,
+                    article_key TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    source TEXT NOT NULL DEFAULT '',
+                    summary TEXT NOT NULL DEFAULT '',
+                    published_ts REAL NOT NULL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    trend_indicator TEXT,
+                    content_type TEXT,
+                    signature BLOB,
+                    PRIMARY KEY (category, article_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_articles_category_published
+                    ON articles (category, published_ts DESC);
+                CREATE INDEX IF NOT EXISTS idx_articles_published
+                    ON articles (published_ts DESC);
+                CREATE TABLE IF NOT EXISTS ingest_log (
+                    category TEXT PRIMARY KEY,
+                    ingested_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS article_bands (
+                    category TEXT NOT NULL,
+                    band INTEGER NOT NULL,
+                    value INTEGER NOT NULL,
+                    article_key TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_article_bands_lookup
+                    ON article_bands (category, band, value);
+            """)
+            self._migrate()
+            self._create_search_index()
+            self._conn.commit()
+
+    def _migrate(self):
+        """Add and backfill MinHash signatures for archives created before dedupe"""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(articles)")]
+        if "signature" not in columns:
+            self._conn.execute("ALTER TABLE articles ADD COLUMN signature BLOB")
+        pending = self._conn.execute(
+            "SELECT category, article_key, title FROM articles WHERE signature IS NULL").fetchall()
+        for category, key, title in pending:
+            self._index_signature(category, key, dedupe.signature(title))
+
+    def _create_search_index(self):
+        """FTS5 index over title + summary, maintained by triggers on articles"""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'").fetchone()
+        self._conn.executescript("""
+            -- category / published_ts ride along unindexed so facets and date
+            -- filters are answered from the index without joining articles
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, summary, category UNINDEXED, published_ts UNINDEXED,
+                content='articles', content_rowid='rowid', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, summary, category, published_ts)
+                VALUES (new.rowid, new.title, new.summary, new.category, new.published_ts);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, category, published_ts)
+                VALUES ('delete', old.rowid, old.title, old.summary, old.category, old.published_ts);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, category, published_ts)
+                VALUES ('delete', old.rowid, old.title, old.summary, old.category, old.published_ts);
+                INSERT INTO articles_fts (rowid, title, summary, category, published_ts)
+                VALUES (new.rowid, new.title, new.summary, new.category, new.published_ts);
+            END;
+        """)
+        if not exists:
+            # One-off backfill for archives created before search existed
+            self._conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
+    def _index_signature(self, category, key, sig):
+        self._conn.execute("UPDATE articles SET signature = ? WHERE category = ? AND article_key = ?",
+                           (dedupe.pack(sig), category, key))
+        self._conn.executemany(
+            "INSERT INTO article_bands (category, band, value, article_key) VALUES (?, ?, ?, ?)",
+            [(category, band, value, key) for band, value in dedupe.bands(sig)])
+
+    def _find_near_duplicate(self, category, sig, published_ts):
+        """Key of a stored near-duplicate, found through the band index"""
+        # CROSS JOIN pins the join order: walk the band bucket first, then look
+        # each candidate up by primary key (never scan the time window)
+        checked = set()
+        for band, value in dedupe.bands(sig):
+            candidates = self._conn.execute("""
+                SELECT a.article_key, a.signature FROM article_bands b
+                CROSS JOIN articles a ON a.category = b.category AND a.article_key = b.article_key
+                WHERE b.category = ? AND b.band = ? AND b.value = ?
+                  AND a.published_ts BETWEEN ? AND ?
+                LIMIT ?
+            """, (category, band, value, published_ts - DUPLICATE_WINDOW, published_ts + DUPLICATE_WINDOW,
+                  MAX_BAND_CANDIDATES))
+            for key, other in candidates:
+                if key in checked:
+                    continue
+                checked.add(key)
+                if dedupe.is_near_duplicate(sig, dedupe.unpack(other)):
+                    return key
+        return None
+
+    def ingest(self, category, entries):
+        """Upsert feed entries into a category; returns the number of new articles"""
+        now = time.time()
+        added = []
+        with self._lock:
+            for entry in entries:
+                title = entry.get("title")
+                if not title:
+                    continue
+                key = article_key(entry)
+                link, summary = entry.get("link", ""), _plain_text(entry.get("summary", ""))
+
+                seen = self._conn.execute(
+                    "UPDATE articles SET last_seen = ? WHERE category = ? AND article_key = ?",
+                    (now, category, key)).rowcount
+                if seen:
+                    # Only touch indexed columns when they changed, to spare the FTS index
+                    self._conn.execute("""
+                        UPDATE articles SET title = ?, link = ?, summary = ?
+                        WHERE category = ? AND article_key = ? AND (title != ? OR link != ? OR summary != ?)
+                    """, (title, link, summary, category, key, title, link, summary))
+                    continue
+
+                published_ts = _published_ts(entry, now)
+                sig = dedupe.signature(title)
+                duplicate_of = self._find_near_duplicate(category, sig, published_ts)
+                if duplicate_of is not None:
+                    self._conn.execute("UPDATE articles SET last_seen = ? WHERE category = ? AND article_key = ?",
+                                       (now, category, duplicate_of))
+                    continue
+
+                self._conn.execute("""
+                    INSERT INTO articles (category, article_key, title, link, source, summary,
+                                          published_ts, first_seen, last_seen, trend_indicator, content_type)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (category, key, title, link, _source_name(entry), summary,
+                      published_ts, now, now, entry.get("trend_indicator"), entry.get("content_type")))
+                self._index_signature(category, key, sig)
+                added.append((key, title, summary))
+
+            self._conn.execute("INSERT OR REPLACE INTO ingest_log (category, ingested_at) VALUES (?, ?)",
+                               (category, now))
+            self._conn.commit()
+        alert_rules.publish(alert_rules.article_events(category, added))
+        return len(added)
+
+    def last_ingested(self, category):
+        """Epoch seconds of the last ingest for a category, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT ingested_at FROM ingest_log WHERE category = ?", (category,)).fetchone()
+        return row[0] if row else None
+
+    def query(self, category, limit=10, before=None, since_ts=None):
+        """
+        Newest-first articles in a category. Pass the page_key of the last
+        row as before to fetch the next (older) page.
+        """
+        sql = ("SELECT title, link, source, category, published_ts, trend_indicator, content_type, rowid "
+               "FROM articles WHERE category = ?")
+        params = [category]
+        if before is not None:
+            sql += " AND (published_ts, rowid) < (?, ?)"
+            params.extend(before)
+        if since_ts is not None:
+            sql += " AND published_ts >= ?"
+            params.append(since_ts)
+        sql += " ORDER BY published_ts DESC, rowid DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_to_article(row) for row in rows]
+
+    def search(self, text, categories=None, since_ts=None, limit=20):
+        """
+        BM25-ranked full-text search (title hits weigh 3x summary hits).
+        Returns (articles, facets) where facets maps category -> match count
+        for the query and date filter, ignoring the category filter.
+        """
+        match = fts_query(text)
+        if not match:
+            return [], {}
+
+        where = "articles_fts MATCH ?"
+        params = [match]
+        if since_ts is not None:
+            where += " AND published_ts >= ?"
+            params.append(since_ts)
+        facet_sql = f"SELECT category, COUNT(*) FROM articles_fts WHERE {where} GROUP BY category"
+
+        hits_where, hits_params = where, list(params)
+        if categories:
+            hits_where += f" AND category IN ({', '.join('?' * len(categories))})"
+            hits_params.extend(categories)
+        hits_params.append(limit)
+        # Rank inside the index, then join only the top hits back to articles
+        result_sql = f"""
+            SELECT a.title, a.link, a.source, a.category, a.published_ts, a.trend_indicator,
+                   a.content_type, a.rowid
+            FROM (SELECT rowid, bm25(articles_fts, 3.0, 1.0) AS score FROM articles_fts
+                  WHERE {hits_where} ORDER BY score LIMIT ?) hits
+            JOIN articles a ON a.rowid = hits.rowid
+            ORDER BY hits.score"""
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(result_sql, hits_params).fetchall()
+                facets = dict(self._conn.execute(facet_sql, params).fetchall())
+            except sqlite3.OperationalError:
+                return [], {}  # query the FTS parser still rejects
+        return [_to_article(row) for row in rows], facets
+
+
+_QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def fts_query(text):
+    """
+    User search text as a safe FTS5 query: "quoted phrases" stay phrases,
+    other words are matched individually (all terms required unless joined
+    by OR) and a trailing * keeps prefix matching. Any other FTS syntax typed
+    by users is treated as plain words.
+    """
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(text):
+        if word == "OR":
+            if terms and terms[-1] != "OR":
+                terms.append("OR")
+        elif phrase:
+            tokens = re.findall(r"\w+", phrase)
+            if tokens:
+                terms.append('"' + " ".join(tokens) + '"')
+        else:
+            prefix = word.endswith("*")
+            for token in re.findall(r"\w+", word):
+                terms.append(f'"{token}"' + ("*" if prefix else ""))
+    if terms and terms[-1] == "OR":
+        terms.pop()
+    return " ".join(terms)
+
+
+def _to_article(row):
+    title, link, source, category, published_ts, trend_indicator, content_type, rowid = row
+    return Article(title, link, source or "", category, published_ts,
+                   (content_type,) if content_type else (), trend_indicator, rowid)
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """Process-wide archive, opened on first use"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = NewsArchive()
+        return _archive
@@ -0,0 +1,299 @@
+"""
+Port congestion time-series store.
+
+Congestion and delay observations are collected from pluggable sources, by
+default any CSV/JSON files dropped into the port drop directory
+(SUPPLYALERT_PORT_DROPS, default <data dir>/port_drops), congestion measured
+from vessel position files (see vessel_positions.py), and the simulated
+baseline for ports nothing has reported on for a day. They are appended to
+a per-port time series in SQLite. The table is WITHOUT ROWID and keyed
+(port, ts), so each port's history is stored contiguously in time order.
+
+Every new observation also updates hourly and daily rollup rows (count, sum,
+min and max delay, worst congestion level) and the port's latest-value row
+in the same transaction. An observation for a (port, ts) already stored
+replaces it if it differs (a daily measurement revised by a later file),
+and then the two rollup buckets it falls in are recomputed from the raw
+series instead. A 30-day trend therefore reads at most 30
+pre-aggregated rows per port and the current status one row per port,
+never the raw series.
+
+Drop files hold rows of port, ts (epoch seconds or ISO 8601), delay_days,
+congestion (Low/Medium/High/Critical, any case) and an optional note. A
+file is ingested once per modification time, and only marked ingested once
+it has been read: one that can't be read is logged and tried again on the
+next pass. Rows that don't parse, have a non-finite delay or an unknown
+congestion level are skipped and logged.
+"""
+import csv
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from supplyalert import alert_rules, storage
+from supplyalert.vessel_positions import vessel_source
+
+LEVELS = ("Low", "Medium", "High", "Critical")
+LEVEL_COLORS = {"Low": "#10B981", "Medium": "#F59E0B", "High": "#EF4444", "Critical": "#EF4444"}
+
+HOUR = 3600
+DAY = 86400
+
+log = logging.getLogger(__name__)
+
+
+# --- SOURCES ---
+
+# Simulated status (real-time port APIs are expensive/restricted); updated to
+# reflect current global shipping climate (Red Sea, Panama, East Coast labor)
+BASELINE = {
+    "Los Angeles/Long Beach": ("Medium", 3, "Volume increasing pre-holiday"),
+    "New York/New Jersey": ("Low", 1, "Fluid operations"),
+    "Savannah": ("Medium", 2, "Vessel bunching reported"),
+    "Houston": ("Low", 1, "Normal operations"),
+    "Seattle/Tacoma": ("Low", 0, "Good availability"),
+    "Panama Canal": ("High", 10, "Drought restrictions active"),
+    "Red Sea Route": ("Critical", 14, "Security diversions via Cape"),
+}
+
+
+def baseline_source(store):
+    """The simulated status above, observed now, for ports without an observation in the last day"""
+    now = time.time()
+    observed = store.last_observed()
+    return [(port, now, delay, level, note) for port, (level, delay, note) in BASELINE.items()
+            if observed.get(port, 0) < now - DAY]
+
+
+def _parse_ts(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def _level_name(congestion):
+    """Congestion level as spelled in LEVELS, or None if it isn't one"""
+    name = str(congestion).strip().capitalize()
+    return name if name in LEVELS else None
+
+
+def _drop_rows(path):
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("observations", []) if isinstance(data, dict) else data
+
+
+def file_drop_source(store, directory=None):
+    """Observations from CSV/JSON files in the drop directory not ingested at their current mtime"""
+    directory = directory or os.getenv("SUPPLYALERT_PORT_DROPS") or os.path.join(storage.DATA_DIR, "port_drops")
+    if not os.path.isdir(directory):
+        return []
+    observations = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith((".csv", ".json")):
+            continue
+        path = os.path.join(directory, name)
+        mtime = os.path.getmtime(path)
+        if store.file_ingested(name, mtime):
+            continue
+        try:
+            rows = _drop_rows(path)
+        except Exception as e:
+            # Left unclaimed, so a corrected file (or a retry) is picked up later
+            log.warning("port drop %s: unreadable (%s)", name, e)
+            continue
+        parsed, skipped = [], 0
+        for row in rows:
+            try:
+                port, ts, delay = row["port"], _parse_ts(row["ts"]), float(row["delay_days"])
+                level = _level_name(row.get("congestion") or "Low")
+            except (KeyError, TypeError, ValueError, AttributeError):
+                level = None
+            if level is None or not port or not (math.isfinite(ts) and math.isfinite(delay)):
+                skipped += 1  # skip malformed rows, keep the rest of the file
+                continue
+            parsed.append((port, ts, delay, level, row.get("note") or ""))
+        if skipped:
+            log.warning("port drop %s: skipped %d malformed row(s)", name, skipped)
+        observations.extend(parsed)
+        store.mark_file_ingested(name, mtime)
+    return observations
+
+
+# --- STORE ---
+
+class PortMetricsStore:
+    """Raw per-port observations plus hourly/daily rollups, in SQLite"""
+
+    def __init__(self, db_name="port_metrics.sqlite"):
+        self._conn = storage.connect(db_name)
+        self._lock = threading.Lock()
+        self._sources = [file_drop_source, vessel_source, baseline_source]   # measured data first
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS observations (
+                    port TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    delay_days REAL NOT NULL,
+                    level INTEGER NOT NULL,
+                    note TEXT,
+                    PRIMARY KEY (port, ts)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS rollups (
+                    resolution INTEGER NOT NULL,   -- bucket width in seconds (HOUR or DAY)
+                    port TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,       -- bucket start, epoch seconds
+                    n INTEGER NOT NULL,
+                    delay_sum REAL NOT NULL,
+                    delay_min REAL NOT NULL,
+                    delay_max REAL NOT NULL,
+                    level_max INTEGER NOT NULL,
+                    PRIMARY KEY (resolution, port, bucket)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS latest (
+                    port TEXT PRIMARY KEY,
+                    ts REAL NOT NULL,
+                    delay_days REAL NOT NULL,
+                    level INTEGER NOT NULL,
+                    note TEXT
+                );
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    name TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL
+                );
+            """)
+            self._conn.commit()
+
+    def add_source(self, fn):
+        """Add a source: fn(store) -> iterable of (port, ts, delay_days, congestion, note)"""
+        self._sources.append(fn)
+
+    def file_ingested(self, name, mtime):
+        """True if a drop file was already ingested at this modification time (or a later one)"""
+        with self._lock:
+            row = self._conn.execute("SELECT mtime FROM ingested_files WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] >= mtime
+
+    def mark_file_ingested(self, name, mtime):
+        """Record a drop file as ingested at this modification time; call once it has been read"""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO ingested_files (name, mtime) VALUES (?, ?)", (name, mtime))
+            self._conn.commit()
+
+    def ingest(self, observations):
+        """Add observations, replacing any stored (port, ts) they revise; returns the count added or changed"""
+        added = []
+        with self._lock:
+            for port, ts, delay, congestion, note in observations:
+                if not (math.isfinite(ts) and math.isfinite(delay)):
+                    log.warning("port %s: dropped observation with non-finite ts/delay", port)
+                    continue  # a NaN or inf stored here would break every later read
+                level = LEVELS.index(_level_name(congestion) or "Low")
+                stored = self._conn.execute("SELECT delay_days, level, note FROM observations WHERE port = ? AND ts = ?",
+                                            (port, ts)).fetchone()
+                if stored == (delay, level, note):
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO observations (port, ts, delay_days, level, note) VALUES (?, ?, ?, ?, ?)",
+                    (port, ts, delay, level, note))
+                added.append((port, ts, delay, LEVELS[level], note))
+                self._conn.execute("""
+                    INSERT INTO latest (port, ts, delay_days, level, note) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (port) DO UPDATE SET
+                        ts = excluded.ts, delay_days = excluded.delay_days,
+                        level = excluded.level, note = excluded.note
+                    WHERE excluded.ts >= latest.ts
+                """, (port, ts, delay, level, note))
+                for resolution in (HOUR, DAY):
+                    bucket = int(ts // resolution) * resolution
+                    if stored is not None:
+                        self._rebuild_rollup(resolution, port, bucket)
+                        continue
+                    self._conn.execute("""
+                        INSERT INTO rollups (resolution, port, bucket, n, delay_sum, delay_min, delay_max, level_max)
+                        VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+                        ON CONFLICT (resolution, port, bucket) DO UPDATE SET
+                            n = n + 1,
+                            delay_sum = delay_sum + excluded.delay_sum,
+                            delay_min = MIN(delay_min, excluded.delay_min),
+                            delay_max = MAX(delay_max, excluded.delay_max),
+                            level_max = MAX(level_max, excluded.level_max)
+                    """, (resolution, port, bucket, delay, delay, delay, level))
+            self._conn.commit()
+        alert_rules.publish(alert_rules.port_events(added))
+        return len(added)
+
+    def _rebuild_rollup(self, resolution, port, bucket):
+        """Recompute one rollup row from the raw series (min/max can't be un-merged incrementally)"""
+        self._conn.execute("""
+            INSERT OR REPLACE INTO rollups (resolution, port, bucket, n, delay_sum, delay_min, delay_max, level_max)
+            SELECT ?, port, ?, COUNT(*), SUM(delay_days), MIN(delay_days), MAX(delay_days), MAX(level)
+            FROM observations WHERE port = ? AND ts >= ? AND ts < ?
+        """, (resolution, bucket, port, bucket, bucket + resolution))
+
+    def collect(self):
+        """Run every source and ingest what it returns; a failing source is skipped"""
+        added = 0
+        for fn in list(self._sources):
+            try:
+                added += self.ingest(fn(self))
+            except Exception:
+                continue
+        return added
+
+    def latest(self):
+        """The get_port_status view: {port: {congestion, delay_days, color, note}} from each port's newest observation"""
+        with self._lock:
+            rows = self._conn.execute("SELECT port, delay_days, level, note FROM latest ORDER BY rowid").fetchall()
+        status = {}
+        for port, delay, level, note in rows:
+            congestion = LEVELS[level]
+            status[port] = {"congestion": congestion, "delay_days": int(delay) if delay == int(delay) else delay,
+                            "color": LEVEL_COLORS[congestion], "note": note or ""}
+        return status
+
+    def last_observed(self):
+        """{port: time of its newest observation}"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT port, ts FROM latest").fetchall())
+
+    def trend(self, port, days=30, resolution=DAY):
+        """[(bucket start, mean delay, min delay, max delay, worst level)] for the last `days` days, oldest first"""
+        since = int((time.time() - days * DAY) // resolution) * resolution
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT bucket, delay_sum / n, delay_min, delay_max, level_max FROM rollups
+                WHERE resolution = ? AND port = ? AND bucket >= ? ORDER BY bucket
+            """, (resolution, port, since)).fetchall()
+        return [(bucket, mean, low, high, LEVELS[level]) for bucket, mean, low, high, level in rows]
+
+    def average_delay(self, days=30):
+        """{port: mean delay over the last `days` days} from the daily rollups"""
+        since = int((time.time() - days * DAY) // DAY) * DAY
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT port, SUM(delay_sum) / SUM(n) FROM rollups
+                WHERE resolution = ? AND bucket >= ? GROUP BY port
+            """, (DAY, since)).fetchall()
+        return dict(rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide port metrics store, opened on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PortMetricsStore()
+        return _store
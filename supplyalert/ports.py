@@ -0,0 +1,15 @@
+"""Port congestion status, from the port metrics time-series store"""
+from supplyalert import port_metrics, refresher
+
+
+@refresher.source("ports", interval=900, shared=False)  # measured from this replica's own files
+def get_port_status():
+    """Newest congestion/delay per port, plus its 30-day average delay where there is history"""
+    store = port_metrics.get_store()
+    store.collect()
+    status = store.latest()
+    averages = store.average_delay(days=30)
+    for port, data in status.items():
+        if port in averages:
+            data["delay_30d"] = round(averages[port], 1)
+    return status
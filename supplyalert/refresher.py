@@ -0,0 +1,262 @@
+"""
+Background refresher with stale-while-revalidate snapshots.
+
+Each data source is registered with the function that fetches it and a
+refresh interval. Readers always get the current snapshot immediately; a
+scheduler thread re-runs each source shortly before its interval runs out,
+off the request path, and swaps the new snapshot in when it completes. Only
+the very first read of a source (no snapshot yet) waits for a fetch.
+
+Sources are registered lazily, the first time something reads them, so the
+scheduler only keeps refreshing data the app actually uses.
+
+Refreshes are single-flight: a source has at most one fetch in flight, and
+every reader, scheduler tick or forced refresh that arrives meanwhile waits
+on that fetch and shares its result rather than starting another. Each
+source counts hits (served from a snapshot), misses (no snapshot, so the
+reader fetched) and coalesced waits, reported by freshness().
+force_refresh() re-fetches a single source on demand, leaving the rest
+alone.
+
+With a shared cache configured (see shared_cache), a shared source's
+snapshots are exchanged between replicas: whichever replica's refresh comes
+due first takes the leader lock and fetches, and the rest adopt its
+snapshot and fetch time, so a source is fetched once per interval overall.
+Work that must happen on every replica when new data arrives (publishing
+alert events into the replica's own rule engine, say) belongs in the
+source's on_update callback, which runs for adopted snapshots too, not in
+its fetch function.
+"""
+import functools
+import threading
+import time
+
+from supplyalert import fetch_engine, shared_cache
+
+REFRESH_AHEAD = 0.8    # refresh once a snapshot is 80% of the way to expiry
+TICK_SECONDS = 5       # scheduler wake-up interval
+RETRY_SECONDS = 60     # wait after a failed refresh before trying again
+
+
+class Source:
+    """One registered data source and its current snapshot"""
+
+    def __init__(self, name, fn, interval, shared=True, on_update=None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.shared = shared     # exchange snapshots with other replicas through the shared cache
+        self.on_update = on_update   # called with each new snapshot, fetched or adopted
+        self.snapshot = None
+        self.updated_at = None   # epoch seconds of the current snapshot
+        self.last_error = None
+        self.retry_at = 0
+        self.refreshing = False
+        self.flight = None       # Event set when the in-flight refresh finishes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def age(self):
+        """Seconds since the current snapshot was fetched, or None"""
+        if self.updated_at is None:
+            return None
+        return time.time() - self.updated_at
+
+    def due(self, now):
+        if self.refreshing or now < self.retry_at:
+            return False
+        if self.updated_at is None:
+            return True
+        return now - self.updated_at >= self.interval * REFRESH_AHEAD
+
+
+_sources = {}
+_lock = threading.Lock()
+_scheduler = None
+
+
+def register(name, fn, interval, snapshot=None, updated_at=None, shared=True, on_update=None):
+    """
+    Register (or re-point) a source. A snapshot restored from elsewhere, e.g.
+    a persistent store, can be seeded with its original fetch time. Sources
+    whose fetch updates local state rather than just returning data should
+    pass shared=False, or move that update into on_update(snapshot).
+    """
+    with _lock:
+        source = _sources.get(name)
+        if source is None:
+            source = _sources[name] = Source(name, fn, interval, shared, on_update)
+            if updated_at is not None:
+                source.snapshot = snapshot
+                source.updated_at = updated_at
+        else:
+            source.fn = fn
+            source.interval = interval
+    _ensure_scheduler()
+    return source
+
+
+def _refresh(source, force=False):
+    try:
+        if source.shared:
+            # A forced refresh won't settle for the shared snapshot, however recent
+            max_age = 0 if force else source.interval * REFRESH_AHEAD
+            snapshot, fetched_at = shared_cache.fetch(f"snapshot:{source.name}", max_age, source.fn)
+        else:
+            snapshot, fetched_at = source.fn(), time.time()
+    except shared_cache.RefreshPending:
+        with _lock:
+            source.retry_at = time.time() + TICK_SECONDS  # another replica is still fetching it
+    except Exception as e:
+        with _lock:
+            source.last_error = str(e) or type(e).__name__
+            source.retry_at = time.time() + min(source.interval, RETRY_SECONDS)
+    else:
+        with _lock:
+            is_new = fetched_at != source.updated_at
+            source.snapshot = snapshot
+            source.updated_at = fetched_at
+            source.last_error = None
+        if is_new and source.on_update is not None:
+            try:
+                source.on_update(snapshot)
+            except Exception:
+                pass  # never costs the source its snapshot
+    finally:
+        with _lock:
+            source.refreshing = False
+            flight = source.flight
+        flight.set()  # waiters stop waiting even if the fetch failed
+
+
+def _start_refresh(source, background=True, force=False):
+    """
+    Kick off a refresh unless one is already running. Returns (flight, started):
+    the Event the running refresh sets when done, and whether this call started it.
+    """
+    with _lock:
+        if source.refreshing:
+            return source.flight, False
+        source.refreshing = True
+        flight = source.flight = threading.Event()
+    if background:
+        fetch_engine.submit_source(_refresh, source, force)
+    else:
+        _refresh(source, force)
+    return flight, True
+
+
+def _count(source, counter):
+    with _lock:
+        setattr(source, counter, getattr(source, counter) + 1)
+
+
+def get(name, wait=True):
+    """
+    Current snapshot of a registered source. With no snapshot yet, either waits
+    for the first fetch (wait=True) or schedules it and returns None.
+    """
+    source = _sources[name]
+    if source.updated_at is not None:
+        _count(source, "hits")
+        return source.snapshot
+    if not wait:
+        _, started = _start_refresh(source)
+        _count(source, "misses" if started else "coalesced")
+        return source.snapshot
+    if time.time() < source.retry_at:
+        _count(source, "misses")
+        return source.snapshot  # first fetch failed recently; don't block every rerun on it
+    flight, started = _start_refresh(source, background=False)
+    if not started:
+        _count(source, "coalesced")
+        flight.wait(fetch_engine.RENDER_BUDGET)
+    else:
+        _count(source, "misses")
+    return source.snapshot
+
+
+def force_refresh(name, wait=True):
+    """
+    Re-fetch one registered source now, whatever its age, for admin use. A
+    refresh already in flight is joined rather than duplicated. With wait,
+    returns whether a new snapshot landed; without, whether one was started.
+    """
+    source = _sources[name]
+    before = source.updated_at
+    flight, started = _start_refresh(source, force=True)
+    if not started:
+        _count(source, "coalesced")
+    if not wait:
+        return started
+    flight.wait(fetch_engine.RENDER_BUDGET)
+    return source.updated_at != before
+
+
+def source(name, interval, shared=True, on_update=None):
+    """
+    Decorator registering a zero-argument fetcher as a refreshed source; the
+    decorated function returns the current snapshot instead of fetching.
+    Its .peek() never waits: with no snapshot yet it schedules the first
+    fetch and returns None.
+    """
+    def decorator(fn):
+        def snapshot(wait):
+            if name not in _sources:
+                register(name, fn, interval, shared=shared, on_update=on_update)
+            return get(name, wait)
+
+        @functools.wraps(fn)
+        def wrapper():
+            return snapshot(wait=True)
+        wrapper.peek = lambda: snapshot(wait=False)
+        wrapper.source_name = name
+        return wrapper
+    return decorator
+
+
+def registered():
+    """Names of all registered sources"""
+    with _lock:
+        return set(_sources)
+
+
+def updated_at(name):
+    """Epoch seconds of the named source's current snapshot, or None"""
+    source = _sources.get(name)
+    return source.updated_at if source is not None else None
+
+
+def age(name):
+    """Seconds since the named source was last refreshed, or None"""
+    source = _sources.get(name)
+    return source.age() if source is not None else None
+
+
+def freshness():
+    """Age, interval, last refresh error and read counters of every registered source"""
+    with _lock:
+        sources = list(_sources.values())
+    return [{"source": s.name, "age": s.age(), "interval": s.interval,
+             "refreshing": s.refreshing, "last_error": s.last_error,
+             "hits": s.hits, "misses": s.misses, "coalesced": s.coalesced}
+            for s in sorted(sources, key=lambda s: s.name)]
+
+
+def _run_scheduler():
+    while True:
+        now = time.time()
+        with _lock:
+            due = [s for s in _sources.values() if s.updated_at is not None and s.due(now)]
+        for source in due:
+            _start_refresh(source)
+        time.sleep(TICK_SECONDS)
+
+
+def _ensure_scheduler():
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(target=_run_scheduler, name="supplyalert-refresher", daemon=True)
+            _scheduler.start()
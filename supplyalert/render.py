@@ -0,0 +1,193 @@
+"""
+Batched HTML rendering for the card sections of the dashboard, news and
+jobs pages.
+
+Pages used to call st.markdown once per card, with every card carrying a
+long run of inline styles, so one rerun sent 30+ separate elements. Each
+section is now built from precompiled single-line templates into one HTML
+string and emitted as a single element. Layout and styling live in CSS
+classes (see app.py's stylesheet), and column layouts are CSS grids instead
+of one Streamlit column per card.
+
+Sections are memoized on a hash of the rows they're built from (titles,
+links, display dates...), so unchanged sections are not rebuilt on a rerun
+and identical sections are shared between sessions.
+
+`stylesheet_loader` wraps the stylesheet in a tiny script that installs it
+in the page head once. The app sends it once per browser session instead
+of re-sending the whole stylesheet on every rerun.
+"""
+import hashlib
+import html
+import json
+import re
+import threading
+from collections import OrderedDict
+
+MEMO_SIZE = 256   # rendered sections kept in memory
+
+
+def _esc(text):
+    """Escaped text on one line (a blank line would end Streamlit's HTML block)"""
+    return html.escape(" ".join(str(text).split()))
+
+
+# --- TEMPLATES ---
+# Single-line on purpose: Streamlit's markdown treats indented HTML as code blocks.
+
+GRID = '<div class="card-grid" style="--cols:{cols}">{cards}</div>'
+STACK = '<div class="card-stack">{cards}</div>'
+
+WEATHER_CARD = ('<a class="card-link" href="https://www.weather.gov/" target="_blank">'
+                '<div class="alert-card{warning}"><div class="alert-card-head"><h3>{type}</h3>'
+                '<span class="severity-pill {severity_class}">{severity}</span></div>'
+                '<p class="alert-location"><strong>📍 Location:</strong> {location}</p>'
+                '<p class="alert-impact"><strong>⚠️ Impact:</strong> {impact}</p>'
+                '<div class="alert-more">View Details →</div></div></a>')
+
+PORT_CARD = ('<div class="stat-card"><div class="stat-value" style="color:{color}">{delay}</div>'
+             '<div class="stat-label">Days Delay</div><div class="stat-name">{port}</div>'
+             '<div class="stat-note">{congestion} Congestion</div>{trend}</div>')
+PORT_TREND = '<div class="stat-trend">30-day avg: {average} days</div>'
+
+NEWS_ITEM = ('<div class="news-item {accent}"><a href="{link}" target="_blank">{title}</a>'
+             '<div class="news-item-date">{date}</div></div>')
+
+AI_NEWS_ITEM = ('<div class="news-item ai"><div class="news-item-row"><span class="trend-icon">{trend}</span>'
+                '<a href="{link}" target="_blank">{title}</a>{badge}</div>'
+                '<div class="news-item-date">{date}</div></div>')
+
+NEWS_CARD = ('<div class="alert-card {accent}"><a class="news-card-title" href="{link}" target="_blank">{title}</a>'
+             '<p class="news-card-meta">{meta}</p></div>')
+
+AI_NEWS_CARD = ('<div class="alert-card ai{video}"><div class="news-item-row"><span class="trend-icon large">{trend}</span>'
+                '<div class="news-card-body"><a class="news-card-title" href="{link}" target="_blank">{title}</a>{badge}'
+                '<p class="news-card-meta">{date}</p></div></div></div>')
+
+VIDEO_BADGE = '<span class="video-badge">VIDEO</span>'
+VIDEO_BADGE_LARGE = '<span class="video-badge large">🎥 VIDEO</span>'
+
+JOB_CARD = ('<div class="job-card"><div class="job-card-head"><div class="job-card-heading"><h3 class="job-title">{title}</h3>'
+            '<p class="company-badge">🏢 {company}</p></div><span class="date-badge">{date}</span></div>'
+            '<div class="job-card-facts"><span class="job-location">📍 {location}</span><span class="salary-badge">💰 {salary}</span></div>'
+            '<p class="job-summary">{summary}</p><div class="job-skills"><p class="job-skills-label">Required Skills:</p>'
+            '<div class="job-skill-list">{skills}</div></div><div class="job-card-foot"><span class="job-source">✅ {source}</span>'
+            '<a href="{link}" target="_blank" class="apply-btn">Apply Now →</a></div></div>')
+
+SKILL_TAG = '<span class="skill-tag">{skill}</span>'
+
+# --- MEMOIZATION ---
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _memoized(kind, rows, build):
+    """build(rows) cached on a hash of the section kind and its rows"""
+    key = hashlib.sha1(repr((kind, rows)).encode("utf-8")).hexdigest()
+    with _memo_lock:
+        cached = _memo.get(key)
+        if cached is not None:
+            _memo.move_to_end(key)
+            return cached
+    result = build(rows)
+    with _memo_lock:
+        _memo[key] = result
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return result
+
+
+def _layout(cards, cols):
+    cards = "".join(cards)
+    return GRID.format(cols=cols, cards=cards) if cols > 1 else STACK.format(cards=cards)
+
+
+# --- SECTIONS ---
+
+def weather_alerts(alerts):
+    """One row of weather alert cards"""
+    rows = tuple((a['type'], a['severity'], a['location'], a['impact']) for a in alerts)
+    return _memoized("weather", rows, lambda rows: _layout([
+        WEATHER_CARD.format(type=_esc(kind), severity=_esc(severity), location=_esc(location), impact=_esc(impact),
+                            warning="" if severity == "High" else " warning",
+                            severity_class="high" if severity == "High" else "elevated")
+        for kind, severity, location, impact in rows], min(len(rows), 4)))
+
+
+def port_stats(ports):
+    """One row of port delay cards"""
+    rows = tuple((port, data['delay_days'], data['congestion'], data['color'], data.get('delay_30d'))
+                 for port, data in ports.items())
+    return _memoized("ports", rows, lambda rows: _layout([
+        PORT_CARD.format(port=_esc(port), delay=_esc(str(delay)), congestion=_esc(congestion), color=_esc(color),
+                         trend=PORT_TREND.format(average=_esc(average)) if average is not None else "")
+        for port, delay, congestion, color, average in rows], len(rows)))
+
+
+def news_list(rows, accent, cols=1):
+    """Compact headline list; rows are (title, link, date)"""
+    return _memoized(("news", accent, cols), tuple(rows), lambda rows: _layout([
+        NEWS_ITEM.format(title=_esc(title), link=_esc(link), date=_esc(date), accent=accent)
+        for title, link, date in rows], cols))
+
+
+def ai_news_list(rows):
+    """Compact AI headline list; rows are (title, link, date, trend, content_type)"""
+    return _memoized("ai-news", tuple(rows), lambda rows: _layout([
+        AI_NEWS_ITEM.format(title=_esc(title), link=_esc(link), date=_esc(date), trend=trend,
+                            badge=VIDEO_BADGE if content_type == "video" else "")
+        for title, link, date, trend, content_type in rows], 1))
+
+
+def news_cards(rows, accent):
+    """Full-width news cards; rows are (title, link, meta line)"""
+    return _memoized(("news-cards", accent), tuple(rows), lambda rows: _layout([
+        NEWS_CARD.format(title=_esc(title), link=_esc(link), meta=_esc(meta), accent=accent)
+        for title, link, meta in rows], 1))
+
+
+def ai_news_cards(rows):
+    """Full-width AI news cards; rows are (title, link, date, trend, content_type)"""
+    return _memoized("ai-news-cards", tuple(rows), lambda rows: _layout([
+        AI_NEWS_CARD.format(title=_esc(title), link=_esc(link), date=_esc(date), trend=trend,
+                            video=" video" if content_type == "video" else "",
+                            badge=VIDEO_BADGE_LARGE if content_type == "video" else "")
+        for title, link, date, trend, content_type in rows], 1))
+
+
+def job_cards(rows):
+    """Job listing cards; rows are (title, company, date, location, salary, summary, skills, source, link)"""
+    return _memoized("jobs", tuple(rows), lambda rows: _layout([
+        JOB_CARD.format(title=_esc(title), company=_esc(company), date=_esc(date), location=_esc(location),
+                        salary=_esc(salary), summary=_esc(summary), source=_esc(source), link=_esc(link),
+                        skills="".join(SKILL_TAG.format(skill=_esc(skill)) for skill in skills))
+        for title, company, date, location, salary, summary, skills, source, link in rows], 1))
+
+
+# --- STYLESHEET ---
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css):
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_SPACE.sub(" ", css)
+    return _CSS_PUNCTUATION.sub(r"\1", css).strip()
+
+
+def stylesheet_loader(css):
+    """
+    HTML for a zero-height component that installs css in the app page's
+    head, once per page load. The style element outlives the component, so
+    later reruns don't need to send the stylesheet again.
+    """
+    style_id = "supplyalert-css-" + hashlib.sha1(css.encode("utf-8")).hexdigest()[:8]
+    payload = json.dumps(css).replace("</", "<\\/")
+    return ('<script>(function(){var d=window.parent.document;'
+            f'if(d.getElementById("{style_id}"))return;'
+            f'var s=d.createElement("style");s.id="{style_id}";s.textContent={payload};'
+            'd.head.appendChild(s);})();</script>')
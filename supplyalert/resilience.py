@@ -0,0 +1,143 @@
+"""
+Circuit breakers and per-source health for upstream hosts.
+
+Each host (freightwaves.com, news.google.com, api.open-meteo.com, ...) gets
+one breaker. After FAILURE_THRESHOLD consecutive failures it opens and calls
+to that host are skipped for COOLDOWN_SECONDS; the first call after the
+cool-down is let through as a probe and either closes the breaker again or
+re-opens it. Every source URL also records its last error and last success
+so the UI can show why a feed is empty.
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+FAILURE_THRESHOLD = 3
+COOLDOWN_SECONDS = 120
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for a single host"""
+
+    def __init__(self, host, failure_threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN_SECONDS):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self):
+        """True if a call may go out now (only one probe while half-open)"""
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) or type(error).__name__
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+_breakers = {}
+_sources = {}
+_lock = threading.Lock()
+
+
+def breaker_for(url):
+    """Shared breaker for url's host"""
+    host = urlparse(url).hostname or ""
+    with _lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def _record(url, error=None, served_stale=False):
+    with _lock:
+        status = _sources.setdefault(url, {"last_success": None, "last_error": None, "last_error_at": None})
+        if error is None:
+            status["last_success"] = time.time()
+        else:
+            status["last_error"] = str(error) or type(error).__name__
+            status["last_error_at"] = time.time()
+        status["served_stale"] = served_stale
+
+
+def guarded_call(url, fn, *args, **kwargs):
+    """
+    Call fn(*args, **kwargs) behind url's host breaker, recording the outcome
+    for url. Raises CircuitOpenError without calling fn while the breaker is open.
+    """
+    breaker = breaker_for(url)
+    if not breaker.allow():
+        error = CircuitOpenError(f"{breaker.host} circuit open: {breaker.last_error}")
+        _record(url, error, served_stale=True)
+        raise error
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        breaker.record_failure(e)
+        _record(url, e)
+        raise
+    breaker.record_success()
+    _record(url)
+    return result
+
+
+def mark_stale(url, error):
+    """Note that url failed and its last-known-good data was served instead"""
+    _record(url, error, served_stale=True)
+
+
+def source_status():
+    """Health of every source seen so far, for display"""
+    with _lock:
+        sources = list(_sources.items())
+    rows = []
+    for url, status in sorted(sources):
+        breaker = breaker_for(url)
+        rows.append({
+            "source": url,
+            "host": breaker.host,
+            "state": breaker.state,
+            "failures": breaker.failures,
+            "last_error": status["last_error"],
+            "last_error_at": status["last_error_at"],
+            "last_success": status["last_success"],
+            "served_stale": status.get("served_stale", False),
+        })
+    return rows
@@ -0,0 +1,85 @@
+"""
+LRU/TTL cache for AI assistant answers.
+
+Answers are keyed by the normalized question plus the live-context version
+they were generated against, so a cached answer is never served against
+newer data. Entries expire after a TTL and the least recently used entry is
+evicted beyond max_entries. Optionally entries are also written to SQLite so
+they survive restarts.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from supplyalert import storage
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text):
+    """Case, whitespace and trailing punctuation don't change the question"""
+    return _SPACE.sub(" ", text).strip().lower().rstrip("?!. ")
+
+
+class ResponseCache:
+    """Thread-safe LRU with per-entry TTL and optional SQLite persistence"""
+
+    def __init__(self, max_entries=256, ttl=1800, db_name=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (value, created_at)
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_name:
+            self._conn = storage.connect(db_name)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    prompt TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (prompt, version)
+                )""")
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl,))
+            self._conn.commit()
+
+    @staticmethod
+    def key(prompt, version):
+        return normalize_prompt(prompt), version
+
+    def get(self, prompt, version):
+        """Cached answer or None"""
+        key = self.key(prompt, version)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute("SELECT value, created_at FROM responses WHERE prompt = ? AND version = ?",
+                                         key).fetchone()
+                if row is not None:
+                    entry = self._entries[key] = (row[0], row[1])
+            if entry is None:
+                return None
+            value, created_at = entry
+            if now - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, prompt, version, value):
+        key = self.key(prompt, version)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._conn is not None:
+                self._conn.execute("INSERT OR REPLACE INTO responses (prompt, version, value, created_at) "
+                                   "VALUES (?, ?, ?, ?)", key + (value, now))
+                self._conn.commit()
+
+    def __contains__(self, prompt_and_version):
+        return self.get(*prompt_and_version) is not None
@@ -0,0 +1,308 @@
+"""
+Cache shared between app replicas, with leader-elected refreshes.
+
+Each process used to refresh every source on its own clock, so N replicas
+behind a load balancer made N times the upstream calls (and burned N times
+the Adzuna quota) and could show different data. With SUPPLYALERT_SHARED_CACHE
+set, refreshed snapshots and downloaded feeds go through a shared store:
+
+    redis://[:password@]host:6379/0               anything speaking the Redis protocol
+    sqlite:///var/lib/supplyalert/shared.sqlite   a SQLite file, for replicas on one host
+    sqlite:shared.sqlite                          ... relative to the data directory
+
+The SQLite backend uses a rollback journal rather than WAL (WAL needs
+shared memory, so one host), but still relies on file locks, which many
+network filesystems don't implement reliably. Use Redis when replicas run
+on different hosts.
+
+`fetch(key, max_age, fn)` returns the shared value while it is younger than
+max_age. Once it's older, replicas race for a leader lock (SET NX PX, so it
+expires on its own if the leader dies) and only the winner runs fn and
+publishes the result. The others keep polling the shared value until it
+lands, up to FOLLOWER_WAIT, so each source is fetched once per interval
+across the whole deployment. A value published after a call started is
+always accepted, so a forced refresh (max_age 0) that loses the race takes
+the winner's result. A leader whose fetch fails releases the lock
+straight away, so another replica can try instead of everyone waiting out
+LEADER_TTL.
+
+Values are pickled. Every replica runs the same code, and the store must
+not be writable by anything else.
+"""
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import unquote, urlsplit
+
+from supplyalert import storage
+
+LEADER_TTL = 60          # seconds a leader lock lasts; a refresh must finish within it
+FOLLOWER_WAIT = 10       # seconds a follower waits for the leader's result
+POLL_INTERVAL = 0.25
+KEEP_FACTOR = 2          # a shared value is dropped from the store once this many times max_age old
+
+REPLICA_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}".encode("utf-8")
+
+
+class RefreshPending(Exception):
+    """Another replica holds the leader lock and hasn't published yet"""
+
+
+class BackendError(Exception):
+    """The shared store is unreachable or failed a command"""
+
+
+# --- BACKENDS ---
+
+class SQLiteBackend:
+    """Key/value table in a SQLite file shared by the replicas on one host"""
+
+    def __init__(self, path):
+        # Not storage.connect: that turns on WAL, and this file is opened by several processes
+        self._conn = sqlite3.connect(storage.data_path(path), check_same_thread=False, timeout=10,
+                                     isolation_level=None)   # explicit transactions below
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS shared_cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires_at REAL
+                )""")
+
+    def get(self, key):
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT value, expires_at FROM shared_cache WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                raise BackendError(e) from e
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO shared_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                                   (key, value, expires_at))
+            except sqlite3.Error as e:
+                raise BackendError(e) from e
+
+    def set_nx(self, key, value, ttl):
+        """Set key only if absent or expired; True if this call set it"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")   # write lock across processes
+                self._conn.execute("DELETE FROM shared_cache WHERE key = ? AND expires_at <= ?", (key, now))
+                added = self._conn.execute(
+                    "INSERT OR IGNORE INTO shared_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, now + ttl)).rowcount
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise BackendError(e) from e
+        return added == 1
+
+    def delete_if(self, key, value):
+        """Delete key if it still holds value"""
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM shared_cache WHERE key = ? AND value = ?", (key, value))
+            except sqlite3.Error as e:
+                raise BackendError(e) from e
+
+
+class RedisBackend:
+    """Minimal RESP client: just GET, SET [NX] PX and DEL, on one reconnecting socket"""
+
+    def __init__(self, url, timeout=5):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _send(self, *args):
+        payload = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            payload.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(payload))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise BackendError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"unexpected reply {line!r}")
+
+    def command(self, *args):
+        """Run one command, reconnecting once if the connection went away"""
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except OSError as e:
+                    self._close()
+                    if attempt == 2:
+                        raise BackendError(e) from e
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def get(self, key):
+        return self.command("GET", key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.command("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self.command("SET", key, value)
+
+    def set_nx(self, key, value, ttl):
+        return self.command("SET", key, value, "NX", "PX", int(ttl * 1000)) == "OK"
+
+    def delete_if(self, key, value):
+        # Not atomic, but the lock only changes hands after LEADER_TTL, long after its holder checks it
+        if self.get(key) == value:
+            self.command("DEL", key)
+
+
+def open_backend(url):
+    """Backend for a SUPPLYALERT_SHARED_CACHE url"""
+    parts = urlsplit(url)
+    if parts.scheme == "redis":
+        return RedisBackend(url)
+    if parts.scheme == "sqlite":
+        return SQLiteBackend(unquote(parts.path))
+    raise ValueError(f"unsupported shared cache url {url!r}")
+
+
+_backend = None
+_backend_loaded = False
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The configured shared backend, or None when caching is per-process"""
+    global _backend, _backend_loaded
+    with _backend_lock:
+        if not _backend_loaded:
+            url = os.getenv("SUPPLYALERT_SHARED_CACHE")
+            _backend = open_backend(url) if url else None
+            _backend_loaded = True
+        return _backend
+
+
+# --- LEADER-ELECTED FETCH ---
+
+def fetch(key, max_age, fn, wait=FOLLOWER_WAIT):
+    """
+    (value, fetched_at) for key: the shared value while it's younger than
+    max_age, else fn() run by whichever replica wins the leader lock. Without
+    a backend, or with the backend unreachable, this is just fn(). Raises
+    RefreshPending if another replica is leading and hasn't published within
+    `wait` seconds.
+    """
+    backend = get_backend()
+    if backend is None:
+        return fn(), time.time()
+
+    value_key, leader_key = f"value:{key}", f"leader:{key}"
+    started = time.time()
+    deadline = started + wait
+    while True:
+        try:
+            shared = _fresh(backend, value_key, max_age, started)
+            if shared is not None:
+                return shared
+            leading = backend.set_nx(leader_key, REPLICA_ID, LEADER_TTL)
+            if leading:
+                # The previous leader may have published between our read and its unlock
+                shared = _fresh(backend, value_key, max_age, started)
+        except BackendError:
+            return fn(), time.time()  # fetching locally beats not fetching at all
+        if leading:
+            try:
+                if shared is not None:
+                    return shared
+                value = fn()
+                fetched_at = time.time()
+                _quietly(backend.set, value_key, pickle.dumps((fetched_at, value), pickle.HIGHEST_PROTOCOL),
+                         max(max_age * KEEP_FACTOR, LEADER_TTL))
+                return value, fetched_at
+            finally:
+                _quietly(backend.delete_if, leader_key, REPLICA_ID)
+        if time.time() >= deadline:
+            raise RefreshPending(f"{key} is being refreshed by another replica")
+        time.sleep(POLL_INTERVAL)
+
+
+def _fresh(backend, value_key, max_age, started):
+    """
+    (value, fetched_at) from the shared store if younger than max_age or
+    published since `started`, else None. An unreadable value (truncated, or
+    from an incompatible version) counts as missing; the next leader
+    overwrites it.
+    """
+    raw = backend.get(value_key)
+    if raw is None:
+        return None
+    try:
+        fetched_at, value = pickle.loads(raw)
+    except Exception:
+        return None
+    if time.time() - fetched_at >= max_age and fetched_at < started:
+        return None
+    return value, fetched_at
+
+
+def _quietly(command, *args):
+    """Run a backend command whose failure only costs sharing, not the fetched value"""
+    try:
+        command(*args)
+    except BackendError:
+        pass
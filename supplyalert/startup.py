@@ -0,0 +1,68 @@
+"""
+Cold-start profile of the first script run in a process.
+
+A fresh container pays for imports, page config, the stylesheet, the first
+data fetch and the first render before anything reaches the browser. The
+first run of app.py in a process splits its time-to-first-render into those
+phases so slow boots can be attributed. Later reruns reuse the imported
+modules and warm caches, and are not recorded.
+
+app.py imports this module first, so the clock starts before any other
+import. `checkpoint()` closes the sequential phases (import, config, css),
+`timed("fetch")` wraps data loading wherever the first page does it, and
+`finish()` attributes the remaining time to render.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+PHASES = ("import", "config", "css", "fetch", "render")
+
+_started = time.perf_counter()
+_last_checkpoint = _started
+_durations = {}
+_finished = False
+_lock = threading.Lock()
+
+
+def checkpoint(phase):
+    """Close a sequential phase: time since the previous checkpoint (first run only)"""
+    global _last_checkpoint
+    now = time.perf_counter()
+    with _lock:
+        if _finished:
+            return
+        _durations[phase] = _durations.get(phase, 0.0) + now - _last_checkpoint
+        _last_checkpoint = now
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to a phase (first run only)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            if not _finished:
+                _durations[phase] = _durations.get(phase, 0.0) + time.perf_counter() - started
+
+
+def finish():
+    """End the first run; whatever wasn't attributed since the last checkpoint is render time"""
+    global _finished
+    now = time.perf_counter()
+    with _lock:
+        if _finished:
+            return
+        _durations["render"] = max(now - _last_checkpoint - _durations.get("fetch", 0.0), 0.0)
+        _durations["total"] = now - _started
+        _finished = True
+
+
+def report():
+    """{phase: seconds, ..., "total": seconds} once the first run has finished, else None"""
+    with _lock:
+        if not _finished:
+            return None
+        return {phase: _durations.get(phase, 0.0) for phase in PHASES + ("total",)}
@@ -0,0 +1,24 @@
+"""On-disk locations for SupplyAlert's persistent caches and stores"""
+import os
+import sqlite3
+
+# Override with SUPPLYALERT_DATA_DIR (e.g. a mounted volume on a server)
+DATA_DIR = os.getenv("SUPPLYALERT_DATA_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".supplyalert")
+
+
+def data_path(name):
+    """Path of a file inside the data directory, creating the directory if needed"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+def connect(name):
+    """
+    SQLite connection to a database in the data directory. The connection may
+    be shared across threads, so callers must serialize access with a lock.
+    """
+    conn = sqlite3.connect(data_path(name), check_same_thread=False, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
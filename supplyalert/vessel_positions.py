@@ -0,0 +1,347 @@
+"""
+Port congestion measured from bulk vessel position reports.
+
+Position files are dropped into SUPPLYALERT_AIS_DIR (default <data dir>/ais):
+CSV or gzipped CSV with a header (MarineCadastre-style dumps work as is),
+or .npz archives of already decoded reports. The columns used are MMSI,
+timestamp (epoch seconds or ISO 8601), latitude, longitude and speed over
+ground in knots; only those columns are parsed, by np.loadtxt in C.
+
+Each port has anchorage and berth polygons. A report from a vessel making
+less than STATIONARY_KNOTS inside one of them counts that vessel as at
+anchor / at berth on that UTC day. Everything is array operations over the
+whole file: stationary reports are cut to the ports' combined bounding box,
+then to each port's own box, and only those survivors are tested against
+the polygons (ray casting vectorized over points, one pass per edge).
+
+Files are independent shards: with several files they're scanned in a
+process pool, one file per task, and the per-port sets of vessel ids are
+merged afterwards. The pool is process-wide and uses the spawn start method;
+forking the multithreaded app process could deadlock the children. A file
+that can't be read is logged and skipped, and only files whose positions
+were stored are marked ingested, so a failed one is retried next pass.
+
+The vessels seen per port, role and UTC day are kept in SQLite, so a file
+arriving later for a day already reported adds to that day's counts. Per
+port and day the delay estimate is the queue at anchor over the vessels
+worked at berth (Little's law with a day as the unit), which maps to the
+same congestion levels as the port status. Each day's observation is
+stamped at the start of the day, so a recount replaces it.
+"""
+import csv
+import gzip
+import logging
+import multiprocessing
+import os
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from supplyalert import storage
+
+STATIONARY_KNOTS = 0.5
+MAX_SCAN_WORKERS = 8
+DAY = 86400
+DAY_KEY = 10 ** 10        # (day, mmsi) packed as day * DAY_KEY + mmsi; MMSIs have 9 digits
+
+FILE_SUFFIXES = (".csv", ".csv.gz", ".npz")
+FIELDS = ("mmsi", "ts", "lat", "lon", "sog")
+CSV_DTYPE = [("mmsi", "f8"), ("ts", "U32"), ("lat", "f8"), ("lon", "f8"), ("sog", "f8")]   # ts: epoch or ISO
+COLUMN_ALIASES = {
+    "mmsi": ("mmsi",),
+    "ts": ("ts", "timestamp", "basedatetime", "time", "datetime"),
+    "lat": ("lat", "latitude"),
+    "lon": ("lon", "lng", "longitude"),
+    "sog": ("sog", "speed"),
+}
+
+
+def _box(min_lon, min_lat, max_lon, max_lat):
+    return [(min_lon, min_lat), (max_lon, min_lat), (max_lon, max_lat), (min_lon, max_lat)]
+
+
+# Rings of (lon, lat) pairs, GeoJSON order. Panama Canal and the Red Sea
+# route are transits, not port calls, and stay on the simulated baseline.
+PORT_AREAS = {
+    "Los Angeles/Long Beach": {
+        "anchorage": [_box(-118.30, 33.56, -118.05, 33.70)],
+        "berths": [_box(-118.29, 33.70, -118.17, 33.78)],
+    },
+    "New York/New Jersey": {
+        "anchorage": [_box(-74.08, 40.42, -73.90, 40.55)],
+        "berths": [_box(-74.18, 40.63, -74.02, 40.71)],
+    },
+    "Savannah": {
+        "anchorage": [_box(-80.90, 31.85, -80.65, 32.05)],
+        "berths": [_box(-81.16, 32.07, -81.04, 32.14)],
+    },
+    "Houston": {
+        "anchorage": [_box(-94.75, 29.15, -94.45, 29.35)],
+        "berths": [_box(-95.06, 29.56, -94.95, 29.70)],
+    },
+    "Seattle/Tacoma": {
+        "anchorage": [_box(-122.42, 47.59, -122.36, 47.63)],
+        "berths": [_box(-122.37, 47.56, -122.32, 47.60), _box(-122.45, 47.24, -122.35, 47.30)],
+    },
+}
+
+log = logging.getLogger(__name__)
+
+
+def congestion_level(delay_days):
+    """Delay estimate to the status levels used by the port cards"""
+    if delay_days <= 1:
+        return "Low"
+    if delay_days <= 4:
+        return "Medium"
+    if delay_days <= 10:
+        return "High"
+    return "Critical"
+
+
+def _bounds(rings):
+    lons = [lon for ring in rings for lon, _ in ring]
+    lats = [lat for ring in rings for _, lat in ring]
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def _in_bounds(bounds, lon, lat):
+    min_lon, min_lat, max_lon, max_lat = bounds
+    return (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+
+
+def points_in_ring(ring, lon, lat):
+    """Ray casting for arrays of points against one ring of (lon, lat) pairs"""
+    import numpy as np  # deferred: only the vessel scan needs it
+
+    inside = np.zeros(len(lon), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for (xi, yi), (xj, yj) in zip(ring, ring[-1:] + ring[:-1]):
+            crosses = (yi > lat) != (yj > lat)   # horizontal edges never cross, so no 0/0 is used
+            inside ^= crosses & (lon < (xj - xi) * (lat - yi) / (yj - yi) + xi)
+    return inside
+
+
+# --- LOADING ---
+
+def _column(header, field):
+    for alias in COLUMN_ALIASES[field]:
+        if alias in header:
+            return header.index(alias)
+    raise ValueError(f"no {field} column")
+
+
+def _read_csv(path):
+    """
+    {field: array} for the used columns. np.loadtxt parses only those
+    columns, in C, and honours quoted fields; a ragged file (blank or
+    truncated rows) falls back to reading row by row.
+    """
+    import numpy as np  # deferred: only the vessel scan needs it
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        header = [name.strip().lower() for name in next(csv.reader([f.readline()]), [])]
+        columns = [_column(header, field) for field in FIELDS]
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)   # a header-only file is just empty
+                table = np.loadtxt(f, delimiter=",", quotechar='"', comments=None, usecols=columns,
+                                   dtype=CSV_DTYPE, ndmin=1)
+            return {field: table[field] for field in FIELDS}
+        except ValueError:
+            pass
+    return _read_csv_rows(path, columns)
+
+
+def _read_csv_rows(path, columns):
+    """{field: list of strings} for the used columns, skipping rows too short to have them"""
+    opener = gzip.open if path.endswith(".gz") else open
+    width = max(columns) + 1
+    values = {field: [] for field in FIELDS}
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        rows = csv.reader(f)
+        next(rows, None)
+        for row in rows:
+            if len(row) < width:
+                continue  # blank or truncated line
+            for field, column in zip(FIELDS, columns):
+                values[field].append(row[column])
+    return values
+
+
+def _timestamps(values):
+    """Epoch seconds from numeric or ISO 8601 strings"""
+    import numpy as np
+
+    try:
+        return np.asarray(values, dtype=float).astype(np.int64)
+    except ValueError:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)   # a trailing "Z" is UTC, which is what we want
+            return np.asarray(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def load_positions(path):
+    """(mmsi, ts, lat, lon, sog) arrays from one position file"""
+    import numpy as np  # deferred: only the vessel scan needs it
+
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return tuple(np.asarray(data[field]) for field in FIELDS)
+
+    values = _read_csv(path)
+    return (np.asarray(values["mmsi"], dtype=float), _timestamps(values["ts"]),
+            np.asarray(values["lat"], dtype=float), np.asarray(values["lon"], dtype=float),
+            np.asarray(values["sog"], dtype=float))
+
+
+# --- SCANNING ---
+
+def scan_file(path):
+    """
+    One shard: ({(port, "anchorage"|"berths"): packed (day, mmsi) keys}, error).
+    An unreadable file comes back empty with the reason as error.
+    """
+    import numpy as np
+
+    try:
+        mmsi, ts, lat, lon, sog = load_positions(path)
+    except Exception as e:
+        return {}, f"{type(e).__name__}: {e}"
+
+    keep = sog < STATIONARY_KNOTS
+    keep &= _in_bounds(_bounds([ring for area in PORT_AREAS.values() for rings in area.values() for ring in rings]),
+                       lon, lat)
+    mmsi, ts, lat, lon = mmsi[keep].astype(np.int64), ts[keep].astype(np.int64), lat[keep], lon[keep]
+    keys = (ts // DAY) * DAY_KEY + mmsi
+
+    hits = {}
+    for port, area in PORT_AREAS.items():
+        near = _in_bounds(_bounds([ring for rings in area.values() for ring in rings]), lon, lat)
+        if not near.any():
+            continue
+        port_lon, port_lat, port_keys = lon[near], lat[near], keys[near]
+        for role, rings in area.items():
+            inside = np.zeros(len(port_keys), dtype=bool)
+            for ring in rings:
+                inside |= points_in_ring(ring, port_lon, port_lat)
+            if inside.any():
+                hits[(port, role)] = np.unique(port_keys[inside])
+    return hits, None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _scan_pool():
+    """Process-wide scan pool; spawned, not forked, since the app process runs many threads"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, MAX_SCAN_WORKERS),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def scan_files(paths, parallel=True):
+    """Scan position files (in the pool when there are several) and merge the shards; returns (hits, errors)"""
+    import numpy as np
+
+    if parallel and len(paths) > 1 and (os.cpu_count() or 1) > 1:
+        shards = list(_scan_pool().map(scan_file, paths))
+    else:
+        shards = [scan_file(path) for path in paths]
+
+    merged, errors = {}, {}
+    for path, (hits, error) in zip(paths, shards):
+        if error is not None:
+            errors[path] = error
+        for key, values in hits.items():
+            merged.setdefault(key, []).append(values)
+    return {key: np.unique(np.concatenate(parts)) for key, parts in merged.items()}, errors
+
+
+def daily_congestion(counts):
+    """[(port, day start, delay_days, congestion, note)] from {(port, day): {role: vessel count}}"""
+    observations = []
+    for (port, day), roles in sorted(counts.items()):
+        anchored, berthed = roles.get("anchorage", 0), roles.get("berths", 0)
+        delay = round(anchored / max(berthed, 1), 1)
+        observations.append((port, day * DAY, delay, congestion_level(delay),
+                             f"{anchored} at anchor, {berthed} at berth"))
+    return observations
+
+
+class VesselDays:
+    """Distinct vessels seen per (port, role, UTC day), accumulated across files"""
+
+    def __init__(self, db_name="vessel_days.sqlite"):
+        self._conn = storage.connect(db_name)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS vessel_days (
+                    port TEXT NOT NULL,
+                    day INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    mmsi INTEGER NOT NULL,
+                    PRIMARY KEY (port, day, role, mmsi)
+                ) WITHOUT ROWID""")
+            self._conn.commit()
+
+    def add(self, hits):
+        """Record scanned hits; returns {(port, day): {role: count}} for every day they touch"""
+        days = set()
+        with self._lock:
+            for (port, role), keys in hits.items():
+                pairs = [(int(key) // DAY_KEY, int(key) % DAY_KEY) for key in keys]
+                self._conn.executemany("INSERT OR IGNORE INTO vessel_days (port, day, role, mmsi) VALUES (?, ?, ?, ?)",
+                                       [(port, day, role, mmsi) for day, mmsi in pairs])
+                days.update((port, day) for day, _ in pairs)
+            self._conn.commit()
+            counts = {}
+            for port, day in days:
+                counts[(port, day)] = dict(self._conn.execute(
+                    "SELECT role, COUNT(*) FROM vessel_days WHERE port = ? AND day = ? GROUP BY role", (port, day)))
+        return counts
+
+
+_days = None
+_days_lock = threading.Lock()
+
+
+def get_vessel_days():
+    """Process-wide vessel-day store, opened on first use"""
+    global _days
+    with _days_lock:
+        if _days is None:
+            _days = VesselDays()
+        return _days
+
+
+def vessel_source(store, directory=None, days=None):
+    """Port metrics source: congestion from position files not yet ingested at their current mtime"""
+    directory = directory or os.getenv("SUPPLYALERT_AIS_DIR") or os.path.join(storage.DATA_DIR, "ais")
+    if not os.path.isdir(directory):
+        return []
+    mtimes = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith(FILE_SUFFIXES):
+            mtime = os.path.getmtime(path)
+            if not store.file_ingested("ais/" + name, mtime):
+                mtimes[path] = mtime
+    if not mtimes:
+        return []
+    paths = list(mtimes)
+    hits, errors = scan_files(paths)
+    for path, error in errors.items():
+        log.warning("skipped vessel position file %s: %s", path, error)
+    counts = (days or get_vessel_days()).add(hits)
+    # Only files whose positions are now stored count as ingested; failed ones are retried next pass
+    for path in paths:
+        if path not in errors:
+            store.mark_file_ingested("ais/" + os.path.basename(path), mtimes[path])
+    return daily_congestion(counts)
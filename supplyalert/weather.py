@@ -0,0 +1,269 @@
+"""
+Weather disruption alerts for monitored facilities (Open-Meteo).
+
+Locations come from the facility registry (see facilities.py): one
+coordinate per occupied weather cell, so nearby facilities share a lookup,
+sent MAX_POINTS_PER_REQUEST coordinates at a time in multi-coordinate calls.
+An alert or forecast window at a coordinate lists every facility within
+IMPACT_RADIUS_KM of it, found through the registry's spatial index.
+
+get_weather_alerts() reports conditions right now. get_weather_forecast()
+looks FORECAST_HOURS ahead: the hourly forecasts come back from the same
+batched calls, the same gust / snow / rain thresholds are applied
+as array operations over hubs x hours, and each hub's runs of disruptive
+hours are reported as windows (start, end, peak severity).
+
+A forecast only changes when the weather model runs again, so the computed
+windows are kept per model run: each refresh first asks Open-Meteo's model
+metadata for the latest run and only downloads the forecast again when a
+new run is out. Windows that have already ended are dropped on every
+refresh.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from supplyalert import alert_rules, fetch_engine, http_client, refresher, resilience
+from supplyalert.facilities import get_registry, point_label
+
+MAX_POINTS_PER_REQUEST = 100   # coordinates per Open-Meteo call (keeps URLs short)
+CURRENT_VARIABLES = "temperature_2m,precipitation,rain,showers,snowfall,wind_speed_10m,wind_gusts_10m"
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+FORECAST_HOURS = 72
+FORECAST_MODEL = "gfs_seamless"
+# Open-Meteo publishes run times per model; GFS drives gfs_seamless beyond the first hours
+MODEL_META_URL = "https://api.open-meteo.com/data/ncep_gfs013/static/meta.json"
+
+SEVERITY_NAMES = {1: "Medium", 2: "High"}
+IMPACT_RADIUS_KM = 50   # conditions at a weather point apply to facilities this close
+
+
+def _affected(registry, lat, lon, members):
+    """Ids of the facilities a reading at (lat, lon) applies to: its own cell's, then the rest nearby"""
+    ids = [facility.id for facility in members]
+    ids.extend(facility.id for facility in registry.near(lat, lon, IMPACT_RADIUS_KM) if facility.id not in ids)
+    return ids
+
+
+def _batch_urls(points, query):
+    """One multi-coordinate Open-Meteo URL per MAX_POINTS_PER_REQUEST points"""
+    urls = []
+    for i in range(0, len(points), MAX_POINTS_PER_REQUEST):
+        batch = points[i:i + MAX_POINTS_PER_REQUEST]
+        latitudes = ",".join(str(lat) for lat, _, _ in batch)
+        longitudes = ",".join(str(lon) for _, lon, _ in batch)
+        urls.append(f"{FORECAST_URL}?latitude={latitudes}&longitude={longitudes}&{query}")
+    return urls
+
+
+def _fetch_batches(points, query, read_timeout):
+    """Per-point Open-Meteo results in point order; None for points whose batch failed"""
+    urls = _batch_urls(points, query)
+    responses = fetch_engine.fetch_all(
+        urls, lambda url: resilience.guarded_call(url, http_client.get, url, timeout=(3.05, read_timeout)))
+    results = []
+    for i, response in enumerate(responses):
+        size = len(points[i * MAX_POINTS_PER_REQUEST:(i + 1) * MAX_POINTS_PER_REQUEST])
+        locations = None
+        try:
+            if response is not None and response.status_code == 200:
+                locations = response.json()
+                if isinstance(locations, dict):
+                    locations = [locations]  # a single coordinate comes back unwrapped
+        except Exception:
+            locations = None
+        results.extend(locations if locations and len(locations) == size else [None] * size)
+    return results
+
+
+def _publish_alerts(alerts):
+    """Weather events for this replica's alert rules, whichever replica fetched the alerts"""
+    alert_rules.publish(alert_rules.weather_events(alerts))
+
+
+@refresher.source("weather", interval=1800, on_update=_publish_alerts)
+def get_weather_alerts():
+    """Real-time weather alerts via Open-Meteo API"""
+    alerts = []
+    registry = get_registry()
+    points = registry.weather_points()
+    results = _fetch_batches(points, f"current={CURRENT_VARIABLES}", read_timeout=5)
+
+    for (lat, lon, facilities), result in zip(points, results):
+        try:
+            if result is not None:
+                data = result.get('current', {})
+                
+                # Check for disruptive conditions based on thresholds
+                conditions = []
+                severity = "Low"
+                impact = "Normal operations"
+                
+                wind_gust = data.get('wind_gusts_10m') or 0
+                snow = data.get('snowfall') or 0
+                rain = data.get('rain') or 0
+                
+                if wind_gust > 80: # > 80 km/h gusts
+                    conditions.append(f"High Winds ({wind_gust} km/h)")
+                    severity = "High"
+                    impact = "High risk of truck blowovers. Delays likely."
+                elif wind_gust > 55:
+                    conditions.append(f"Gusty Winds ({wind_gust} km/h)")
+                    severity = "Medium"
+                    impact = "Moderate risk for high-profile vehicles."
+                    
+                if snow > 1.0: # > 1mm/hr liquid equivalent (significant snow)
+                    conditions.append("Heavy Snow")
+                    severity = "High" 
+                    impact = "Road closures likely. Major delays."
+                elif snow > 0.1:
+                    conditions.append("Light Snow")
+                    severity = "Medium"
+                    impact = "Slippery roads. Slow traffic."
+                    
+                if rain > 10.0: # Heavy rain
+                    conditions.append("Heavy Rain")
+                    severity = "Medium"
+                    impact = "Reduced visibility and localized flooding."
+                
+                if conditions:
+                    alerts.append({
+                        "type": " + ".join(conditions),
+                        "severity": severity,
+                        "location": point_label(facilities), 
+                        "impact": impact,
+                        "facilities": _affected(registry, lat, lon, facilities)
+                    })
+        except:
+            continue
+            
+    # Most severe first; with many facilities only the top of the list is shown
+    alerts.sort(key=lambda alert: alert["severity"] != "High")
+
+    # Fallback to simulated major events if API fails or is quiet
+    if not alerts:
+        alerts.append({"type": "Monitor Status", "severity": "Low", "location": "US Logistics Network", "impact": "No major weather disruptions detected at key hubs."})
+        
+    return alerts
+
+
+# --- 72H FORECAST ---
+
+def _latest_model_run():
+    """Init time of the latest model run, or the current hour if metadata is unavailable"""
+    try:
+        response = resilience.guarded_call(MODEL_META_URL, http_client.get, MODEL_META_URL, timeout=(3.05, 5))
+        if response.status_code == 200:
+            run = response.json().get("last_run_initialisation_time")
+            if run:
+                return run
+    except Exception:
+        pass
+    return int(time.time() // 3600) * 3600  # fall back to refetching at most hourly
+
+
+def _hourly_row(values, hours):
+    """One point's hourly values as exactly `hours` floats; missing or short data pads with None"""
+    values = list(values or ())[:hours]
+    return values + [None] * (hours - len(values))
+
+
+def _fetch_hourly(points):
+    """
+    (hour timestamps, {variable: points x hours array}, complete) from the
+    batched multi-coordinate calls; complete is False if any batch failed.
+    """
+    import numpy as np  # deferred: only the forecast path needs it
+
+    query = (f"hourly=wind_gusts_10m,snowfall,rain&models={FORECAST_MODEL}"
+             f"&forecast_hours={FORECAST_HOURS}&timeformat=unixtime&timezone=UTC")
+    results = _fetch_batches(points, query, read_timeout=10)
+    times = next((np.array(r["hourly"]["time"], dtype=np.int64) for r in results if r is not None), None)
+    if times is None:
+        raise RuntimeError("no forecast data returned")
+    series = {}
+    for variable in ("wind_gusts_10m", "snowfall", "rain"):
+        # None (missing hours or failed batches) becomes NaN, which fails every threshold below
+        series[variable] = np.array([_hourly_row(r["hourly"].get(variable) if r is not None else None, len(times))
+                                     for r in results], dtype=float)
+    return times, series, all(r is not None for r in results)
+
+
+def disruption_windows(hub_names, times, series):
+    """
+    Contiguous disruptive hours per location as windows. Thresholds match
+    get_weather_alerts: severity 2 (High) for gusts > 80 km/h or snow > 1.0,
+    1 (Medium) for gusts > 55, snow > 0.1 or rain > 10.
+    """
+    import numpy as np
+
+    gust, snow, rain = series["wind_gusts_10m"], series["snowfall"], series["rain"]
+    conditions = {
+        "High Winds": gust > 80,
+        "Gusty Winds": (gust > 55) & (gust <= 80),
+        "Heavy Snow": snow > 1.0,
+        "Light Snow": (snow > 0.1) & (snow <= 1.0),
+        "Heavy Rain": rain > 10.0,
+    }
+    severity = np.maximum.reduce([
+        np.where(conditions["High Winds"] | conditions["Heavy Snow"], 2, 0),
+        np.where(conditions["Gusty Winds"] | conditions["Light Snow"] | conditions["Heavy Rain"], 1, 0),
+    ])
+
+    # Window edges for all hubs at once: +1 where a run starts, -1 one past where it ends
+    disrupted = np.pad(severity > 0, ((0, 0), (1, 1))).astype(np.int8)
+    edges = np.diff(disrupted, axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)   # row-major order pairs each start with its end
+
+    step = int(times[1] - times[0]) if len(times) > 1 else 3600
+    windows = []
+    for (hub, start), (_, end) in zip(starts, ends):
+        span = slice(start, end)
+        windows.append({
+            "location": hub_names[hub],
+            "start": int(times[start]),
+            "end": int(times[end - 1]) + step,
+            "severity": SEVERITY_NAMES[int(severity[hub, span].max())],
+            "conditions": [name for name, mask in conditions.items() if mask[hub, span].any()],
+            "peak_gust": float(np.nan_to_num(gust[hub, span]).max()),
+            "total_snow": float(np.nan_to_num(snow[hub, span]).sum()),
+        })
+    windows.sort(key=lambda window: window["start"])
+    return windows
+
+
+_forecast_run = None
+_forecast_windows = []
+_forecast_lock = threading.Lock()
+
+
+@refresher.source("weather_forecast", interval=900)
+def get_weather_forecast():
+    """Upcoming disruption windows per weather point over the next FORECAST_HOURS hours"""
+    global _forecast_run, _forecast_windows
+    run = _latest_model_run()
+    with _forecast_lock:
+        cached_run, windows = _forecast_run, _forecast_windows
+    if run != cached_run:
+        registry = get_registry()
+        points = registry.weather_points()
+        times, series, complete = _fetch_hourly(points)
+        windows = disruption_windows([point_label(facilities) for _, _, facilities in points], times, series)
+        members = {point_label(facilities): _affected(registry, lat, lon, facilities) for lat, lon, facilities in points}
+        for window in windows:
+            window["facilities"] = members.get(window["location"], [])
+        # Only a complete fetch stands for the whole run; with a batch missing, refetch next refresh
+        # instead of leaving its hubs out of the forecast until the next model run
+        with _forecast_lock:
+            _forecast_run, _forecast_windows = (run if complete else None), windows
+    now = time.time()
+    return [window for window in windows if window["end"] > now]
+
+
+def format_window(window):
+    """One-line description of a forecast window (times in UTC)"""
+    start = datetime.fromtimestamp(window["start"], timezone.utc).strftime("%a %H:%M")
+    end = datetime.fromtimestamp(window["end"], timezone.utc).strftime("%a %H:%M")
+    return f"{window['location']}: {' + '.join(window['conditions'])} ({window['severity']}), {start} to {end} UTC"
@@ -0,0 +1,79 @@
+import socketserver
+import threading
+import time
+
+import pytest
+
+from supplyalert import storage
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Every test gets an empty data directory"""
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """
+    Local stand-in for a Redis server: GET, SET [NX] [PX], DEL, AUTH and
+    SELECT over RESP, which is all shared_cache uses.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.store = {}      # key -> (value, expires_at or None)
+        self.commands = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return "redis://127.0.0.1:%d" % self.server_address[1]
+
+    def execute(self, args):
+        name = args[0].upper()
+        self.commands.append(name.decode())
+        now = time.time()
+        with self.lock:
+            for key in [k for k, (_, expires_at) in self.store.items() if expires_at and expires_at <= now]:
+                del self.store[key]
+            if name == b"GET":
+                value = self.store.get(args[1])
+                return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value[0]), value[0])
+            if name == b"SET":
+                options = [arg.upper() for arg in args[3:]]
+                expires_at = now + int(options[options.index(b"PX") + 1]) / 1000 if b"PX" in options else None
+                if b"NX" in options and args[1] in self.store:
+                    return b"$-1\r\n"
+                self.store[args[1]] = (args[2], expires_at)
+                return b"+OK\r\n"
+            if name == b"DEL":
+                return b":%d\r\n" % (self.store.pop(args[1], None) is not None)
+            if name in (b"AUTH", b"SELECT"):
+                return b"+OK\r\n"
+            return b"-ERR unknown command\r\n"
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:-2])):
+                size = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(size + 2)[:-2])
+            self.wfile.write(self.server.execute(args))
+
+
+@pytest.fixture
+def resp_server():
+    server = RespStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
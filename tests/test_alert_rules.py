@@ -0,0 +1,58 @@
+from supplyalert import alert_rules
+from supplyalert.alert_rules import RuleEngine
+
+
+def test_location_rules_respect_min_severity():
+    engine = RuleEngine()
+    rule = engine.add_rule("ops", "LA backlog", ports=["Los Angeles/Long Beach"], min_severity="High")
+    low = alert_rules.port_events([("Los Angeles/Long Beach", 1, 1.0, "Low", "")])
+    high = alert_rules.port_events([("Los Angeles/Long Beach", 2, 4.0, "High", "")])
+    elsewhere = alert_rules.port_events([("Savannah", 3, 4.0, "High", "")])
+    assert engine.match(low[0]) == set()
+    assert engine.match(elsewhere[0]) == set()
+    assert engine.match(high[0]) == {rule}
+
+
+def test_keyword_phrases_plurals_and_prefixes():
+    engine = RuleEngine()
+    phrase = engine.add_rule("ops", "Rail", keywords=["rail strike"])
+    prefix = engine.add_rule("ops", "Robots", keywords=["robot*"])
+    events = alert_rules.article_events("freight", [
+        ("a", "Rail strikes spread to Midwest", ""),
+        ("b", "Strike on the rail network", ""),
+        ("c", "Robotics startup raises funding", ""),
+    ])
+    assert [engine.match(event) for event in events] == [{phrase}, set(), {prefix}]
+
+
+def test_notifications_are_stored_once_per_rule_and_event():
+    engine = RuleEngine()
+    engine.add_rule("ops", "Anything severe", min_severity="Critical")
+    events = alert_rules.port_events([("Houston", 1, 9.0, "Critical", "")])
+    assert engine.publish(events) == 1
+    assert engine.publish(events) == 0
+    assert [n.title for n in engine.notifications("ops")] == [events[0].title]
+    assert engine.notifications("someone-else") == []
+
+
+def test_rules_survive_a_reload():
+    rule = RuleEngine().add_rule("ops", "Savannah", ports=["Savannah"])
+    engine = RuleEngine()
+    assert [(rule_id, name) for rule_id, name, _ in engine.rules("ops")] == [(rule, "Savannah")]
+    assert engine.remove_rule(rule, "someone-else") is False
+    assert engine.remove_rule(rule, "ops") is True
+    assert len(engine) == 0
+
+
+def test_plural_keywords_match_singular_text():
+    engine = RuleEngine()
+    ports = engine.add_rule("ops", "Ports", keywords=["ports"])
+    closures = engine.add_rule("ops", "Closures", keywords=["port closures"])
+    events = alert_rules.article_events("freight", [
+        ("a", "Port reopens after storm", ""),
+        ("b", "Ports report record volumes", ""),
+        ("c", "Port closure expected Friday", ""),
+    ])
+    assert [engine.match(event) for event in events] == [{ports}, {ports}, {ports, closures}]
+    engine.remove_rule(ports, "ops")
+    assert engine.match(events[0]) == set()
@@ -0,0 +1,98 @@
+import http.client
+import http.server
+import json
+import threading
+
+import pytest
+
+from supplyalert import api, news, news_archive
+from supplyalert.news_archive import NewsArchive
+
+
+@pytest.fixture
+def archive(monkeypatch):
+    archive = NewsArchive()
+    monkeypatch.setattr(news_archive, "_archive", archive)
+    monkeypatch.setattr(news, "ensure_fresh", lambda category, wait=True: None)
+    return archive
+
+
+def page(params):
+    _, body, _ = api.render("/v1/news/freight", params)
+    return json.loads(body)
+
+
+def test_news_cursor_pages_through_timestamp_ties(archive):
+    archive.ingest("freight", [{"title": f"alpha{i} bravo{i} charlie{i}", "link": str(i)} for i in range(7)])
+    links, params = [], {"limit": "3"}
+    while True:
+        body = page(params)
+        links.extend(item["link"] for item in body["data"])
+        if body["next_cursor"] is None:
+            break
+        params = {"limit": "3", "cursor": body["next_cursor"]}
+    assert sorted(links) == sorted(str(i) for i in range(7))
+
+
+@pytest.mark.parametrize("cursor", ["!!!", api._encode_cursor([1]), api._encode_cursor({"ts": "x", "id": 1}),
+                                    api._encode_cursor({"ts": 1.5, "id": 2.5})])
+def test_invalid_cursor_is_rejected(archive, cursor):
+    with pytest.raises(api.ApiError) as error:
+        page({"cursor": cursor})
+    assert error.value.status == 400
+
+
+def test_token_bucket_refuses_past_the_burst():
+    limiter = api.RateLimiter(rate=1, burst=2)
+    assert limiter.allow("k") == (True, 0)
+    assert limiter.allow("k") == (True, 0)
+    allowed, retry_after = limiter.allow("k")
+    assert not allowed and 0 < retry_after <= 1
+    assert limiter.allow("other") == (True, 0)
+
+
+def test_buckets_are_capped_and_idle_ones_dropped(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(api.time, "monotonic", lambda: clock[0])
+    limiter = api.RateLimiter(rate=1, burst=2, max_buckets=3)
+    for key in "abcde":
+        limiter.allow(key)
+    assert len(limiter) == 3
+    clock[0] = 10   # long enough for every bucket to refill
+    limiter.allow("f")
+    assert len(limiter) == 1
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(api, "API_KEYS", set())
+    monkeypatch.setattr(api, "_limiter", api.RateLimiter(rate=0.01, burst=2))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), api.ApiHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_invented_keys_share_the_client_bucket(server):
+    statuses = []
+    for i in range(3):
+        conn = http.client.HTTPConnection(*server.server_address)
+        conn.request("GET", "/v1/health", headers={"X-API-Key": f"made-up-{i}"})
+        response = conn.getresponse()
+        response.read()
+        statuses.append(response.status)
+        conn.close()
+    assert statuses == [200, 200, 429]
+
+
+def test_matching_etag_gets_a_bodyless_304(server):
+    conn = http.client.HTTPConnection(*server.server_address)
+    conn.request("GET", "/v1/health")
+    first = conn.getresponse()
+    first.read()
+    conn.request("GET", "/v1/health", headers={"If-None-Match": first.getheader("ETag")})
+    second = conn.getresponse()
+    assert (second.status, second.read()) == (304, b"")
+    conn.close()
@@ -0,0 +1,77 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from supplyalert import assistant
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    monkeypatch.setattr(assistant, "_api_key", "key")
+    monkeypatch.setattr(assistant, "_cache", None)
+    monkeypatch.setattr(assistant.chat_context, "current", lambda: SimpleNamespace(version="v1"))
+    calls = []
+
+    def complete(user_input, snapshot):
+        calls.append(user_input)
+        time.sleep(0.3)
+        return "answer to " + user_input
+    monkeypatch.setattr(assistant, "_complete", complete)
+    return calls
+
+
+def test_identical_questions_share_one_completion(completions):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(assistant.ask("Port delays?"))) for _ in range(2)]
+    threads[0].start()
+    time.sleep(0.1)   # the first call is in flight, as a pre-warm would be
+    threads[1].start()
+    for thread in threads:
+        thread.join()
+    assert completions == ["Port delays?"]
+    assert results == ["answer to Port delays?"] * 2
+    assert list(assistant.stream("port delays?")) == ["answer to Port delays?"]
+
+
+def test_waiter_takes_over_after_a_failed_completion(completions, monkeypatch):
+    def broken(user_input, snapshot):
+        completions.append(user_input)
+        time.sleep(0.3)
+        raise assistant.AssistantError("HTTP 429")
+    monkeypatch.setattr(assistant, "_complete", broken)
+    leader = threading.Thread(target=lambda: pytest.raises(assistant.AssistantError, assistant.ask, "Q"))
+    leader.start()
+    time.sleep(0.1)
+    with pytest.raises(assistant.AssistantError):
+        assistant.ask("Q")
+    leader.join()
+    assert completions == ["Q", "Q"]
+    assert not assistant._inflight
+
+
+class FakeStream:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def iter_lines(self, decode_unicode=True):
+        return iter(self.lines)
+
+    def close(self):
+        pass
+
+
+def test_interrupted_stream_is_not_cached(completions, monkeypatch):
+    lines = ['data: {"choices": [{"delta": {"content": "Partial"}}]}']   # no [DONE]
+    monkeypatch.setattr(assistant, "_post", lambda user_input, snapshot, stream=False: FakeStream(lines))
+    chunks = []
+    with pytest.raises(assistant.AssistantError):
+        for chunk in assistant.stream("Q"):
+            chunks.append(chunk)
+    assert chunks == ["Partial"]
+    assert assistant.response_cache().get("Q", "v1") is None
+
+    lines.append("data: [DONE]")
+    assert "".join(assistant.stream("Q")) == "Partial" + assistant.REFERENCES
+    assert assistant.response_cache().get("Q", "v1") == "Partial" + assistant.REFERENCES
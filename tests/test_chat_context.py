@@ -0,0 +1,43 @@
+import pytest
+
+from supplyalert import chat_context
+
+
+@pytest.fixture
+def sections(monkeypatch):
+    content = [("ACTIVE WEATHER DISRUPTIONS:", ["- Blizzard (High) in Chicago: rail delays"]),
+               ("LATEST FREIGHT NEWS:", ["- headline %d" % i for i in range(50)])]
+    builds = []
+
+    def fake_sections():
+        builds.append(1)
+        return content
+    monkeypatch.setattr(chat_context, "_sections", fake_sections)
+    monkeypatch.setattr(chat_context, "_current", None)
+    monkeypatch.setattr(chat_context, "_current_stamps", None)
+    return content, builds
+
+
+def test_budget_drops_the_lowest_priority_lines(sections):
+    text = chat_context.build_context(budget=40)
+    assert chat_context.estimate_tokens(text) <= 40
+    assert text.startswith("ACTIVE WEATHER DISRUPTIONS:\n- Blizzard")
+    assert "- headline 0" in text and "- headline 49" not in text
+
+
+def test_version_changes_only_with_the_content(sections, monkeypatch):
+    content, builds = sections
+    stamps = {name: 1.0 for name in chat_context.CONTEXT_SOURCES}
+    monkeypatch.setattr(chat_context.refresher, "updated_at", stamps.get)
+
+    first = chat_context.current()
+    assert chat_context.current() is first and len(builds) == 1   # no source refreshed: no rebuild
+
+    stamps["ports"] = 2.0   # refreshed, same data
+    assert chat_context.current() is first and len(builds) == 2
+
+    stamps["ports"] = 3.0
+    content[0] = ("ACTIVE WEATHER DISRUPTIONS:", ["- Hurricane (High) in Houston: port closed"])
+    second = chat_context.current()
+    assert second.version != first.version
+    assert "Hurricane" in chat_context.system_prompt(second)
@@ -0,0 +1,43 @@
+import threading
+
+from supplyalert.chat_jobs import ChatJobQueue
+
+
+def blocked(gate, answer="answer"):
+    def fn():
+        gate.wait(5)
+        return answer
+    return fn
+
+
+def test_same_question_in_flight_is_reused():
+    queue, gate = ChatJobQueue(), threading.Event()
+    job, created = queue.submit("Port delays?", blocked(gate))
+    again, created_again = queue.submit("  port DELAYS? ", blocked(gate, "second call"))
+    assert created and not created_again and again is job
+    assert queue.pending() == [job]
+    gate.set()
+    assert job.future.result(5) == "answer" and job.result() == "answer"
+    assert queue.pending() == []
+
+
+def test_finished_question_starts_a_new_job():
+    queue = ChatJobQueue()
+    job, _ = queue.submit("Q", lambda: "first")
+    job.future.result(5)
+    queue.release(job.id)
+    assert queue.get(job.id) is None
+    again, created = queue.submit("Q", lambda: "second")
+    assert created and again.future.result(5) == "second"
+
+
+def test_cancelled_job_discards_its_result():
+    queue, gate = ChatJobQueue(), threading.Event()
+    job, _ = queue.submit("Q", blocked(gate))
+    queue.cancel(job.id)
+    assert job.done() and job.result() is None
+    assert queue.pending() == []
+    again, created = queue.submit("Q", lambda: "fresh")   # no longer in flight
+    assert created and again is not job
+    gate.set()
+    assert again.future.result(5) == "fresh"
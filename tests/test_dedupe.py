@@ -0,0 +1,20 @@
+from supplyalert import dedupe
+
+
+def test_syndicated_headlines_are_near_duplicates():
+    a = dedupe.signature("Port strike halts container shipments - Reuters")
+    b = dedupe.signature("Port strikes halt container shipments | Yahoo Finance")
+    c = dedupe.signature("Rail carriers add capacity ahead of peak season")
+    assert dedupe.is_near_duplicate(a, b)
+    assert not dedupe.is_near_duplicate(a, c)
+
+
+def test_normalize_drops_publisher_stopwords_and_plurals():
+    assert dedupe.normalize_title("The ports of LA reopen - FreightWaves") == {"port", "la", "reopen"}
+
+
+def test_signatures_are_stable_and_pack_round_trip():
+    sig = dedupe.signature("Port strike halts container shipments")
+    assert sig == dedupe.signature("Port strike halts container shipments")
+    assert dedupe.unpack(dedupe.pack(sig)) == sig
+    assert len(dedupe.bands(sig)) == dedupe.BANDS
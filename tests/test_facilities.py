@@ -0,0 +1,39 @@
+import random
+
+from supplyalert import facilities, weather
+from supplyalert.facilities import Facility, FacilityRegistry, haversine_km
+
+
+def test_near_matches_a_full_scan():
+    rng = random.Random(7)
+    registry = FacilityRegistry([Facility(str(i), str(i), "dc", rng.uniform(25, 49), rng.uniform(-124, -67))
+                                 for i in range(2000)])
+    for lat, lon in ((41.9, -87.6), (33.7, -118.2), (47.6, -122.3)):
+        expected = sorted((haversine_km(lat, lon, f.lat, f.lon), f.id) for f in registry.facilities
+                          if haversine_km(lat, lon, f.lat, f.lon) <= 150)
+        assert [f.id for f in registry.near(lat, lon, 150)] == [fid for _, fid in expected]
+
+
+def test_weather_points_share_a_cell():
+    registry = FacilityRegistry([Facility("a", "A", "dc", 41.80, -87.70), Facility("b", "B", "dc", 41.85, -87.65),
+                                 Facility("c", "C", "dc", 35.0, -90.0)])
+    points = sorted(registry.weather_points(), key=lambda point: point[0])
+    assert [[f.id for f in members] for _, _, members in points] == [["c"], ["a", "b"]]
+    assert facilities.point_label(points[1][2]) == "A + 1 nearby"
+
+
+def test_storm_reaches_facilities_across_a_cell_boundary(monkeypatch):
+    # 0.3 degrees apart: different weather cells, about 25 km
+    registry = FacilityRegistry([Facility("west", "West DC", "dc", 41.80, -87.80),
+                                 Facility("east", "East DC", "dc", 41.80, -87.50),
+                                 Facility("far", "Far DC", "dc", 35.0, -90.0)])
+    monkeypatch.setattr(weather, "get_registry", lambda: registry)
+    points = registry.weather_points()
+
+    def fetch(points_, query, read_timeout):
+        return [{"current": {"wind_gusts_10m": 95 if members[0].id == "west" else 0}}
+                for _, _, members in points_]
+    monkeypatch.setattr(weather, "_fetch_batches", fetch)
+    alerts = weather.get_weather_alerts.__wrapped__()
+    assert len(points) == 3
+    assert [(alert["location"], alert["facilities"]) for alert in alerts] == [("West DC", ["west", "east"])]
@@ -0,0 +1,98 @@
+import http.server
+import threading
+import time
+
+import pytest
+
+from supplyalert import feeds, resilience, shared_cache
+
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>
+<item><title>Port strike ends</title><link>https://example.com/1</link></item>
+</channel></rss>"""
+
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if server.trickle:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(RSS)))
+            self.end_headers()
+            for byte in RSS:   # one byte at a time, never idle long enough for a socket timeout
+                try:
+                    self.wfile.write(bytes([byte]))
+                    self.wfile.flush()
+                except OSError:
+                    return
+                time.sleep(0.05)
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Last-Modified", "Tue, 01 Oct 2024 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(RSS)))
+        self.end_headers()
+        self.wfile.write(RSS)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server(monkeypatch):
+    monkeypatch.setattr(feeds, "_cache", None)
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience, "_sources", {})
+    monkeypatch.setattr(shared_cache, "_backend", None)
+    monkeypatch.setattr(shared_cache, "_backend_loaded", True)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.trickle = False
+    server.url = "http://127.0.0.1:%d/rss" % server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_trickling_host_is_cut_off_at_the_read_deadline(feed_server, monkeypatch):
+    monkeypatch.setattr(feeds, "READ_DEADLINE", 0.5)
+    feed_server.trickle = True
+    started = time.monotonic()
+    with pytest.raises(feeds.FeedError):
+        feeds._download(feed_server.url, {})
+    assert time.monotonic() - started < 2
+
+
+def test_validators_are_sent_back_and_304_serves_the_stored_parse(feed_server):
+    first = feeds.fetch_feed(feed_server.url)
+    assert [entry.title for entry in first.entries] == ["Port strike ends"]
+    assert "If-None-Match" not in feed_server.requests[0]
+
+    again = feeds.fetch_feed(feed_server.url)
+    assert feed_server.requests[1]["If-None-Match"] == '"v1"'
+    assert feed_server.requests[1]["If-Modified-Since"] == "Tue, 01 Oct 2024 00:00:00 GMT"
+    assert again is first   # the in-memory parse, not a new one
+
+
+def test_persisted_parse_survives_a_restart(feed_server, monkeypatch):
+    feeds.fetch_feed(feed_server.url)
+    monkeypatch.setattr(feeds, "_cache", None)   # a new process: only the SQLite copy is left
+    feed = feeds.fetch_feed(feed_server.url)
+    assert feed_server.requests[-1]["If-None-Match"] == '"v1"'
+    assert [entry.title for entry in feed.entries] == ["Port strike ends"]
+
+
+def test_failing_source_serves_the_last_known_good_parse(feed_server, monkeypatch):
+    feeds.fetch_feed(feed_server.url)
+
+    def broken(url):
+        raise feeds.FeedError("HTTP 503")
+    monkeypatch.setattr(feeds, "_download_and_parse", broken)
+    assert [entry.title for entry in feeds.fetch_feed(feed_server.url).entries] == ["Port strike ends"]
+    assert resilience.source_status()[0]["served_stale"]
@@ -0,0 +1,50 @@
+import http.server
+import threading
+import time
+
+import pytest
+import requests
+
+from supplyalert import http_client
+
+
+class StalledBody(http.server.BaseHTTPRequestHandler):
+    """Sends the headers at once, then stalls before the body"""
+    def do_GET(self):
+        self.server.hits += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.flush()
+        time.sleep(1)
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stalled_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StalledBody)
+    server.daemon_threads = True
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_body_read_timeout_is_not_retried(stalled_server, monkeypatch):
+    monkeypatch.setattr(http_client, "_backoff", lambda attempt, retry_after=None: 0)
+    url = "http://127.0.0.1:%d/" % stalled_server.server_address[1]
+    with pytest.raises(requests.ConnectionError):
+        http_client.get(url, timeout=(1, 0.2), retries=2)
+    assert stalled_server.hits == 1
+
+
+def test_refused_connection_is_retried(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(http_client.time, "sleep", sleeps.append)
+    with pytest.raises(requests.ConnectionError):
+        http_client.get("http://127.0.0.1:1/", timeout=1, retries=2)
+    assert len(sleeps) == 2
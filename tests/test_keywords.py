@@ -0,0 +1,20 @@
+from supplyalert.keywords import KeywordMatcher
+
+
+def test_matches_whole_words_only():
+    matcher = KeywordMatcher({"ai": ["ai"], "ml": ["ml"]})
+    assert matcher.tags("She said the HTML was fine") == []
+    assert matcher.tags("AI and ML at the port") == ["ai", "ml"]
+
+
+def test_plurals_phrases_and_prefixes():
+    matcher = KeywordMatcher({"ai": ["ai", "machine learning"], "robotics": ["robot*"], "ports": ["port"]})
+    assert matcher.tags("Ports adopt machine\n learning") == ["ai", "ports"]
+    assert matcher.tags("Robotics and robots") == ["robotics"]
+    assert matcher.search("a robot arm") and not matcher.search("nothing here")
+
+
+def test_first_follows_table_order():
+    matcher = KeywordMatcher({"disruption": ["strike"], "freight": ["freight", "port"]})
+    assert matcher.first("Port strike hits freight") == "disruption"
+    assert matcher.first("Quiet day", default="general") == "general"
@@ -0,0 +1,32 @@
+from supplyalert.lanes import LaneGraph
+
+NAMES = {node: node.upper() for node in "abcd"}
+LANES = [("a", "b", 10, "truck"), ("b", "d", 10, "truck"), ("a", "c", 13, "rail"), ("c", "d", 12, "rail"),
+         ("b", "c", 4, "truck")]
+
+
+def test_k_shortest_routes_cheapest_first():
+    graph = LaneGraph(LANES, NAMES)
+    routes = graph.routes("a", "d", k=3)
+    assert [route.nodes for route in routes] == [("a", "b", "d"), ("a", "c", "d"), ("a", "b", "c", "d")]
+    assert [route.hours for route in routes] == [20, 25, 26]
+
+
+def test_only_affected_queries_are_recomputed():
+    graph = LaneGraph(LANES, NAMES)
+    graph.routes("a", "d", k=1)
+    graph.routes("a", "c", k=1)
+    assert graph.recomputed == 2
+    graph.set_costs({("b", "d"): 30})   # on the a-d route, not the a-c one
+    best = graph.routes("a", "d", k=1)[0]
+    graph.routes("a", "c", k=1)
+    assert graph.recomputed == 3
+    assert best.nodes == ("a", "c", "d") and best.hours == 25
+
+
+def test_weather_risk_raises_edge_costs():
+    graph = LaneGraph(LANES, NAMES)
+    graph.update_risk([{"facilities": ["b"], "severity": "High"}], [], {})
+    route = graph.routes("a", "d", k=1)[0]
+    assert route.nodes == ("a", "c", "d")
+    assert graph.describe(graph.routes("a", "b", k=1)[0]) == "A → B, 20h (+10h risk)"
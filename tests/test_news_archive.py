@@ -0,0 +1,65 @@
+import time
+
+from supplyalert import news_archive
+from supplyalert.news_archive import NewsArchive
+
+
+def entry(i, published=None):
+    # Words unique to each entry, so none is taken for a near-duplicate
+    return {"title": f"alpha{i} bravo{i} charlie{i}", "link": f"https://example.com/{i}",
+            "published_parsed": published}
+
+
+def test_pages_reach_every_article_across_timestamp_ties():
+    archive = NewsArchive()
+    dated = time.gmtime(1_700_000_000)
+    # Undated entries all get the ingest time, so most rows share a published_ts
+    assert archive.ingest("freight", [entry(i, dated if i % 5 == 0 else None) for i in range(25)]) == 25
+    seen, before = [], None
+    while True:
+        page = archive.query("freight", limit=10, before=before)
+        if not page:
+            break
+        seen.extend(item.link for item in page)
+        before = page[-1].page_key
+    assert len(seen) == len(set(seen)) == 25
+
+
+
+def test_reingest_only_adds_new_entries():
+    archive = NewsArchive()
+    assert archive.ingest("policy", [entry(1), entry(2)]) == 2
+    assert archive.ingest("policy", [entry(2), entry(3)]) == 1
+    assert archive.last_ingested("policy") is not None and archive.last_ingested("ai") is None
+    assert len(archive.query("policy")) == 3 and archive.query("freight") == []
+
+
+def test_near_duplicate_headlines_are_collapsed():
+    archive = NewsArchive()
+    assert archive.ingest("freight", [{"title": "Port strike halts container shipments - Reuters", "link": "a"}]) == 1
+    assert archive.ingest("freight", [{"title": "Port strike halts container shipments | Yahoo Finance",
+                                       "link": "b"}]) == 0
+    assert [item.link for item in archive.query("freight")] == ["a"]
+
+
+def test_search_facets_ignore_the_category_filter():
+    archive = NewsArchive()
+    archive.ingest("freight", [{"title": "Rail strike threatens freight", "link": "a"}])
+    archive.ingest("policy", [{"title": "Congress weighs rail strike bill", "link": "b"}])
+    items, facets = archive.search("strike", categories=["policy"])
+    assert [item.link for item in items] == ["b"]
+    assert facets == {"freight": 1, "policy": 1}
+
+
+def test_search_ranks_title_hits_first():
+    archive = NewsArchive()
+    archive.ingest("freight", [{"title": "Carriers add capacity", "link": "summary",
+                                "summary": "<p>Tariff worries linger</p>"},
+                               {"title": "Tariff talks resume", "link": "title"}])
+    items, _ = archive.search("tariff")
+    assert [item.link for item in items] == ["title", "summary"]
+
+
+def test_fts_query_neutralises_syntax():
+    assert news_archive.fts_query('"rail strike" port* OR NEAR(') == '"rail strike" "port"* OR "NEAR"'
+    assert news_archive.fts_query("OR OR") == ""
@@ -0,0 +1,70 @@
+import time
+
+from supplyalert import port_metrics
+from supplyalert.port_metrics import DAY, HOUR, PortMetricsStore
+
+
+def drop(data_dir, name, text):
+    directory = data_dir / "port_drops"
+    directory.mkdir(exist_ok=True)
+    (directory / name).write_text(text)
+    return str(directory)
+
+
+def test_drop_file_rows_are_validated(data_dir):
+    now = int(time.time())
+    directory = drop(data_dir, "ports.csv", "port,ts,delay_days,congestion,note\n"
+                     f"Savannah,{now},2.5,high,bunching\n"
+                     f"Houston,{now},nan,Low,\n"
+                     f"Houston,{now},inf,Low,\n"
+                     f"Houston,{now},1,Gridlocked,\n"
+                     f"Houston,not-a-time,1,Low,\n"
+                     f"Seattle/Tacoma,{now},0,,\n")
+    store = PortMetricsStore()
+    observations = port_metrics.file_drop_source(store, directory)
+    assert [(port, level) for port, _, _, level, _ in observations] == [("Savannah", "High"), ("Seattle/Tacoma", "Low")]
+    assert port_metrics.file_drop_source(store, directory) == []   # claimed at this mtime
+
+
+def test_non_finite_observations_are_never_stored():
+    store = PortMetricsStore()
+    now = time.time()
+    assert store.ingest([("Houston", now, float("nan"), "Low", ""),
+                         ("Houston", now + 1, float("inf"), "Low", ""),
+                         ("Houston", now + 2, 3.0, "medium", "")]) == 1
+    assert store.latest()["Houston"]["delay_days"] == 3
+    assert store.latest()["Houston"]["congestion"] == "Medium"
+
+
+def test_rollups_and_latest():
+    store = PortMetricsStore()
+    day = int(time.time() // DAY) * DAY
+    store.ingest([("Savannah", day + HOUR, 2.0, "Medium", ""),
+                  ("Savannah", day + 2 * HOUR, 4.0, "High", "late")])
+    latest = store.latest()["Savannah"]
+    assert (latest["congestion"], latest["delay_days"], latest["note"]) == ("High", 4, "late")
+    assert store.trend("Savannah", days=2, resolution=DAY)[-1] == (day, 3.0, 2.0, 4.0, "High")
+    assert store.average_delay(days=2)["Savannah"] == 3.0
+
+
+def test_revised_observation_replaces_the_stored_one():
+    store = PortMetricsStore()
+    day = int(time.time() // DAY) * DAY
+    store.ingest([("Savannah", day + HOUR, 2.0, "Medium", ""), ("Savannah", day + 2 * HOUR, 9.0, "Critical", "")])
+    assert store.ingest([("Savannah", day + 2 * HOUR, 9.0, "Critical", "")]) == 0   # unchanged
+    assert store.ingest([("Savannah", day + 2 * HOUR, 4.0, "High", "revised")]) == 1
+    assert store.trend("Savannah", days=2, resolution=DAY)[-1] == (day, 3.0, 2.0, 4.0, "High")
+    assert store.latest()["Savannah"]["note"] == "revised"
+
+
+def test_bad_drop_file_spares_the_others_and_is_retried(data_dir):
+    now = int(time.time())
+    directory = drop(data_dir, "a.csv", f"port,ts,delay_days,congestion\nSavannah,{now},2,High\n")
+    drop(data_dir, "b.csv", f"harbour,ts,delay_days,congestion\nHouston,{now},1,Low\n")
+    drop(data_dir, "c.json", "{not json")
+    store = PortMetricsStore()
+    assert [port for port, *_ in port_metrics.file_drop_source(store, directory)] == ["Savannah"]
+    assert store.file_ingested("a.csv", 0) and store.file_ingested("b.csv", 0)   # read, rows or not
+    assert not store.file_ingested("c.json", 0)
+    drop(data_dir, "c.json", '[{"port": "Houston", "ts": %d, "delay_days": 1}]' % now)
+    assert [port for port, *_ in port_metrics.file_drop_source(store, directory)] == ["Houston"]
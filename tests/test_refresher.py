@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from supplyalert import refresher
+
+
+@pytest.fixture(autouse=True)
+def sources(monkeypatch):
+    monkeypatch.setattr(refresher, "_sources", {})
+    monkeypatch.setattr(refresher, "_ensure_scheduler", lambda: None)
+
+
+def test_stale_snapshot_is_served_while_it_refreshes():
+    def fetch():
+        time.sleep(0.3)
+        return "new"
+    source = refresher.register("src", fetch, 60, snapshot="old", updated_at=time.time() - 120, shared=False)
+    assert source.due(time.time())
+    started = time.monotonic()
+    flight, _ = refresher._start_refresh(source)
+    assert refresher.get("src") == "old"
+    assert time.monotonic() - started < 0.2
+    flight.wait(5)
+    assert refresher.get("src") == "new" and not source.due(time.time())
+
+
+def test_failed_first_fetch_is_recorded_and_backed_off():
+    def broken():
+        raise ValueError("upstream down")
+    refresher.register("src", broken, 60, shared=False)
+    assert refresher.get("src") is None
+    assert refresher.freshness()[0]["last_error"] == "upstream down"
+    assert not refresher._sources["src"].due(time.time())
+
+
+def test_decorated_fetcher_returns_the_snapshot():
+    calls = []
+
+    @refresher.source("deco", 60, shared=False)
+    def fetch():
+        calls.append(1)
+        return [1, 2]
+    assert fetch() == [1, 2] and fetch() == [1, 2]
+    assert len(calls) == 1 and fetch.source_name == "deco"
+
+
+def test_concurrent_first_reads_share_one_fetch():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.3)
+        return "snapshot"
+    refresher.register("src", fetch, 60, shared=False)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(refresher.get("src"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == ["snapshot"] * 5
+    row = refresher.freshness()[0]
+    assert (row["misses"], row["coalesced"]) == (1, 4)
+    assert refresher.get("src") == "snapshot" and refresher.freshness()[0]["hits"] == 1
+
+
+def test_force_refresh_fetches_and_announces_a_new_snapshot():
+    values, updates = iter(["first", "second"]), []
+    refresher.register("src", lambda: next(values), 60, shared=False, on_update=updates.append)
+    assert refresher.get("src") == "first"
+    time.sleep(0.01)   # a distinct fetch time
+    assert refresher.force_refresh("src")
+    assert refresher.get("src") == "second"
+    assert updates == ["first", "second"]
+
+
+def test_force_refresh_joins_a_refresh_in_flight():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.3)
+        return len(calls)
+    source = refresher.register("src", fetch, 60, snapshot=0, updated_at=time.time() - 120, shared=False)
+    refresher._start_refresh(source)
+    assert refresher.force_refresh("src")
+    assert len(calls) == 1 and refresher.get("src") == 1
+    assert refresher.freshness()[0]["coalesced"] == 1
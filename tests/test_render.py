@@ -0,0 +1,46 @@
+import pytest
+
+from supplyalert import render
+
+
+@pytest.fixture(autouse=True)
+def memo(monkeypatch):
+    monkeypatch.setattr(render, "_memo", render.OrderedDict())
+
+
+def test_feed_text_is_escaped_and_kept_on_one_line():
+    html = render.news_list([('Ports <script>alert(1)</script>\n\nreopen', 'https://x.test/?a=1&b="2"', "Oct 1")],
+                            "freight")
+    assert "<script>" not in html and "&lt;script&gt;" in html
+    assert 'href="https://x.test/?a=1&amp;b=&quot;2&quot;"' in html
+    assert "\n" not in html
+
+
+def test_job_skills_and_weather_fields_are_escaped():
+    jobs = render.job_cards([("ML <b>Engineer</b>", "A&B", "today", "Remote", "$1", "summary", ["C++ <3"], "feed", "#")])
+    assert "ML &lt;b&gt;Engineer&lt;/b&gt;" in jobs and "A&amp;B" in jobs and "C++ &lt;3" in jobs
+    weather = render.weather_alerts([{"type": "Snow", "severity": "High", "location": "<i>Denver</i>",
+                                      "impact": "rail"}])
+    assert "&lt;i&gt;Denver" in weather
+
+
+def test_sections_are_memoized_on_their_rows():
+    rows = [("Title", "https://x.test/1", "Oct 1")]
+    first = render.news_list(rows, "freight")
+    assert render.news_list(list(rows), "freight") is first
+    assert render.news_list(rows, "policy") is not first   # accent is part of the key
+    assert render.news_list(rows + [("Other", "https://x.test/2", "Oct 2")], "freight") != first
+    assert len(render._memo) == 3
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(render, "MEMO_SIZE", 2)
+    for i in range(4):
+        render.news_list([(f"T{i}", "#", "")], "freight")
+    assert len(render._memo) == 2
+
+
+def test_stylesheet_loader_cannot_close_its_script():
+    loader = render.stylesheet_loader(render.minify_css("/* c */ a { content: '</script>' ; }"))
+    assert loader.count("</script>") == 1
+    assert "/* c */" not in loader
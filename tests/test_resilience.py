@@ -0,0 +1,70 @@
+import pytest
+
+from supplyalert import resilience
+from supplyalert.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("host", failure_threshold=3, cooldown=60)
+    for _ in range(2):
+        breaker.record_failure(OSError("down"))
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure(OSError("down"))
+    assert breaker.state == OPEN and not breaker.allow()
+    assert breaker.last_error == "down"
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("host", failure_threshold=2, cooldown=60)
+    breaker.record_failure(OSError("down"))
+    breaker.record_success()
+    breaker.record_failure(OSError("down"))
+    assert breaker.state == CLOSED
+
+
+def test_half_open_lets_one_probe_through_then_closes(clock):
+    breaker = CircuitBreaker("host", failure_threshold=1, cooldown=60)
+    breaker.record_failure(OSError("down"))
+    clock[0] += 60
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and not breaker.allow()   # a single probe
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("host", failure_threshold=3, cooldown=60)
+    for _ in range(3):
+        breaker.record_failure(OSError("down"))
+    clock[0] += 60
+    assert breaker.allow()
+    breaker.record_failure(OSError("still down"))
+    assert breaker.state == OPEN and not breaker.allow()
+    clock[0] += 60
+    assert breaker.state == HALF_OPEN
+
+
+def test_guarded_call_skips_an_open_host(clock, monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience, "_sources", {})
+    url = "https://feeds.example.com/rss"
+
+    def broken():
+        raise OSError("refused")
+    for _ in range(resilience.FAILURE_THRESHOLD):
+        with pytest.raises(OSError):
+            resilience.guarded_call(url, broken)
+    calls = []
+    with pytest.raises(resilience.CircuitOpenError):
+        resilience.guarded_call(url, calls.append, 1)
+    assert calls == []
+    status = resilience.source_status()[0]
+    assert (status["state"], status["served_stale"]) == (OPEN, True)
+    assert "circuit open" in status["last_error"]
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from supplyalert import shared_cache
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, monkeypatch, data_dir):
+    if request.param == "sqlite":
+        backend = shared_cache.open_backend(f"sqlite:///{data_dir / 'shared.sqlite'}")
+    else:
+        backend = shared_cache.open_backend(request.getfixturevalue("resp_server").url)
+    monkeypatch.setattr(shared_cache, "_backend", backend)
+    monkeypatch.setattr(shared_cache, "_backend_loaded", True)
+    monkeypatch.setattr(shared_cache, "POLL_INTERVAL", 0.02)
+    return backend
+
+
+def slow(value, calls, seconds=0.3):
+    def fn():
+        calls.append(value)
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_one_leader_fetches_for_everyone(backend):
+    calls, results = [], []
+    threads = [threading.Thread(target=lambda: results.append(shared_cache.fetch("src", 60, slow("v", calls))))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ["v"]
+    assert [value for value, _ in results] == ["v"] * 8
+    assert len({fetched_at for _, fetched_at in results}) == 1
+
+
+def test_stale_value_is_refetched_once(backend):
+    calls = []
+    shared_cache.fetch("src", 60, slow("old", calls, 0))
+    time.sleep(0.1)
+    assert shared_cache.fetch("src", 0.05, slow("new", calls, 0))[0] == "new"
+    assert shared_cache.fetch("src", 60, slow("unused", calls, 0))[0] == "new"
+    assert calls == ["old", "new"]
+
+
+def test_forced_follower_takes_the_leaders_result(backend):
+    calls = []
+    leader = threading.Thread(target=shared_cache.fetch, args=("src", 0, slow("leader", calls, 0.5)))
+    leader.start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    value, _ = shared_cache.fetch("src", 0, slow("follower", calls), wait=5)
+    leader.join()
+    assert value == "leader"
+    assert calls == ["leader"]
+    assert time.monotonic() - started < 2
+
+
+def test_follower_gives_up_while_leader_is_busy(backend):
+    leader = threading.Thread(target=shared_cache.fetch, args=("src", 60, slow("leader", [], 0.5)))
+    leader.start()
+    time.sleep(0.1)
+    with pytest.raises(shared_cache.RefreshPending):
+        shared_cache.fetch("src", 60, slow("follower", []), wait=0.1)
+    leader.join()
+
+
+def test_failed_leader_releases_the_lock(backend):
+    def broken():
+        raise ValueError("upstream down")
+    with pytest.raises(ValueError):
+        shared_cache.fetch("src", 60, broken)
+    assert shared_cache.fetch("src", 60, lambda: "retried", wait=0)[0] == "retried"
+
+
+def test_unreadable_value_is_a_miss_and_overwritten(backend):
+    backend.set("value:src", b"not a pickle", 60)
+    assert shared_cache.fetch("src", 60, lambda: "fresh")[0] == "fresh"
+    assert shared_cache.fetch("src", 60, lambda: "unused")[0] == "fresh"
+
+
+def test_unreachable_backend_fetches_locally(monkeypatch):
+    monkeypatch.setattr(shared_cache, "_backend", shared_cache.RedisBackend("redis://127.0.0.1:1", timeout=0.5))
+    monkeypatch.setattr(shared_cache, "_backend_loaded", True)
+    assert shared_cache.fetch("src", 60, lambda: "local")[0] == "local"
+
+
+def test_redis_url_sends_auth_and_select(resp_server):
+    host, port = resp_server.server_address
+    backend = shared_cache.open_backend(f"redis://:secret@{host}:{port}/2")
+    backend.set("k", b"v", 10)
+    assert backend.get("k") == b"v"
+    assert resp_server.commands[:2] == ["AUTH", "SELECT"]
+
+
+def test_sqlite_backend_avoids_wal(data_dir):
+    backend = shared_cache.open_backend(f"sqlite:///{data_dir / 'shared.sqlite'}")
+    assert backend._conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
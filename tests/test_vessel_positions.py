@@ -0,0 +1,95 @@
+import logging
+import os
+
+import numpy as np
+
+from supplyalert import vessel_positions
+from supplyalert.port_metrics import PortMetricsStore
+from supplyalert.vessel_positions import VesselDays, vessel_source
+
+DAY_START = 1_700_006_400   # a UTC midnight
+ANCHORAGE = (33.60, -118.20)   # Los Angeles/Long Beach
+BERTH = (33.74, -118.25)
+
+
+def write(directory, name, rows, mtime):
+    path = directory / name
+    lines = ['MMSI,BaseDateTime,LAT,LON,SOG,VesselName']
+    for mmsi, hour, (lat, lon), sog in rows:
+        # Quoted names with commas, as AIS exports have them
+        lines.append(f'{mmsi},{DAY_START + hour * 3600},{lat},{lon},{sog},"SHIP {mmsi}, LTD"')
+    path.write_text("\n".join(lines) + "\n")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_points_in_ring():
+    ring = vessel_positions._box(0, 0, 2, 2)
+    inside = vessel_positions.points_in_ring(ring, np.array([1.0, 3.0, 1.0]), np.array([1.0, 1.0, -1.0]))
+    assert inside.tolist() == [True, False, False]
+
+
+def test_quoted_csv_fields_load(data_dir):
+    path = write(data_dir, "a.csv", [(111, 1, ANCHORAGE, 0.1)], 1)
+    mmsi, ts, lat, lon, sog = vessel_positions.load_positions(str(path))
+    assert mmsi.tolist() == [111] and ts.tolist() == [DAY_START + 3600] and sog.tolist() == [0.1]
+
+
+def test_later_file_for_the_same_day_is_merged(data_dir):
+    ais = data_dir / "ais"
+    ais.mkdir()
+    store, days = PortMetricsStore(), VesselDays()
+
+    write(ais, "morning.csv", [(111, 1, ANCHORAGE, 0.1), (222, 2, ANCHORAGE, 0.2), (333, 3, BERTH, 0.0),
+                               (444, 3, ANCHORAGE, 9.0)], 1)   # 444 is moving
+    store.ingest(vessel_source(store, str(ais), days))
+    assert store.latest()["Los Angeles/Long Beach"]["note"] == "2 at anchor, 1 at berth"
+
+    write(ais, "evening.csv", [(111, 20, ANCHORAGE, 0.1), (555, 21, ANCHORAGE, 0.1), (666, 22, BERTH, 0.0)], 2)
+    store.ingest(vessel_source(store, str(ais), days))
+    latest = store.latest()["Los Angeles/Long Beach"]
+    assert latest["note"] == "3 at anchor, 2 at berth"
+    assert latest["delay_days"] == 1.5
+    # The day still has a single observation, now revised
+    assert [(bucket, mean) for bucket, mean, *_ in store.trend("Los Angeles/Long Beach", days=10 ** 5)] == [
+        (DAY_START, 1.5)]
+
+
+def test_unreadable_files_are_logged(data_dir, caplog):
+    ais = data_dir / "ais"
+    ais.mkdir()
+    (ais / "broken.csv").write_text("no,useful,columns\n1,2,3\n")
+    with caplog.at_level(logging.WARNING, logger="supplyalert.vessel_positions"):
+        assert vessel_source(PortMetricsStore(), str(ais), VesselDays()) == []
+    assert "broken.csv" in caplog.text
+
+
+def test_parallel_scan_matches_serial(data_dir, monkeypatch):
+    monkeypatch.setattr(vessel_positions.os, "cpu_count", lambda: 2)
+    paths = [str(write(data_dir, f"{i}.csv", [(100 + i, i, ANCHORAGE, 0.1), (200 + i, i, BERTH, 0.1)], 1))
+             for i in range(3)]
+    serial, _ = vessel_positions.scan_files(paths, parallel=False)
+    parallel, errors = vessel_positions.scan_files(paths)
+    assert not errors
+    assert {key: keys.tolist() for key, keys in parallel.items()} == {key: keys.tolist() for key, keys in serial.items()}
+    assert len(serial[("Los Angeles/Long Beach", "anchorage")]) == 3
+
+
+def test_failed_scan_is_retried(data_dir, monkeypatch):
+    ais = data_dir / "ais"
+    ais.mkdir()
+    write(ais, "day.csv", [(111, 1, ANCHORAGE, 0.1), (333, 3, BERTH, 0.0)], 1)
+    store, days = PortMetricsStore(), VesselDays()
+    real_scan = vessel_positions.scan_file
+    monkeypatch.setattr(vessel_positions, "scan_file", lambda path: ({}, "OSError: disk hiccup"))
+    assert vessel_source(store, str(ais), days) == []
+    monkeypatch.setattr(vessel_positions, "scan_file", real_scan)
+    assert [note for *_, note in vessel_source(store, str(ais), days)] == ["1 at anchor, 1 at berth"]
+    assert vessel_source(store, str(ais), days) == []   # now ingested
+
+
+def test_ragged_file_falls_back_to_row_parsing(data_dir):
+    path = data_dir / "ragged.csv"
+    path.write_text(f"MMSI,BaseDateTime,LAT,LON,SOG\n111,{DAY_START},33.6,-118.2,0.1\n222,{DAY_START}\n")
+    mmsi, ts, *_ = vessel_positions.load_positions(str(path))
+    assert mmsi.tolist() == [111] and ts.tolist() == [DAY_START]
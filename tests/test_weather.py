@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from supplyalert import weather
+
+HOUR = 3600
+
+
+def hourly(times, gusts=None, snow=None, rain=None):
+    return {"hourly": {"time": times,
+                       "wind_gusts_10m": gusts if gusts is not None else [0] * len(times),
+                       "snowfall": snow if snow is not None else [0] * len(times),
+                       "rain": rain if rain is not None else [0] * len(times)}}
+
+
+def test_disruption_windows_split_on_clear_hours():
+    times = np.arange(6) * HOUR
+    series = {"wind_gusts_10m": np.array([[90, 90, 0, 60, 0, 0], [0] * 6], dtype=float),
+              "snowfall": np.zeros((2, 6)),
+              "rain": np.array([[0] * 6, [0, 0, 0, 0, 12, 12]], dtype=float)}
+    windows = weather.disruption_windows(["A", "B"], times, series)
+    assert [(w["location"], w["start"], w["end"], w["severity"]) for w in windows] == [
+        ("A", 0, 2 * HOUR, "High"),
+        ("A", 3 * HOUR, 4 * HOUR, "Medium"),
+        ("B", 4 * HOUR, 6 * HOUR, "Medium"),
+    ]
+    assert windows[0]["conditions"] == ["High Winds"]
+    assert windows[0]["peak_gust"] == 90
+
+
+def test_nan_hours_never_disrupt():
+    times = np.arange(3) * HOUR
+    series = {name: np.full((1, 3), np.nan) for name in ("wind_gusts_10m", "snowfall", "rain")}
+    assert weather.disruption_windows(["A"], times, series) == []
+
+
+def test_short_and_missing_rows_are_padded(monkeypatch):
+    times = [0, HOUR, 2 * HOUR]
+    results = [hourly(times, gusts=[90, 90, 90]), hourly(times, gusts=[90]), None]
+    monkeypatch.setattr(weather, "_fetch_batches", lambda points, query, read_timeout: results)
+    got_times, series, complete = weather._fetch_hourly([None] * 3)
+    assert list(got_times) == times
+    assert series["wind_gusts_10m"].shape == (3, 3)
+    assert np.isnan(series["wind_gusts_10m"][1, 1:]).all()
+    assert np.isnan(series["wind_gusts_10m"][2]).all()
+    assert not complete
+
+
+@pytest.fixture
+def forecast(monkeypatch):
+    monkeypatch.setattr(weather, "_forecast_run", None)
+    monkeypatch.setattr(weather, "_forecast_windows", [])
+    monkeypatch.setattr(weather, "_latest_model_run", lambda: "run-1")
+    calls = []
+
+    def fetch(results):
+        def fake(points, query, read_timeout):
+            calls.append(query)
+            return results(len(points))
+        monkeypatch.setattr(weather, "_fetch_batches", fake)
+    return fetch, calls
+
+
+def test_incomplete_forecast_is_refetched(forecast):
+    fetch, calls = forecast
+    times = [int(weather.time.time()) + HOUR * i for i in range(3)]
+    fetch(lambda n: [hourly(times)] * (n - 1) + [None])
+    weather.get_weather_forecast.__wrapped__()
+    weather.get_weather_forecast.__wrapped__()
+    assert len(calls) == 2
+
+    fetch(lambda n: [hourly(times)] * n)
+    weather.get_weather_forecast.__wrapped__()
+    weather.get_weather_forecast.__wrapped__()
+    assert len(calls) == 3